@@ -0,0 +1,73 @@
+""" Import-time benchmark.
+
+Measures how long it takes a fresh interpreter to import the package and to get to the point of running a simulation, and checks that neither imports pandas or matplotlib. Worker processes and command line jobs pay these costs every time they start.
+
+Run from the root of the repository:
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget 50
+"""
+import sys
+import os
+import argparse
+import subprocess
+
+repo_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+default_budget = 50 # ms, for `import rocketflightsim`
+heavy_modules = ('pandas', 'matplotlib')
+
+statements = {
+    'import rocketflightsim': 'import rocketflightsim',
+    'import the combined flight functions': 'from rocketflightsim import flight_sim_ignition_to_apogee',
+}
+
+def time_import(statement, repeat = 5):
+    """
+    Time a statement in fresh interpreters.
+
+    Args
+    ----
+    statement : str
+        The statement to run, e.g. 'import rocketflightsim'.
+    repeat : int, optional
+        Number of interpreters to start, of which the fastest is kept. Defaults to 5.
+
+    Returns
+    -------
+    tuple
+        The fastest time taken by the statement (s), and the heavy modules (pandas, matplotlib) it imported.
+    """
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"{statement}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(elapsed, *[module for module in {heavy_modules!r} if module in sys.modules])\n"
+    )
+    best = float('inf')
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', code], cwd = repo_dir, capture_output = True, text = True, check = True).stdout.split()
+        best = min(best, float(output[0]))
+    return best, output[1:]
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Benchmark the time it takes to import RocketFlightSim.")
+    parser.add_argument('--repeat', type = int, default = 5, help = "fresh interpreters to start, the fastest is kept")
+    parser.add_argument('--budget', type = float, default = default_budget, help = "allowed time for `import rocketflightsim` (ms)")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for name, statement in statements.items():
+        elapsed, heavy_imports = time_import(statement, args.repeat)
+        print(f"{name}: {elapsed * 1000:.1f} ms")
+        if heavy_imports:
+            print(f"\timported {', '.join(heavy_imports)}")
+            failed = True
+        if statement == 'import rocketflightsim' and elapsed * 1000 > args.budget:
+            print(f"\tover the budget of {args.budget} ms")
+            failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
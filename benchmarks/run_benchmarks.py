@@ -0,0 +1,263 @@
+""" Performance benchmarks for the flight stages and combined flight functions.
+
+Measures wall time and steps per second of each stage and each combined flight function on the past_flights test configurations and the example configurations, at several timesteps. Each wall time is also given relative to the time of a fixed reference workload run in the same process, which takes out most of the difference between machines. Results are written as JSON and can be compared against a stored baseline by their relative times, failing if any hot path got slower than the allowed budget.
+
+Run from the root of the repository:
+
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --check --budget 15
+    python -m benchmarks.run_benchmarks --update-baseline
+"""
+import sys
+import os
+import argparse
+import json
+import math
+import platform
+import time
+from copy import deepcopy
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rocketflightsim import constants as con
+from rocketflightsim.flight_sim_ignition_to_liftoff import sim_ignition_to_liftoff
+from rocketflightsim.flight_sim_guided import sim_liftoff_to_rail_clearance
+from rocketflightsim.flight_sim_unguided_boost import sim_unguided_boost
+from rocketflightsim.flight_sim_coast import sim_coast
+from rocketflightsim.flight_sim_parachute import sim_parachute
+from rocketflightsim.flight_stages_combined import flight_sim_ignition_to_apogee, flight_sim_ignition_to_landing, flight_sim_ballistic_recovery
+from rocketflightsim.rocket_classes import Flightpath
+
+benchmarks_dir = os.path.dirname(os.path.abspath(__file__))
+default_baseline_path = os.path.join(benchmarks_dir, 'baseline.json')
+default_output_path = os.path.join(benchmarks_dir, 'latest_results.json')
+
+default_timesteps = (con.default_timestep, 0.01, 0.005)
+default_budget = 20 # percent
+default_min_wall_time = 0.001 # s, benchmarks faster than this are too noisy to hold to a budget
+
+def benchmark_configurations():
+    """
+    Collect the configurations to benchmark.
+
+    Returns
+    -------
+    list
+        A list of tuples (name, rocket, environment, launchpad, parachute). parachute is None for configurations that don't have one.
+    """
+    from tests.test_configs import past_flights
+    from examples.example_configurations import example_rocket, Spaceport_America_Cup_avg_environment, Spaceport_America_Cup_default_launchpad, Launch_Canada_avg_environment, Launch_Canada_default_launchpad
+
+    configurations = [(past_flight.name, past_flight.rocket, past_flight.environment, past_flight.launchpad, past_flight.parachute) for past_flight in past_flights]
+    configurations.append(('Example rocket at SAC', example_rocket, Spaceport_America_Cup_avg_environment, Spaceport_America_Cup_default_launchpad, None))
+    configurations.append(('Example rocket at LC', example_rocket, Launch_Canada_avg_environment, Launch_Canada_default_launchpad, None))
+    return configurations
+
+def time_function(fn, repeat):
+    """
+    Time a function, keeping the fastest of several runs.
+
+    Args
+    ----
+    fn : function
+        A function taking no arguments.
+    repeat : int
+        Number of times to run the function.
+
+    Returns
+    -------
+    tuple
+        The fastest wall time in seconds and the result of the last call.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def reference_workload(steps = 20000):
+    """
+    A fixed workload that doesn't use the simulator, for timing the simulator's benchmarks relative to the machine they run on.
+
+    Integrates a point mass falling with quadratic drag, with the same mix of Python float arithmetic, math calls, and tuple building as the flight stages.
+
+    Returns
+    -------
+    list
+        The states of the point mass, one per step.
+    """
+    dt = 0.01
+    x, z, v_x, v_z = 0.0, 1000.0, 50.0, 0.0
+    states = []
+    for i in range(steps):
+        speed = math.sqrt(v_x**2 + v_z**2)
+        density = 1.225 * math.exp(-z / 8500)
+        drag = 0.5 * density * speed * 0.01
+        a_x = -drag * v_x
+        a_z = -9.81 - drag * v_z
+        v_x += a_x * dt
+        v_z += a_z * dt
+        x += v_x * dt
+        z += v_z * dt
+        states.append((i * dt, x, z, v_x, v_z, a_x, a_z))
+    return states
+
+def benchmark_configuration(rocket, environment, launchpad, parachute, timestep, repeat):
+    """
+    Benchmark each stage and combined flight function on one configuration at one timestep.
+
+    Returns
+    -------
+    dict
+        For each stage and combined function, a dictionary of the wall time ('wall_time', s), number of simulated states ('steps'), and 'steps_per_second'.
+    """
+    rocket, environment, launchpad = deepcopy((rocket, environment, launchpad))
+    results = {}
+
+    def record(name, fn):
+        wall_time, states = time_function(fn, repeat)
+        steps = len(states) if isinstance(states, (list, Flightpath)) else 0
+        results[name] = {
+            'wall_time': wall_time,
+            'steps': steps,
+            'steps_per_second': steps / wall_time if steps else None,
+        }
+        return states
+
+    t_liftoff = record('sim_ignition_to_liftoff', lambda: sim_ignition_to_liftoff(rocket, environment, launchpad))
+    rail_states = record('sim_liftoff_to_rail_clearance', lambda: sim_liftoff_to_rail_clearance(rocket, environment, launchpad, t_liftoff, timestep))
+    boost_states = record('sim_unguided_boost', lambda: sim_unguided_boost(rocket, environment, rail_states[-1], timestep))
+    coast_states = record('sim_coast', lambda: sim_coast(rocket, environment, boost_states[-1], timestep = timestep))
+    if parachute is not None:
+        record('sim_parachute', lambda: sim_parachute(rocket, environment, (*coast_states[-1][:7],), parachute, timestep = timestep))
+
+    record('flight_sim_ignition_to_apogee', lambda: flight_sim_ignition_to_apogee(rocket, environment, launchpad, timestep = timestep))
+    record('flight_sim_ballistic_recovery', lambda: flight_sim_ballistic_recovery(rocket, environment, launchpad, timestep = timestep))
+    if parachute is not None:
+        record('flight_sim_ignition_to_landing', lambda: flight_sim_ignition_to_landing(rocket, environment, launchpad, [(parachute, 'landed', None)], timestep = timestep))
+
+    return results
+
+def run_benchmarks(timesteps = default_timesteps, repeat = 3):
+    """
+    Run the benchmarks on every configuration at every timestep.
+
+    Args
+    ----
+    timesteps : tuple, optional
+        The timesteps to benchmark at (s).
+    repeat : int, optional
+        Number of runs of each function, of which the fastest is kept. Defaults to 3.
+
+    Returns
+    -------
+    dict
+        Machine-readable results. 'reference_time' is the fastest wall time of reference_workload (s), and 'benchmarks' maps keys of the form 'configuration | function | timestep' to the measurements for that function, including its 'relative_time', its wall time divided by the time of the reference workload run alongside it.
+    """
+    # the reference is timed just before and after each configuration and timestep, and the faster kept, so the relative times follow a machine that speeds up or slows down during the run
+    results = {}
+    reference_times = []
+    for name, rocket, environment, launchpad, parachute in benchmark_configurations():
+        for timestep in timesteps:
+            reference_time = time_function(reference_workload, repeat)[0]
+            measurements = benchmark_configuration(rocket, environment, launchpad, parachute, timestep, repeat)
+            reference_time = min(reference_time, time_function(reference_workload, repeat)[0])
+            reference_times.append(reference_time)
+            for function, measurement in measurements.items():
+                measurement['relative_time'] = measurement['wall_time'] / reference_time
+                results[f'{name} | {function} | {timestep}'] = measurement
+    reference_time = min(reference_times)
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timesteps': list(timesteps),
+        'repeat': repeat,
+        'reference_time': reference_time,
+        'benchmarks': results,
+    }
+
+def compare_to_baseline(results, baseline, budget = default_budget, min_wall_time = default_min_wall_time):
+    """
+    Compare benchmark results to a baseline by their times relative to the reference workload, so a baseline recorded on one machine can be compared against on another.
+
+    Args
+    ----
+    results : dict
+        Results as returned by run_benchmarks.
+    baseline : dict
+        Baseline results in the same format.
+    budget : float, optional
+        Allowed slowdown in percent before a benchmark is flagged as a regression. Defaults to 20.
+    min_wall_time : float, optional
+        Benchmarks that took less than this in the baseline (s) are skipped, as their timings are dominated by noise. Defaults to 1 ms.
+
+    Returns
+    -------
+    list
+        A list of tuples (key, baseline relative time, current relative time, percent change) for each benchmark that got slower than the budget allows.
+    """
+    regressions = []
+    for key, measurement in results['benchmarks'].items():
+        baseline_measurement = baseline['benchmarks'].get(key)
+        # baselines from before relative times were recorded can't be compared across machines
+        if baseline_measurement is None or 'relative_time' not in baseline_measurement:
+            continue
+        if baseline_measurement['wall_time'] < min_wall_time:
+            continue
+        baseline_time = baseline_measurement['relative_time']
+        current_time = measurement['relative_time']
+        change = (current_time - baseline_time) / baseline_time * 100
+        if change > budget:
+            regressions.append((key, baseline_time, current_time, change))
+    return regressions
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Benchmark the RocketFlightSim flight stages and compare against a stored baseline.")
+    parser.add_argument('--timesteps', type = float, nargs = '+', default = list(default_timesteps), help = "timesteps to benchmark at (s)")
+    parser.add_argument('--repeat', type = int, default = 3, help = "runs of each function, the fastest is kept")
+    parser.add_argument('--output', default = default_output_path, help = "where to write the results as JSON")
+    parser.add_argument('--baseline', default = default_baseline_path, help = "baseline results to compare against")
+    parser.add_argument('--budget', type = float, default = default_budget, help = "allowed slowdown in percent")
+    parser.add_argument('--min-time', type = float, default = default_min_wall_time, help = "skip benchmarks faster than this in the baseline (s)")
+    parser.add_argument('--check', action = 'store_true', help = "exit with code 1 if any benchmark is slower than the budget allows, rather than only reporting it")
+    parser.add_argument('--update-baseline', action = 'store_true', help = "overwrite the baseline with these results")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(timesteps = tuple(args.timesteps), repeat = args.repeat)
+
+    print(f"reference workload: {results['reference_time'] * 1000:.3f} ms")
+    for key, measurement in results['benchmarks'].items():
+        steps_per_second = measurement['steps_per_second']
+        rate = f"{steps_per_second:,.0f} steps/s" if steps_per_second else ""
+        print(f"{key}: {measurement['wall_time'] * 1000:.3f} ms ({measurement['relative_time']:.3f} x reference) {rate}")
+
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent = 2)
+    print(f"\nResults written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent = 2)
+        print(f"Baseline updated at {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline found at {args.baseline}, run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    regressions = compare_to_baseline(results, baseline, budget = args.budget, min_wall_time = args.min_time)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) more than {args.budget}% slower than the baseline, relative to the reference workload:")
+        for key, baseline_time, current_time, change in regressions:
+            print(f"\t{key}: {baseline_time:.3f} x reference -> {current_time:.3f} x reference (+{change:.1f}%)")
+        return 1 if args.check else 0
+
+    print(f"\nAll benchmarks within {args.budget}% of the baseline")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+""" Scenario tree benchmark.
+
+Times run_scenario_tree against simulating each variant on its own with run_variants_independently, for typical airbrake design studies on the NDRT 2020 flight, and reports the speedup of sharing the flights' common segments.
+
+Run from the root of the repository:
+
+    python -m benchmarks.scenario_tree
+    python -m benchmarks.scenario_tree --repeat 5
+"""
+import sys
+import os
+import argparse
+from copy import deepcopy
+from time import perf_counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rocketflightsim.classes.airbrakes import Airbrakes
+from rocketflightsim.tools.scenario_tree import run_scenario_tree, run_variants_independently
+from tests.test_configs import NDRT_2020_flight
+
+def _make_airbrakes(Cd_brakes = 1.0):
+    return Airbrakes(num_flaps = 3, A_flap = 0.004, Cd_brakes = Cd_brakes, max_deployment_angle = 45, max_deployment_rate = 5, max_retraction_rate = 10)
+
+def _deployment_function(rate):
+    return lambda time: min(rate * time, 0.7)
+
+def make_studies(parachute):
+    """
+    Make the design studies to benchmark.
+
+    Args
+    ----
+    parachute : Parachute
+        Parachute the studies that descend to the ground land under.
+
+    Returns
+    -------
+    dict
+        The variants of each study, by the study's name.
+    """
+    airbrakes = _make_airbrakes()
+    return {
+        'deployment functions x delays, to apogee': [{'airbrakes': airbrakes, 'deployment_function': _deployment_function(0.05 * k), 'deployment_delay': delay} for k in range(1, 6) for delay in (0, 1, 2, 3)],
+        'airbrake Cds x delays, to apogee': [{'airbrakes': _make_airbrakes(Cd_brakes), 'deployment_delay': delay} for Cd_brakes in np.linspace(0.6, 1.4, 5) for delay in (0, 1, 2, 3)],
+        'airbrake Cds, to landing': [{'airbrakes': _make_airbrakes(Cd_brakes), 'descent': [(parachute, 'landed', None)]} for Cd_brakes in np.linspace(0.6, 1.4, 20)],
+    }
+
+def time_study(function, rocket, environment, launchpad, variants, repeat = 3):
+    """
+    Time a way of simulating a study.
+
+    Args
+    ----
+    function : function
+        run_scenario_tree or run_variants_independently.
+    rocket : Rocket
+        Rocket object.
+    environment : Environment
+        Environment object.
+    launchpad : Launchpad
+        Launchpad object.
+    variants : list
+        Variants of the study.
+    repeat : int, optional
+        Number of runs, of which the fastest is kept. Defaults to 3.
+
+    Returns
+    -------
+    float
+        The fastest time taken (s).
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start_time = perf_counter()
+        function(rocket, environment, launchpad, variants)
+        best = min(best, perf_counter() - start_time)
+    return best
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Benchmark scenario trees against simulating each variant independently.")
+    parser.add_argument('--repeat', type = int, default = 3, help = "runs of each study, the fastest is kept")
+    args = parser.parse_args(argv)
+
+    past_flight = deepcopy(NDRT_2020_flight)
+    rocket, environment, launchpad = past_flight.rocket, past_flight.environment, past_flight.launchpad
+    for name, variants in make_studies(past_flight.parachute).items():
+        shared_time = time_study(run_scenario_tree, rocket, environment, launchpad, variants, args.repeat)
+        independent_time = time_study(run_variants_independently, rocket, environment, launchpad, variants, args.repeat)
+        print(f"{name} ({len(variants)} variants): {shared_time * 1000:.0f} ms as a scenario tree, {independent_time * 1000:.0f} ms independently, {independent_time / shared_time:.1f}x speedup")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+""" RocketFlightSim: a lightweight 3-DOF rocket flight simulator.
+
+The names below can be imported straight from the package, e.g. `from rocketflightsim import Rocket, flight_sim_ignition_to_apogee`. They're loaded the first time they're accessed (PEP 562), so `import rocketflightsim` doesn't import NumPy, and pandas and matplotlib are only imported by the plotting functions and Flightpath.to_pandas.
+"""
+import importlib
+
+# public name -> module it's defined in, relative to this package
+_lazy_attributes = {
+    # configuration classes
+    'Motor': '.classes.motor',
+    'Rocket': '.classes.rocket',
+    'Environment': '.classes.environment',
+    'Launchpad': '.classes.launchpad',
+    'Parachute': '.classes.parachute',
+    'Airbrakes': '.classes.airbrakes',
+    'DragCurve': '.classes.drag_curve',
+    'SimStats': '.classes.sim_stats',
+    'Flightpath': '.rocket_classes',
+
+    # combined flight functions
+    'flight_sim_ignition_to_apogee': '.flight_stages_combined',
+    'flight_sim_ignition_to_landing': '.flight_stages_combined',
+    'flight_sim_ballistic_recovery': '.flight_stages_combined',
+    'phase_timesteps': '.flight_stages_combined',
+
+    # flight stages
+    'sim_ignition_to_liftoff': '.flight_sim_ignition_to_liftoff',
+    'sim_liftoff_to_rail_clearance': '.flight_sim_guided',
+    'sim_unguided_boost': '.flight_sim_unguided_boost',
+    'sim_coast': '.flight_sim_coast',
+    'sim_parachute': '.flight_sim_parachute',
+    'sim_max_airbrakes_deployment_to_apogee': '.flight_sim_airbrakes',
+    'sim_airbrakes_deployment_to_apogee_fn_height': '.flight_sim_airbrakes',
+    'sim_airbrakes_deployment_to_apogee_fn_time': '.flight_sim_airbrakes',
+
+    'ApogeePredictor': '.apogee_predictor',
+    'run_in_parallel': '.parallel',
+}
+
+# submodules that can be accessed as attributes without importing them first
+_lazy_submodules = ('constants', 'helper_functions', 'classes', 'tools', 'parallel', 'precision', 'events', 'serialization', 'flight_stages_combined')
+
+__all__ = list(_lazy_attributes) + list(_lazy_submodules)
+
+def __getattr__(name):
+    if name in _lazy_attributes:
+        value = getattr(importlib.import_module(_lazy_attributes[name], __name__), name)
+    elif name in _lazy_submodules:
+        value = importlib.import_module(f'.{name}', __name__)
+    else:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    # cache it so later accesses don't go through __getattr__
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
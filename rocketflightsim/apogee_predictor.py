@@ -0,0 +1,240 @@
+from time import perf_counter
+
+import numpy as np
+
+from . import helper_functions as hfunc
+from . import constants as con
+from .tools.max_theoretical_conditions import max_theoretical_apogee, max_theoretical_speed
+
+class ApogeePredictor:
+    """
+    The ApogeePredictor class predicts the apogee of a coasting rocket from its current state, fast enough to be called at 50-100 Hz by an airbrakes controller.
+
+    Everything that doesn't depend on the state is worked out once when the predictor is created: air density and speed of sound are tabulated against altitude and the rocket's drag against Mach number, so each step of a prediction is a few table lookups and multiplications. Predictions integrate the coast with Heun's method, taking a fixed number of steps to apogee based on the time to apogee from the previous prediction, and locate apogee within the last step exactly. If a prediction runs over its time budget, the integration is truncated and the rest of the ascent is finished analytically, so a prediction is always returned on time.
+
+    Attributes
+    ----------
+    rocket : Rocket
+        The rocket, after burnout.
+    environment : Environment
+        The environment the rocket is flying through.
+    airbrakes : Airbrakes
+        The rocket's airbrakes, or None.
+    time_budget : float
+        Time allowed for each prediction (s).
+    target_steps : int
+        Number of integration steps each prediction aims to take to apogee.
+    last_apogee : float
+        Altitude of the last predicted apogee (m), or None before the first prediction.
+    last_apogee_time : float
+        Time of the last predicted apogee (s after ignition), or None before the first prediction.
+    num_predictions : int
+        Number of predictions made.
+    num_truncated : int
+        Number of predictions that ran over the time budget and were finished analytically.
+    worst_case_latency : float
+        Longest time a prediction took (s).
+    total_latency : float
+        Total time taken by all predictions (s).
+    """
+    def __init__(
+        self,
+        rocket,
+        environment,
+        airbrakes = None,
+        time_budget : float = 0.005,
+        target_steps : int = 40,
+        min_timestep : float = 0.002,
+        max_timestep : float = 0.25,
+        altitude_resolution : float = 5,
+        mach_resolution : float = 0.005,
+    ):
+        """Initialize an ApogeePredictor object and build its tables.
+
+        Parameters
+        ----------
+        rocket : Rocket
+            The rocket. Its dry mass is used, as predictions are made after burnout.
+        environment : Environment
+            The environment the rocket is flying through. The full mean wind is used, as in the coast stage.
+        airbrakes : Airbrakes, optional
+            The rocket's airbrakes. Defaults to None.
+        time_budget : float, optional
+            Time allowed for each prediction (s). Defaults to 5 ms.
+        target_steps : int, optional
+            Number of integration steps each prediction aims to take to apogee. Defaults to 40.
+        min_timestep : float, optional
+            Smallest integration step (s). Defaults to 0.002.
+        max_timestep : float, optional
+            Largest integration step (s). Defaults to 0.25.
+        altitude_resolution : float, optional
+            Spacing of the air density and speed of sound tables (m). Defaults to 5.
+        mach_resolution : float, optional
+            Spacing of the drag table (Mach number). Defaults to 0.005.
+        """
+        self.rocket = rocket
+        self.environment = environment
+        self.airbrakes = airbrakes
+        self.time_budget = time_budget
+        self.target_steps = target_steps
+        self.min_timestep = min_timestep
+        self.max_timestep = max_timestep
+
+        self.mass = rocket.dry_mass
+        self.F_gravity = environment.local_gravity
+        self.windspeed_x = environment.mean_wind_speed * np.sin(environment.wind_heading)
+        self.windspeed_y = environment.mean_wind_speed * np.cos(environment.wind_heading)
+
+        if airbrakes is not None:
+            self.A_Cd_brakes = airbrakes.A_brakes * airbrakes.Cd_brakes
+            self.max_deployment_angle = np.deg2rad(airbrakes.max_deployment_angle)
+            self.max_deployment_rate = np.deg2rad(airbrakes.max_deployment_rate)
+            self.max_retraction_rate = np.deg2rad(airbrakes.max_retraction_rate)
+        else:
+            self.A_Cd_brakes = 0
+            self.max_deployment_angle = self.max_deployment_rate = self.max_retraction_rate = 0
+
+        # the closed-form bounds on apogee and speed size the tables
+        max_altitude = max_theoretical_apogee(rocket, environment) * 1.1 + 100
+        altitudes = np.arange(0, max_altitude + altitude_resolution, altitude_resolution)
+        temperatures = hfunc.temp_at_altitude(altitudes, environment.launchpad_temp, environment.local_T_lapse_rate)
+        self._altitude_step = altitude_resolution
+        self._inv_altitude_step = 1 / altitude_resolution
+        # half the air density divided by the mass, so the drag deceleration is just this times airspeed times Cd*A
+        self._half_density_over_mass = (0.5 * hfunc.air_density_optimized(temperatures, environment.density_multiplier, environment.density_exponent) / self.mass).tolist()
+        self._inv_speed_of_sound = (1 / np.sqrt(con.adiabatic_index_air_times_R_specific_air * temperatures)).tolist()
+
+        max_mach = max_theoretical_speed(rocket, environment) * max(self._inv_speed_of_sound) * 1.1 + 0.1
+        machs = np.arange(0, max_mach + mach_resolution, mach_resolution)
+        self._inv_mach_step = 1 / mach_resolution
+        self._Cd_A = [float(rocket.Cd_A_rocket(Ma)) for Ma in machs]
+
+        self.last_apogee = None
+        self.last_apogee_time = None
+        self.num_predictions = 0
+        self.num_truncated = 0
+        self.worst_case_latency = 0.0
+        self.total_latency = 0.0
+
+    def _acceleration(self, z, v_x, v_y, v_z, brakes_Cd_A):
+        # drag acts against the velocity relative to the air
+        position = z * self._inv_altitude_step
+        i = min(max(int(position), 0), len(self._half_density_over_mass) - 2)
+        fraction = position - i
+        half_density_over_mass = self._half_density_over_mass[i] + fraction * (self._half_density_over_mass[i + 1] - self._half_density_over_mass[i])
+        inv_speed_of_sound = self._inv_speed_of_sound[i] + fraction * (self._inv_speed_of_sound[i + 1] - self._inv_speed_of_sound[i])
+
+        v_x_air = v_x - self.windspeed_x
+        v_y_air = v_y - self.windspeed_y
+        airspeed = (v_x_air * v_x_air + v_y_air * v_y_air + v_z * v_z) ** 0.5
+
+        mach_position = airspeed * inv_speed_of_sound * self._inv_mach_step
+        j = min(int(mach_position), len(self._Cd_A) - 2)
+        Cd_A = self._Cd_A[j] + (mach_position - j) * (self._Cd_A[j + 1] - self._Cd_A[j])
+
+        k = half_density_over_mass * airspeed * (Cd_A + brakes_Cd_A)
+        return -k * v_x_air, -k * v_y_air, -k * v_z - self.F_gravity
+
+    def predict(self, state, deployment_angle = None, target_deployment_angle = None):
+        """
+        Predict the apogee of the rocket from its current state.
+
+        Args
+        ----
+        state : tuple
+            The current state of the rocket (time, x, y, z, v_x, v_y, v_z, ...). If it has an 11th value, it's taken as the current airbrake deployment angle.
+        deployment_angle : float, optional
+            The current airbrake deployment angle (rad). Defaults to the 11th value of the state, or 0.
+        target_deployment_angle : float, optional
+            The deployment angle the airbrakes are commanded to (rad). The airbrakes move to it at their maximum deployment or retraction rate. Defaults to staying at the current angle.
+
+        Returns
+        -------
+        float
+            The predicted apogee (m). The rocket's current altitude if it's no longer ascending.
+        """
+        start_time = perf_counter()
+        deadline = start_time + self.time_budget
+
+        time, x, y, z, v_x, v_y, v_z = (float(value) for value in state[:7])
+        if deployment_angle is None:
+            deployment_angle = float(state[10]) if len(state) > 10 else 0.0
+        if target_deployment_angle is None:
+            target_deployment_angle = deployment_angle
+        target_deployment_angle = min(max(target_deployment_angle, 0.0), self.max_deployment_angle)
+        rate = self.max_deployment_rate if target_deployment_angle >= deployment_angle else -self.max_retraction_rate
+
+        F_gravity = self.F_gravity
+        A_Cd_brakes = self.A_Cd_brakes
+        acceleration = self._acceleration
+
+        # the previous prediction gives the time left to apogee, which sets the step size
+        if self.last_apogee_time is not None and self.last_apogee_time > time:
+            time_to_apogee = self.last_apogee_time - time
+        else:
+            time_to_apogee = max(v_z, 0) / F_gravity
+        timestep = min(max(time_to_apogee / self.target_steps, self.min_timestep), self.max_timestep)
+
+        truncated = False
+        a_x, a_y, a_z = acceleration(z, v_x, v_y, v_z, A_Cd_brakes * np.sin(deployment_angle))
+        while v_z > 0:
+            # apogee is within this step: finish it assuming a constant deceleration
+            if v_z < -a_z * timestep:
+                time_left = v_z / -a_z
+                z += v_z * time_left / 2
+                time += time_left
+                break
+
+            if perf_counter() > deadline:
+                # out of time: finish the ascent analytically. Drag falls off as the rocket slows, so the deceleration is taken as the average of the current one and gravity
+                truncated = True
+                deceleration = (-a_z + F_gravity) / 2
+                z += v_z * v_z / (2 * deceleration)
+                time += v_z / deceleration
+                break
+
+            next_deployment_angle = deployment_angle + rate * timestep
+            if (rate > 0 and next_deployment_angle > target_deployment_angle) or (rate < 0 and next_deployment_angle < target_deployment_angle):
+                next_deployment_angle = target_deployment_angle
+
+            # Heun's method
+            predicted_v_x = v_x + a_x * timestep
+            predicted_v_y = v_y + a_y * timestep
+            predicted_v_z = v_z + a_z * timestep
+            predicted_z = z + v_z * timestep
+            next_a_x, next_a_y, next_a_z = acceleration(predicted_z, predicted_v_x, predicted_v_y, predicted_v_z, A_Cd_brakes * np.sin(next_deployment_angle))
+
+            x += (v_x + predicted_v_x) * timestep / 2
+            y += (v_y + predicted_v_y) * timestep / 2
+            z += (v_z + predicted_v_z) * timestep / 2
+            v_x += (a_x + next_a_x) * timestep / 2
+            v_y += (a_y + next_a_y) * timestep / 2
+            v_z += (a_z + next_a_z) * timestep / 2
+            time += timestep
+            deployment_angle = next_deployment_angle
+
+            a_x, a_y, a_z = acceleration(z, v_x, v_y, v_z, A_Cd_brakes * np.sin(deployment_angle))
+
+        self.last_apogee = z
+        self.last_apogee_time = time
+
+        latency = perf_counter() - start_time
+        self.num_predictions += 1
+        self.num_truncated += truncated
+        self.total_latency += latency
+        self.worst_case_latency = max(self.worst_case_latency, latency)
+        return z
+
+    def reset(self):
+        """ Forgets the previous prediction and the latency statistics, e.g. before a new flight. """
+        self.last_apogee = None
+        self.last_apogee_time = None
+        self.num_predictions = 0
+        self.num_truncated = 0
+        self.worst_case_latency = 0.0
+        self.total_latency = 0.0
+
+    def latency_report(self):
+        """ Returns the number of predictions and their mean and worst-case latency as a string. """
+        mean_latency = self.total_latency / self.num_predictions if self.num_predictions else 0
+        return f"{self.num_predictions} predictions ({self.num_truncated} truncated), mean latency {mean_latency * 1000:.3f} ms, worst case {self.worst_case_latency * 1000:.3f} ms, budget {self.time_budget * 1000:.3f} ms"
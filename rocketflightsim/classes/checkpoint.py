@@ -0,0 +1,97 @@
+from bisect import bisect_right
+
+import numpy as np
+
+class Checkpoint:
+    """
+    The Checkpoint class stores everything needed to resume a simulation from a point in a flight, so that variants of a flight that only differ after that point don't have to re-simulate it. The combined flight functions emit checkpoints at each phase transition and accept one to resume from.
+
+    Attributes
+    ----------
+    event : str
+        The phase transition the checkpoint was taken at: 'liftoff', 'rail_clearance', 'burnout', 'apogee', 'parachute_stop', or 'impact'.
+    state : tuple
+        The state of the rocket at the checkpoint (time, x, y, z, v_x, v_y, v_z, a_x, a_y, a_z, and the airbrake deployment angle for states from the airbrakes stages).
+    states : numpy.ndarray
+        The flight from liftoff up to and including the checkpoint, one row per state. Used to give flights resumed from the checkpoint their full flightpath.
+    context : dict
+        The context of the phase the checkpoint was taken in:
+        - 'motor_cursor': index of the segment of the motor's thrust curve the checkpoint is in, or None once the motor has burned out
+        - 'burned_out': whether the motor has burned out
+        - 'parachute_index': number of parachutes in parachutes_and_conditions that have finished, for 'parachute_stop' checkpoints
+        - 'deployment_angle': the airbrake deployment angle (rad), for states from the airbrakes stages
+        - 'time_since_deployment': time since the current parachute or airbrakes deployed (s), where known
+    """
+    def __init__(self, event, state, states = None, context = None):
+        """Initialize a Checkpoint object.
+
+        Parameters
+        ----------
+        event : str
+            The phase transition the checkpoint was taken at.
+        state : tuple
+            The state of the rocket at the checkpoint.
+        states : array_like, optional
+            The flight from liftoff up to and including the checkpoint. Defaults to just the checkpoint's state.
+        context : dict, optional
+            The context of the phase the checkpoint was taken in. Defaults to an empty dict.
+        """
+        self.event = event
+        self.state = tuple(state)
+        self.states = np.asarray(states if states is not None else [state], dtype = float)
+        self.context = dict(context or {})
+
+    @property
+    def time(self):
+        """ Returns the time of the checkpoint (s after ignition). """
+        return self.state[0]
+
+    def __repr__(self):
+        return f"Checkpoint(event={self.event!r}, time={self.time:.3f}, z={self.state[3]:.2f})"
+
+def motor_cursor(motor, time):
+    """
+    Find the segment of a motor's thrust curve a time is in.
+
+    Args
+    ----
+    motor : Motor
+        The motor.
+    time : float
+        Time after ignition (s).
+
+    Returns
+    -------
+    int
+        Index of the thrust curve point at the start of the segment, or None if the motor has burned out by then.
+    """
+    if time >= motor.burn_time:
+        return None
+    return max(bisect_right(sorted(motor.thrust_curve), time) - 1, 0)
+
+def make_checkpoint(event, states, rocket, **context):
+    """
+    Make a checkpoint at the last of a list of states.
+
+    Args
+    ----
+    event : str
+        The phase transition the checkpoint is taken at.
+    states : list
+        The flight from liftoff up to and including the checkpoint.
+    rocket : Rocket
+        The rocket, used for the motor context.
+    **context
+        Any other context of the phase, e.g. parachute_index.
+
+    Returns
+    -------
+    Checkpoint
+        The checkpoint.
+    """
+    state = states[-1]
+    cursor = motor_cursor(rocket.motor, state[0])
+    context = {'motor_cursor': cursor, 'burned_out': cursor is None, **context}
+    if len(state) > 10:
+        context.setdefault('deployment_angle', state[10])
+    return Checkpoint(event, state, states, context)
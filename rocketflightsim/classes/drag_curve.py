@@ -0,0 +1,76 @@
+from bisect import bisect_right
+
+import numpy as np
+
+class DragCurve:
+    """
+    The DragCurve class stores a drag coefficient curve as a table of drag coefficients at Mach numbers, linearly interpolated between them and held constant past the ends of the table. Unlike a function, it can be pickled, sent to worker processes, and serialized.
+
+    Attributes
+    ----------
+    mach : tuple
+        Mach numbers of the table, increasing.
+    Cd : tuple
+        Drag coefficient at each Mach number.
+    """
+    def __init__(self, mach, Cd):
+        """Initialize a DragCurve object.
+
+        Parameters
+        ----------
+        mach : array_like
+            Mach numbers of the table, increasing.
+        Cd : array_like
+            Drag coefficient at each Mach number.
+        """
+        mach = np.asarray(mach, dtype = float)
+        Cd = np.asarray(Cd, dtype = float)
+        if mach.ndim != 1 or mach.shape != Cd.shape or len(mach) == 0:
+            raise ValueError("A drag curve needs a drag coefficient at each of its Mach numbers")
+        if np.any(np.diff(mach) <= 0):
+            raise ValueError("The Mach numbers of a drag curve must be increasing")
+        # tuples of Python floats, which are quickest for the single Mach numbers the flight stages look up
+        self.mach = tuple(mach.tolist())
+        self.Cd = tuple(Cd.tolist())
+
+    @classmethod
+    def from_function(cls, Cd_function, mach = None):
+        """
+        Tabulate a drag coefficient function.
+
+        Args
+        ----
+        Cd_function : function
+            Drag coefficient as a function of Mach number.
+        mach : array_like, optional
+            Mach numbers to tabulate it at. Defaults to every 0.01 from 0 to 3.
+
+        Returns
+        -------
+        DragCurve
+            The tabulated curve. It matches the function at the tabulated Mach numbers, and is linearly interpolated between them.
+        """
+        if mach is None:
+            mach = np.linspace(0, 3, 301)
+        return cls(mach, [Cd_function(float(Ma)) for Ma in mach])
+
+    def __call__(self, Ma):
+        if isinstance(Ma, np.ndarray):
+            return np.interp(Ma, self.mach, self.Cd)
+        mach = self.mach
+        if Ma <= mach[0]:
+            return self.Cd[0]
+        if Ma >= mach[-1]:
+            return self.Cd[-1]
+        i = bisect_right(mach, Ma)
+        fraction = (Ma - mach[i - 1]) / (mach[i] - mach[i - 1])
+        return self.Cd[i - 1] + fraction * (self.Cd[i] - self.Cd[i - 1])
+
+    def __eq__(self, other):
+        return isinstance(other, DragCurve) and self.mach == other.mach and self.Cd == other.Cd
+
+    def __hash__(self):
+        return hash((self.mach, self.Cd))
+
+    def __repr__(self):
+        return f"DragCurve({len(self.mach)} points, Mach {self.mach[0]:g} to {self.mach[-1]:g})"
@@ -8,6 +8,10 @@ class Launchpad:
     ----------
     rail_length : float
         Length of the launch rail (m).
+    launch_rail_elevation : float
+        Elevation of the launch rail (deg from horizontal).
+    launch_rail_heading : float
+        Launch rail heading (azimuth in deg clockwise from north).
 
     rail_unit_vector_x : float
         x-component of the unit vector pointing along the launch rail.
@@ -46,6 +50,8 @@ class Launchpad:
             Total force applied by all hold-down clamps to the rocket (N). Defaults to 0.
         """
         self.rail_length = rail_length
+        self.launch_rail_elevation = launch_rail_elevation
+        self.launch_rail_heading = launch_rail_heading
 
         launch_rail_heading = np.deg2rad(launch_rail_heading)
         if launch_rail_elevation == 90:
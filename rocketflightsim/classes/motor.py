@@ -18,6 +18,10 @@ class Motor:
         Dictionary of fuel mass (kg) at time after ignition (s).
     fuel_mass : float
         Total mass of fuel in the motor before ignition (kg).
+    original : Motor
+        The motor this motor is a simplified version of, or None if it isn't one.
+    simplified_motors : dict
+        Simplified versions of this motor made by simplify(), keyed by the tolerances they were made with.
     """
     # TODO add the ability to simply multiply a motor object by a scalar to get a motor object representing a cluster of that many motors?
 
@@ -69,3 +73,113 @@ class Motor:
                 self.burn_time: 0
                 }
 
+        self.original = None
+        self.simplified_motors = {}
+
+    def __getstate__(self):
+        # the cache of simplified motors isn't pickled, so sending a motor to worker processes only sends its own curves
+        state = self.__dict__.copy()
+        state['simplified_motors'] = {}
+        return state
+
+    def simplify(self, impulse_tolerance = 0.001, fuel_mass_tolerance = 0.001, thrust_tolerance = None):
+        """
+        Make a version of the motor with fewer points in its thrust and fuel mass curves, for faster thrust and mass lookups.
+
+        Points are removed with the Ramer-Douglas-Peucker algorithm, which keeps every removed point within a distance of the simplified curve. The largest thrust distance that keeps the change in total impulse within impulse_tolerance is searched for, and the fuel mass distance is fuel_mass_tolerance. The first and last points and the point of peak thrust are always kept, so the burn time and peak thrust are unchanged. When the two curves are given at the same times, they're simplified together and stay at the same times, as the liftoff search needs.
+
+        Args
+        ----
+        impulse_tolerance : float, optional
+            Largest allowed change in total impulse, as a fraction of the total impulse. Defaults to 0.001.
+        fuel_mass_tolerance : float, optional
+            Largest allowed change in fuel mass at any time, as a fraction of the fuel mass. Defaults to 0.001.
+        thrust_tolerance : float, optional
+            Largest allowed change in thrust at any time (N). Defaults to no limit beyond the one given by impulse_tolerance.
+
+        Returns
+        -------
+        Motor
+            The simplified motor, with this motor as its original. The result is cached in simplified_motors, so simplifying again with the same tolerances returns the same motor. Changing the curves of this motor afterwards doesn't clear the cache.
+        """
+        key = (impulse_tolerance, fuel_mass_tolerance, thrust_tolerance)
+        if key in self.simplified_motors:
+            return self.simplified_motors[key]
+
+        thrust_times = list(self.thrust_curve.keys())
+        thrust_time_array = np.array(thrust_times, dtype = float)
+        thrusts = np.array(list(self.thrust_curve.values()), dtype = float)
+        mass_times = list(self.fuel_mass_curve.keys())
+        masses = np.array(list(self.fuel_mass_curve.values()), dtype = float)
+        aligned = thrust_times == mass_times
+        max_mass_error = fuel_mass_tolerance * self.fuel_mass
+        peak = [int(np.argmax(thrusts))]
+
+        def simplified_thrust_indices(max_thrust_error):
+            if aligned:
+                return _simplified_indices(thrust_time_array, (thrusts, masses), (max_thrust_error, max_mass_error), peak)
+            return _simplified_indices(thrust_time_array, (thrusts,), (max_thrust_error,), peak)
+
+        def impulse_within_tolerance(kept):
+            return abs(np.trapezoid(thrusts[kept], thrust_time_array[kept]) - self.total_impulse) <= impulse_tolerance * abs(self.total_impulse)
+
+        # a thrust error of at most this anywhere can't change the total impulse by more than impulse_tolerance
+        max_thrust_error = impulse_tolerance * abs(self.total_impulse) / (thrust_times[-1] - thrust_times[0])
+        largest_thrust_error = thrust_tolerance if thrust_tolerance is not None else np.max(np.abs(thrusts))
+        max_thrust_error = min(max_thrust_error, largest_thrust_error)
+        kept_thrust = simplified_thrust_indices(max_thrust_error)
+
+        # errors above and below the curve mostly cancel out in the total impulse, so larger thrust errors usually keep it in tolerance. Search for the largest, checking the total impulse of each
+        upper = min(2 * max_thrust_error, largest_thrust_error)
+        while upper > max_thrust_error:
+            kept = simplified_thrust_indices(upper)
+            if not impulse_within_tolerance(kept):
+                break
+            max_thrust_error, kept_thrust = upper, kept
+            upper = min(2 * upper, largest_thrust_error)
+        for _ in range(8):
+            if upper <= max_thrust_error:
+                break
+            middle = (max_thrust_error + upper) / 2
+            kept = simplified_thrust_indices(middle)
+            if impulse_within_tolerance(kept):
+                max_thrust_error, kept_thrust = middle, kept
+            else:
+                upper = middle
+
+        kept_mass = kept_thrust if aligned else _simplified_indices(np.array(mass_times, dtype = float), (masses,), (max_mass_error,))
+
+        simplified = Motor(
+            {thrust_times[i]: self.thrust_curve[thrust_times[i]] for i in kept_thrust},
+            self.dry_mass,
+            fuel_mass_curve = {mass_times[i]: self.fuel_mass_curve[mass_times[i]] for i in kept_mass},
+        )
+        simplified.fuel_mass = self.fuel_mass
+        simplified.original = self
+        self.simplified_motors[key] = simplified
+        return simplified
+
+def _simplified_indices(times, curves, tolerances, always_keep = ()):
+    # Ramer-Douglas-Peucker on curves sampled at the same times, keeping a point if it's further than the tolerance from the chord in any of the curves
+    keep = np.zeros(len(times), dtype = bool)
+    keep[[0, -1]] = True
+    keep[list(always_keep)] = True
+    anchors = np.flatnonzero(keep)
+    segments = list(zip(anchors[:-1], anchors[1:]))
+    while segments:
+        start, end = segments.pop()
+        if end - start < 2:
+            continue
+        fraction = (times[start + 1:end] - times[start]) / (times[end] - times[start])
+        deviation = np.zeros(end - start - 1)
+        for values, tolerance in zip(curves, tolerances):
+            distance = np.abs(values[start + 1:end] - (values[start] + fraction * (values[end] - values[start])))
+            # deviation relative to the tolerance, so a point is kept if it's over 1 in any curve
+            deviation = np.maximum(deviation, distance / tolerance if tolerance > 0 else np.where(distance > 0, np.inf, 0))
+        furthest = int(np.argmax(deviation))
+        if deviation[furthest] > 1:
+            split = start + 1 + furthest
+            keep[split] = True
+            segments.append((start, split))
+            segments.append((split, end))
+    return np.flatnonzero(keep)
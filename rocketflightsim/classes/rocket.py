@@ -1,5 +1,15 @@
+import copy
+import functools
+
 from .motor import Motor
 
+# module-level functions bound with functools.partial rather than closures, so rockets can be pickled and sent to worker processes
+def _constant_Cd_A(Cd_A, Ma):
+    return Cd_A
+
+def _Cd_A_from_curve(Cd_rocket, A_rocket, Ma):
+    return Cd_rocket(Ma) * A_rocket
+
 class Rocket:
     """
     The Rocket class is used to store the properties of a rocket.
@@ -9,10 +19,10 @@ class Rocket:
     rocket_mass : float
         Dry mass of the rocket without the motor (kg).
     motor : Motor object
-        The rocket's motor.
+        The rocket's motor, or None for an airframe that a motor hasn't been chosen for yet.
     A_rocket : float
         Cross-sectional area of the rocket used when Cd_rocket was calculated (m^2).
-    Cd_rocket : float or function
+    Cd_rocket : float, DragCurve, or function
         Coefficient of drag of the rocket. May be given as a function of Mach number or as a constant.
     h_second_rail_button : float
         Height of the second rail button (or launch lug) from the bottom of the rocket (m). This is the upper button (or launch lug) if there are only 2.
@@ -37,11 +47,11 @@ class Rocket:
         rocket_mass : float
             Dry mass of the rocket without the motor (kg).
         motor : Motor object
-            The rocket's motor.
+            The rocket's motor. May be None for an airframe that a motor hasn't been chosen for yet, e.g. for motor selection. Such a rocket can't be simulated until it's given a motor with with_motor().
         A_rocket : float
             Cross-sectional area of the rocket used when the Cd_rocket was calculated (m^2).
-        Cd_rocket : float or function, optional
-            Coefficient of drag of the rocket. May be given as a function of Mach number or as a constant. Defaults to a constant 0.45, which is in the ballpark of what most student team competition rockets our size have.
+        Cd_rocket : float, DragCurve, or function, optional
+            Coefficient of drag of the rocket. May be given as a function of Mach number or as a constant. A DragCurve, a table of Cd against Mach number, keeps the rocket picklable and serializable, as does a function defined at the top level of a module. Defaults to a constant 0.45, which is in the ballpark of what most student team competition rockets our size have.
         h_second_rail_button : float, optional
             Height of the second rail button (or launch lug) from the bottom of the rocket (m). This is the upper button (or launch lug) if there are only 2. Defaults to 0.8m, which is reasonable for most student team competition rockets. Doesn't matter much if it's not set as it changes apogee by less than 10ft on a 10k ft launch when set to 0.
         """
@@ -52,13 +62,29 @@ class Rocket:
         self.Cd_rocket = Cd_rocket
         self.h_second_rail_button = h_second_rail_button
 
-        self.dry_mass = rocket_mass + motor.dry_mass
+        self.dry_mass = rocket_mass + (motor.dry_mass if motor is not None else 0)
         
         if callable(Cd_rocket):
-            def Cd_A_rocket_fn(Ma):
-                return Cd_rocket(Ma) * A_rocket
+            self.Cd_A_rocket = functools.partial(_Cd_A_from_curve, Cd_rocket, A_rocket)
         else:
-            Cd_A_rocket = Cd_rocket * A_rocket
-            def Cd_A_rocket_fn(Ma): return Cd_A_rocket
+            self.Cd_A_rocket = functools.partial(_constant_Cd_A, Cd_rocket * A_rocket)
             # TODO: make it actually operate as a constant if it's not a function
-        self.Cd_A_rocket = Cd_A_rocket_fn
\ No newline at end of file
+
+    def with_motor(self, motor):
+        """
+        Make a copy of the rocket with a different motor.
+
+        Args
+        ----
+        motor : Motor
+            The motor of the copy.
+
+        Returns
+        -------
+        Rocket
+            The copy. Everything but the motor and the dry mass is shared with this rocket.
+        """
+        rocket = copy.copy(self)
+        rocket.motor = motor
+        rocket.dry_mass = self.rocket_mass + (motor.dry_mass if motor is not None else 0)
+        return rocket
@@ -0,0 +1,103 @@
+import sys
+
+class SimStats:
+    """
+    The SimStats class is used to collect profiling information from simulations. Pass an instance to the flight stage functions or the combined flight functions to have them fill it in. A single instance can be reused across many flights to see where time goes in a batch.
+
+    Attributes
+    ----------
+    stages : dict
+        Statistics for each flight stage, keyed by stage name ('ignition_to_liftoff', 'rail', 'boost', 'coast', 'airbrakes', 'parachute'). Each value is a dictionary with the number of times the stage ran ('calls'), the total wall time ('wall_time', s), the number of simulated steps ('steps'), and the number of calls into the drag ('drag_calls'), motor ('motor_calls') and atmosphere ('atmosphere_calls') functions.
+    num_flights : int
+        Number of flights simulated by the combined flight functions.
+    peak_trajectory_memory : int
+        Largest estimated size in memory of the trajectory of a single flight, including the state tuples and the values in them (bytes).
+    callbacks : list
+        Functions called at each phase transition of the combined flight functions. Each is called as callback(event, state), where event is one of 'liftoff', 'rail_clearance', 'burnout', 'apogee', 'impact', or 'parachute_stop', and state is the state of the rocket at that moment.
+
+    Notes
+    -----
+    Steps and function calls are counted from the length of each stage's output once the stage is done, rather than inside the simulation loops, so that collecting statistics has no cost per step and passing no SimStats object has no cost at all. Each step of the rail and boost stages calls the motor functions twice (mass and thrust), the atmosphere functions once, and the drag function once. The coast and airbrakes stages don't call the motor functions, and the parachute stage doesn't call the rocket's drag function.
+    """
+    def __init__(self, callbacks = None):
+        """Initialize a SimStats object.
+
+        Parameters
+        ----------
+        callbacks : list, optional
+            Functions to call at each phase transition, as callback(event, state). Defaults to None.
+        """
+        self.stages = {}
+        self.num_flights = 0
+        self.peak_trajectory_memory = 0
+        self.callbacks = list(callbacks) if callbacks else []
+
+    def record_stage(self, stage, wall_time, steps = 0, drag_calls = 0, motor_calls = 0, atmosphere_calls = 0):
+        """ Adds the statistics of one run of a flight stage. """
+        stats = self.stages.setdefault(stage, {
+            'calls': 0,
+            'wall_time': 0.0,
+            'steps': 0,
+            'drag_calls': 0,
+            'motor_calls': 0,
+            'atmosphere_calls': 0,
+        })
+        stats['calls'] += 1
+        stats['wall_time'] += wall_time
+        stats['steps'] += steps
+        stats['drag_calls'] += drag_calls
+        stats['motor_calls'] += motor_calls
+        stats['atmosphere_calls'] += atmosphere_calls
+
+    def start_flight(self):
+        """ Marks the start of a new flight. Called by the combined flight functions. """
+        self.num_flights += 1
+
+    def phase_transition(self, event, flightpath):
+        """ Records the size of the trajectory so far and calls the callbacks with the last state. Called by the combined flight functions. """
+        self.peak_trajectory_memory = max(self.peak_trajectory_memory, trajectory_memory(flightpath))
+        for callback in self.callbacks:
+            callback(event, flightpath[-1])
+
+    @property
+    def wall_time(self):
+        """ Returns the total wall time spent in the flight stages (s). """
+        return sum(stats['wall_time'] for stats in self.stages.values())
+
+    @property
+    def steps(self):
+        """ Returns the total number of simulated steps. """
+        return sum(stats['steps'] for stats in self.stages.values())
+
+    def summary(self):
+        """ Returns a table of the statistics of each stage as a string. """
+        total_time = self.wall_time or 1
+        lines = [f"{'stage':<20}{'calls':>8}{'wall time (s)':>15}{'% time':>8}{'steps':>10}{'steps/s':>12}{'drag':>10}{'motor':>10}{'atmosphere':>12}"]
+        for stage, stats in self.stages.items():
+            steps_per_second = stats['steps'] / stats['wall_time'] if stats['wall_time'] and stats['steps'] else 0
+            lines.append(f"{stage:<20}{stats['calls']:>8}{stats['wall_time']:>15.4f}{stats['wall_time'] / total_time * 100:>8.1f}{stats['steps']:>10}{steps_per_second:>12.0f}{stats['drag_calls']:>10}{stats['motor_calls']:>10}{stats['atmosphere_calls']:>12}")
+        lines.append(f"{self.num_flights} flight(s), peak trajectory memory {self.peak_trajectory_memory / 1024:.1f} KiB")
+        return "\n".join(lines)
+
+def trajectory_memory(flightpath):
+    """
+    Estimate the size in memory of a trajectory stored as a list of state tuples.
+
+    Args
+    ----
+    flightpath : list
+        A list of state tuples.
+
+    Returns
+    -------
+    int
+        Estimated size of the list, its tuples, and the values in them (bytes). Assumes every state is the same size as the last one.
+    """
+    if not flightpath:
+        return sys.getsizeof(flightpath)
+    state = flightpath[-1]
+    if isinstance(state, tuple):
+        state_size = sys.getsizeof(state) + sum(sys.getsizeof(value) for value in state)
+    else:
+        state_size = sys.getsizeof(state)
+    return sys.getsizeof(flightpath) + len(flightpath) * state_size
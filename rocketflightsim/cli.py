@@ -0,0 +1,273 @@
+""" The rfs command line batch runner.
+
+Runs the flights listed in a JSON job file on a pool of worker processes and streams one JSON record per flight, as each finishes, to a JSONL file. Rerunning a job file with the same output file skips the jobs that already have a record, so a sweep interrupted by a crash or a reboot picks up where it stopped.
+
+    rfs run jobs.json -o results.jsonl --processes 8
+    rfs list jobs.json
+    rfs serve --port 8765
+
+A job file holds default request values, a list of jobs, and a list of sweeps:
+
+    {
+        "defaults": {"rocket": "ndrt_rocket.json", "environment": {...}, "launchpad": {...}, "flight": "apogee", "timestep": 0.01},
+        "jobs": [
+            {"id": "nominal"},
+            {"id": "hot day", "environment": {"launchpad_temp": 35}}
+        ],
+        "sweeps": [
+            {"id": "wind", "mode": "grid", "parameters": {"environment.mean_wind_speed": [0, 2, 4, 6], "launchpad.launch_rail_elevation": [84, 87, 90]}}
+        ]
+    }
+
+Requests are as taken by the simulation service (see tools.simulation_service.SimulationService.submit), with configurations as dictionaries (see serialization). A configuration given as a string is the path of a JSON file holding it, relative to the job file. Each job's values are merged into the defaults, key by key. Sweeps set the parameters at their dotted paths to every combination of their values ('grid', the default) or to the values at the same position in each list ('zip'), and their jobs are numbered, e.g. 'wind/0007'.
+
+Each record holds the job's 'id', 'status' ('ok' or 'error'), the swept 'parameters', the flight summary as 'result' (see tools.simulation_service.flight_summary) or the 'error', and the 'wall_time' of the simulation (s).
+"""
+import sys
+import os
+import argparse
+import copy
+import itertools
+import json
+import time
+
+from .parallel import run_in_parallel, SharedTables, share_tables
+
+def _merge(base, overrides):
+    # merges dictionaries key by key, replacing everything else
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+def _set_path(request, path, value):
+    keys = path.split('.')
+    target = request
+    for key in keys[:-1]:
+        if not isinstance(target.get(key), dict):
+            raise ValueError(f"Sweep parameter '{path}' doesn't lead to a value in the request")
+        target = target[key]
+    target[keys[-1]] = value
+
+def _load_configs(request, directory):
+    # configurations given as paths are loaded from JSON files
+    for key in ('rocket', 'environment', 'launchpad'):
+        if isinstance(request.get(key), str):
+            with open(os.path.join(directory, request[key])) as file:
+                request[key] = json.load(file)
+    return request
+
+def expand_jobs(job_file):
+    """
+    List the jobs of a job file.
+
+    Args
+    ----
+    job_file : str or dict
+        Path of a JSON job file, or its contents.
+
+    Returns
+    -------
+    list
+        A tuple (id, parameters, request) for each job: its id, the values of the swept parameters (empty for jobs that aren't from a sweep), and its simulation request.
+    """
+    directory = '.'
+    if isinstance(job_file, str):
+        directory = os.path.dirname(os.path.abspath(job_file))
+        with open(job_file) as file:
+            job_file = json.load(file)
+    unknown_keys = set(job_file) - {'defaults', 'jobs', 'sweeps'}
+    if unknown_keys:
+        raise ValueError(f"Unknown key(s) in job file: {', '.join(sorted(unknown_keys))}. Must be among defaults, jobs, sweeps")
+    defaults = _load_configs(copy.deepcopy(job_file.get('defaults', {})), directory)
+
+    jobs = []
+    for i, job in enumerate(job_file.get('jobs', [])):
+        job = dict(job)
+        job_id = str(job.pop('id', i))
+        jobs.append((job_id, {}, _merge(defaults, _load_configs(job, directory))))
+
+    for i, sweep in enumerate(job_file.get('sweeps', [])):
+        sweep_id = str(sweep.get('id', f"sweep {i}"))
+        base = _merge(defaults, _load_configs(dict(sweep.get('base', {})), directory))
+        paths = list(sweep['parameters'])
+        value_lists = [sweep['parameters'][path] for path in paths]
+        mode = sweep.get('mode', 'grid')
+        if mode == 'grid':
+            combinations = list(itertools.product(*value_lists))
+        elif mode == 'zip':
+            if len({len(values) for values in value_lists}) > 1:
+                raise ValueError(f"The parameters of zip sweep '{sweep_id}' need the same number of values")
+            combinations = list(zip(*value_lists))
+        else:
+            raise ValueError(f"Invalid sweep mode '{mode}'. Must be 'grid' or 'zip'")
+        width = len(str(max(len(combinations) - 1, 0)))
+        for j, values in enumerate(combinations):
+            request = copy.deepcopy(base)
+            for path, value in zip(paths, values):
+                _set_path(request, path, value)
+            jobs.append((f"{sweep_id}/{j:0{width}d}", dict(zip(paths, values)), request))
+
+    ids = [job_id for job_id, _, _ in jobs]
+    if len(set(ids)) != len(ids):
+        duplicates = sorted({job_id for job_id in ids if ids.count(job_id) > 1})
+        raise ValueError(f"Duplicate job id(s): {', '.join(duplicates)}")
+    return jobs
+
+def finished_jobs(output_path, include_errors = True):
+    """
+    Find the jobs that already have a record in an output file.
+
+    Args
+    ----
+    output_path : str
+        Path of the JSONL output file.
+    include_errors : bool, optional
+        Whether jobs whose record is an error count as finished. Defaults to True.
+
+    Returns
+    -------
+    set
+        The ids of the finished jobs. A partly written last line, left by a crash, and lines that aren't job records are ignored.
+    """
+    finished = set()
+    if not os.path.exists(output_path):
+        return finished
+    with open(output_path) as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            # lines that aren't job records, e.g. added by hand
+            if not isinstance(record, dict) or record.get('id') is None:
+                continue
+            if include_errors or record.get('status') == 'ok':
+                finished.add(record['id'])
+    return finished
+
+def _run_job(shared, job):
+    from .tools.simulation_service import normalize_request, simulate_request
+    job_id, parameters, request = job
+    record = {'id': job_id, 'status': 'ok', 'parameters': parameters}
+    start_time = time.perf_counter()
+    try:
+        record['result'] = simulate_request(normalize_request(request))
+    except Exception as error:
+        record['status'] = 'error'
+        record['error'] = f"{type(error).__name__}: {error}"
+    record['wall_time'] = time.perf_counter() - start_time
+    return record
+
+def run_jobs(job_file, output_path, processes = None, chunksize = None, retry_errors = False, progress = None):
+    """
+    Run the jobs of a job file that don't have a record in the output file yet, appending a record for each to it as it finishes.
+
+    Args
+    ----
+    job_file : str or dict
+        Path of a JSON job file, or its contents.
+    output_path : str
+        Path of the JSONL output file. Created if it doesn't exist.
+    processes : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    chunksize : int, optional
+        Number of jobs sent to a worker at a time. Workers take the next chunk as soon as they finish one, so small chunks balance uneven jobs. Defaults to about 8 chunks per worker, and no more than 16 jobs per chunk.
+    retry_errors : bool, optional
+        Whether to rerun jobs whose record is an error. Defaults to False.
+    progress : file, optional
+        A file to report progress to, e.g. sys.stderr. Defaults to None, for no reports.
+
+    Returns
+    -------
+    dict
+        The number of jobs in the job file ('jobs'), already finished and skipped ('skipped'), run ('run'), and of those that failed ('errors').
+    """
+    jobs = expand_jobs(job_file)
+    finished = finished_jobs(output_path, include_errors = not retry_errors)
+    to_run = [job for job in jobs if job[0] not in finished]
+    counts = {'jobs': len(jobs), 'skipped': len(jobs) - len(to_run), 'run': 0, 'errors': 0}
+    if not to_run:
+        return counts
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, min(16, len(to_run) // (8 * processes)))
+
+    # a crash can leave a partly written last line, which the next record mustn't be appended to
+    if os.path.exists(output_path) and os.path.getsize(output_path):
+        with open(output_path, 'rb') as file:
+            file.seek(-1, os.SEEK_END)
+            needs_newline = file.read(1) != b'\n'
+    else:
+        needs_newline = False
+
+    with open(output_path, 'a') as output, SharedTables() as tables:
+        if needs_newline:
+            output.write('\n')
+        if processes > 1:
+            # jobs carry handles to their curves in shared memory, which jobs with the same curves share, rather than copies of them
+            to_run = [(job_id, parameters, share_tables(request, tables)) for job_id, parameters, request in to_run]
+        for record in run_in_parallel(_run_job, to_run, processes = processes, chunksize = chunksize, ordered = False):
+            output.write(json.dumps(record) + '\n')
+            output.flush()
+            counts['run'] += 1
+            counts['errors'] += record['status'] == 'error'
+            if progress is not None:
+                print(f"[{counts['run']}/{len(to_run)}] {record['id']}: {record['status']}", file = progress)
+    return counts
+
+def _run_command(args):
+    counts = run_jobs(args.job_file, args.output, args.processes, args.chunksize, args.retry_errors, progress = None if args.quiet else sys.stderr)
+    print(f"{counts['run']} jobs run ({counts['errors']} failed), {counts['skipped']} already finished, {counts['jobs']} in total", file = sys.stderr)
+    return 1 if counts['errors'] else 0
+
+def _list_command(args):
+    for job_id, parameters, request in expand_jobs(args.job_file):
+        print(job_id, json.dumps(parameters) if parameters else '')
+    return 0
+
+def _serve_command(args):
+    from .tools.simulation_service import serve
+    serve(args.host, args.port, verbose = args.verbose, processes = args.processes, cache_size = args.cache_size)
+    return 0
+
+def main(argv = None):
+    """ Entry point of the rfs command. Returns the exit code. """
+    parser = argparse.ArgumentParser(prog = 'rfs', description = 'RocketFlightSim command line batch runner.')
+    subparsers = parser.add_subparsers(dest = 'command', required = True)
+
+    run_parser = subparsers.add_parser('run', help = 'run the jobs of a job file, streaming a JSONL record per flight')
+    run_parser.add_argument('job_file', help = 'JSON job file')
+    run_parser.add_argument('-o', '--output', required = True, help = 'JSONL output file. Jobs that already have a record in it are skipped')
+    run_parser.add_argument('-p', '--processes', type = int, default = None, help = 'number of worker processes (default: number of CPUs)')
+    run_parser.add_argument('--chunksize', type = int, default = None, help = 'jobs sent to a worker at a time (default: automatic)')
+    run_parser.add_argument('--retry-errors', action = 'store_true', help = 'rerun jobs whose record is an error')
+    run_parser.add_argument('-q', '--quiet', action = 'store_true', help = "don't report each finished job")
+    run_parser.set_defaults(handler = _run_command)
+
+    list_parser = subparsers.add_parser('list', help = 'list the jobs of a job file and their swept parameters')
+    list_parser.add_argument('job_file', help = 'JSON job file')
+    list_parser.set_defaults(handler = _list_command)
+
+    serve_parser = subparsers.add_parser('serve', help = 'run the local simulation service')
+    serve_parser.add_argument('--host', default = '127.0.0.1', help = 'address to listen on')
+    serve_parser.add_argument('--port', type = int, default = 8765, help = 'port to listen on')
+    serve_parser.add_argument('-p', '--processes', type = int, default = None, help = 'number of worker processes (default: number of CPUs)')
+    serve_parser.add_argument('--cache-size', type = int, default = 1024, help = 'maximum number of cached results')
+    serve_parser.add_argument('--verbose', action = 'store_true', help = 'log each request')
+    serve_parser.set_defaults(handler = _serve_command)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args)
+    except (OSError, ValueError, KeyError) as error:
+        print(f"rfs: error: {error}", file = sys.stderr)
+        return 2
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -30,6 +30,7 @@ adiabatic_index_air_times_R_specific_air = adiabatic_index_air * R_specific_air
 # Conversion factors
 ft_to_m_conversion = 0.3048 # m/ft
 m_to_ft_conversion = 1/ft_to_m_conversion  # ft/m
+mph_to_m_per_s_conversion = 0.44704 # (m/s)/mph
 
 # Default launch site values. Specific launch site values can be set in Environment objects
 F_gravity = 9.80665  # m/s^2 TODO rename a_gravity everywhere?
@@ -37,10 +38,15 @@ T_lapse_rate = -0.0065  # K/m
 
 # Default timestep for the simulation
 default_timestep = 0.02  # s
+timestep_phases = ('rail', 'boost', 'coast', 'descent')  # phases that can be given their own timestep in the combined flight functions
 """ Notes on timesteps:
 
 The default for OpenRocket sims is 0.01s for the first while, and then somewhere between 0.02 and 0.05 for a while, and then 0.05 for most of the rest of the ascent. It simulates more complicated dynamics than we do
 
 A timestep of 0.02s gives apogees a difference of a few feet for a 10k launch compared to using 0.001s. 0.001s can still be used for one-off sims, but when running many sims, 0.02s is better.
 TODO: check that again when done splitting the sim into stages
-"""
\ No newline at end of file
+
+The combined flight functions also take a timestep schedule: a dictionary of timesteps keyed by flight phase (see timestep_phases), so each phase can use its own timestep like OpenRocket does. Boost sees the largest accelerations and benefits most from fine steps, while the descent under a parachute is close to terminal velocity and converges at much coarser steps. Use tools/timestep_convergence.py to get a schedule for a given rocket.
+"""
+# Columns of the state tuples returned by the flight stages, in order
+state_columns = ('time', 'x', 'y', 'z', 'v_x', 'v_y', 'v_z', 'a_x', 'a_y', 'a_z')
@@ -0,0 +1,168 @@
+""" Locating events, such as apogee or a parachute's stop condition, between the steps of the flight stages.
+
+Each flight stage steps until an event has happened, then replaces its last state with the state at the moment of the event, found on the step's dense output:
+- time and velocity change linearly over a step, as the stages hold the acceleration constant over it
+- position follows the cubic Hermite polynomial through the positions and velocities at each end of the step
+- the acceleration is that of the step, and any other values of the state (e.g. the airbrake deployment angle) change linearly
+
+An event is a function of a state that is positive before the event and zero or negative once it has happened. Its time is found by a root solve on the dense output, or by bisection for events given as a predicate, so coarse timesteps still give precise event states.
+"""
+
+# conditions the flight stages can stop on, and the value of the event for a state
+def _apogee(state):
+    return state[6]
+
+def _impact(state):
+    return state[3]
+
+event_conditions = ('apogee', 'impact', 'landed', 'below_altitude', 'above_altitude', 'after_delay', 'at_time')
+
+def event_function(condition, value = None, start_time = None):
+    """
+    Make the event function of a stop condition.
+
+    Args
+    ----
+    condition : str or function
+        The condition: 'apogee' (vertical velocity reaches zero), 'impact' or 'landed' (altitude reaches zero), 'below_altitude' or 'above_altitude' (altitude crosses value), 'after_delay' (value seconds after start_time), or 'at_time' (time reaches value). Can also be a predicate, a function that takes a state tuple and returns True once the event has happened.
+    value : float, optional
+        The altitude (m), delay (s), or time (s) of the condition.
+    start_time : float, optional
+        The time the delay of 'after_delay' starts at (s).
+
+    Returns
+    -------
+    function
+        A function that takes a state and returns a value that is positive before the event and zero or negative once it has happened.
+    """
+    if callable(condition):
+        def event(state):
+            return -1.0 if condition(state) else 1.0
+        event.is_predicate = True
+        return event
+    if condition == 'apogee':
+        return _apogee
+    if condition in ('impact', 'landed'):
+        return _impact
+    if condition == 'below_altitude':
+        return lambda state: state[3] - value
+    if condition == 'above_altitude':
+        return lambda state: value - state[3]
+    if condition == 'after_delay':
+        stop_time = start_time + value
+        return lambda state: stop_time - state[0]
+    if condition == 'at_time':
+        return lambda state: value - state[0]
+    raise ValueError(f"Invalid event condition '{condition}'. Must be a function or one of {', '.join(event_conditions)}")
+
+def dense_state(state_1, state_2, fraction):
+    """
+    Interpolate the state at a fraction of the way through a step.
+
+    Args
+    ----
+    state_1 : tuple
+        The state at the start of the step. Only its time, position, and velocity, and any values after the acceleration, are used.
+    state_2 : tuple
+        The state at the end of the step.
+    fraction : float
+        Fraction of the way through the step, from 0 to 1.
+
+    Returns
+    -------
+    tuple
+        The interpolated state, with as many values as state_2.
+    """
+    timestep = state_2[0] - state_1[0]
+    fraction_2 = fraction * fraction
+    fraction_3 = fraction_2 * fraction
+    # cubic Hermite basis functions
+    h_00 = 2 * fraction_3 - 3 * fraction_2 + 1
+    h_10 = (fraction_3 - 2 * fraction_2 + fraction) * timestep
+    h_01 = -2 * fraction_3 + 3 * fraction_2
+    h_11 = (fraction_3 - fraction_2) * timestep
+
+    state = [state_1[0] + fraction * timestep]
+    for i in (1, 2, 3):
+        state.append(h_00 * state_1[i] + h_10 * state_1[i + 3] + h_01 * state_2[i] + h_11 * state_2[i + 3])
+    for i in (4, 5, 6):
+        state.append(state_1[i] + fraction * (state_2[i] - state_1[i]))
+    state.extend(state_2[7:10])
+    for i in range(10, len(state_2)):
+        state.append(state_1[i] + fraction * (state_2[i] - state_1[i]) if i < len(state_1) else state_2[i])
+    return tuple(state)
+
+def locate_event(state_1, state_2, event, tolerance = 1e-12, max_iterations = 60):
+    """
+    Find the state at which an event happens during a step.
+
+    Args
+    ----
+    state_1 : tuple
+        The state at the start of the step, before the event.
+    state_2 : tuple
+        The state at the end of the step, at or after the event.
+    event : function
+        The event function, as made by event_function.
+    tolerance : float, optional
+        Tolerance on the fraction of the step at which the event happens. Defaults to 1e-12.
+    max_iterations : int, optional
+        Maximum number of iterations of the root solve. Defaults to 60.
+
+    Returns
+    -------
+    tuple
+        The state at the event.
+    """
+    g_1 = event(state_1)
+    g_2 = event(state_2)
+    if g_1 <= 0:
+        return dense_state(state_1, state_2, 0)
+    if g_2 > 0:
+        return tuple(state_2)
+
+    low, high = 0.0, 1.0
+    if getattr(event, 'is_predicate', False):
+        # bisection, as a predicate only says which side of the event a state is on
+        for _ in range(max_iterations):
+            if high - low <= tolerance:
+                break
+            middle = (low + high) / 2
+            if event(dense_state(state_1, state_2, middle)) > 0:
+                low = middle
+            else:
+                high = middle
+        return dense_state(state_1, state_2, high)
+
+    # Illinois variant of the method of false position, which keeps the event bracketed. Exact in one iteration for events linear in time, such as apogee and delays
+    fraction = high
+    for _ in range(max_iterations):
+        fraction = low + (high - low) * g_1 / (g_1 - g_2)
+        g = event(dense_state(state_1, state_2, fraction))
+        if g == 0 or high - low <= tolerance:
+            break
+        if g > 0:
+            low, g_1 = fraction, g
+            g_2 /= 2
+        else:
+            high, g_2 = fraction, g
+            g_1 /= 2
+    return dense_state(state_1, state_2, fraction)
+
+def end_at_event(simulated_states, initial_state_vector, event):
+    """
+    Replace the last of a stage's states with the state at the event that ended the stage.
+
+    Args
+    ----
+    simulated_states : list
+        The states simulated by the stage. The last one must be at or after the event and the one before it before the event.
+    initial_state_vector : tuple
+        The state the stage started from, used as the start of the step when the stage took a single step.
+    event : function
+        The event function, as made by event_function.
+    """
+    if not simulated_states:
+        return
+    previous_state = simulated_states[-2] if len(simulated_states) >= 2 else initial_state_vector
+    simulated_states[-1] = locate_event(previous_state, simulated_states[-1], event)
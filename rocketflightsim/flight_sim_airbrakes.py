@@ -1,10 +1,13 @@
+from time import perf_counter
+
 import numpy as np
 
 from . import helper_functions as hfunc
 from . import constants as con
+from .events import event_function, end_at_event
 
 # Flight simulation with airbrakes - max deployment
-def sim_max_airbrakes_deployment_to_apogee(rocket, environment, airbrakes, initial_state_vector, timestep = con.default_timestep):
+def sim_max_airbrakes_deployment_to_apogee(rocket, environment, airbrakes, initial_state_vector, timestep = con.default_timestep, stats = None):
     """
     Simulate a rocket's flight from the moment airbrake deployment begins until apogee, given the airbrakes deploy to their maximum extent as quickly as possible and remain fully deployed until apogee.
 
@@ -17,16 +20,19 @@ def sim_max_airbrakes_deployment_to_apogee(rocket, environment, airbrakes, initi
     airbrakes : Airbrakes
         An instance of the Airbrakes class.
     initial_state_vector : tuple
-        A tuple detailing the state of the rocket at the time airbrake deployment begins. AAA
+        A tuple detailing the state of the rocket at the time airbrake deployment begins, or at a checkpoint during deployment. If it has an 11th value, it's taken as the deployment angle the airbrakes are already at (rad).
     timestep : float, optional
         The time increment for the simulation in seconds.
+    stats : SimStats, optional
+        A SimStats object to record the stage's run time and step count in. Defaults to None.
 
     Returns
     -------
     list
-        A list of tuples containing the state of the rocket at each timestep. Each tuple contains the time, x, y, z, v_x, v_y, v_z, a_x, a_y, a_z, and deployment_angle of the rocket at that time.
+        A list of tuples containing the state of the rocket at each timestep. Each tuple contains the time, x, y, z, v_x, v_y, v_z, a_x, a_y, a_z, and deployment_angle of the rocket at that time. The last state is the state at apogee, located between timesteps.
     """
-    # TODO maybe after first implementation, have it determine the exact state (between timesteps) at apogee and replace the last state with that
+    if stats is not None:
+        start_time = perf_counter()
 
     # unpack environmental variables
     launchpad_temp = environment.launchpad_temp
@@ -64,12 +70,15 @@ def sim_max_airbrakes_deployment_to_apogee(rocket, environment, airbrakes, initi
     v_y = initial_state_vector[5]
     v_z = initial_state_vector[6]
     groundspeed = np.sqrt(v_x**2 + v_y**2 + v_z**2) # will be used for AoA
-    airspeed = np.sqrt((v_x - 0.2*windspeed_x)**2 + (v_y - 0.2*windspeed_y)**2 + v_z**2)
+    # deployment starts from a coast state with a fifth of the wind in the first airspeed. A state from part way through deployment (with a deployment angle) carries on with the full wind, as the steps before it did
+    wind_fraction = 1 if len(initial_state_vector) > 10 else 0.2
+    airspeed = np.sqrt((v_x - wind_fraction*windspeed_x)**2 + (v_y - wind_fraction*windspeed_y)**2 + v_z**2)
 
     compass_heading = np.arctan(v_x / v_y)
     angle_to_vertical = np.arccos(v_z / airspeed)
 
-    deployment_angle = 0
+    # resuming from a state with airbrakes already deployed
+    deployment_angle = initial_state_vector[10] if len(initial_state_vector) > 10 else 0
 
     simulated_states = []
 
@@ -124,10 +133,17 @@ def sim_max_airbrakes_deployment_to_apogee(rocket, environment, airbrakes, initi
             )
         )
 
+    # replace the last state with the state at apogee
+    end_at_event(simulated_states, initial_state_vector, event_function('apogee'))
+
+    if stats is not None:
+        steps = len(simulated_states)
+        stats.record_stage('airbrakes', perf_counter() - start_time, steps = steps, drag_calls = steps, atmosphere_calls = steps)
+
     return simulated_states
 
 # Flight simulation with airbrakes - deployed as a function of height
-def sim_airbrakes_deployment_to_apogee_fn_height(rocket, environment, airbrakes, initial_state_vector, deployment_function, timestep = con.default_timestep):
+def sim_airbrakes_deployment_to_apogee_fn_height(rocket, environment, airbrakes, initial_state_vector, deployment_function, timestep = con.default_timestep, stats = None):
     """
     Simulate a rocket's flight from the moment airbrake deployment begins until apogee, given the airbrakes deploy according to a given deployment function.
 
@@ -140,18 +156,21 @@ def sim_airbrakes_deployment_to_apogee_fn_height(rocket, environment, airbrakes,
     airbrakes : Airbrakes
         An instance of the Airbrakes class.
     initial_state_vector : tuple
-        A tuple detailing the state of the rocket at the time airbrake deployment begins. AAA
+        A tuple detailing the state of the rocket at the time airbrake deployment begins, or at a checkpoint during deployment. If it has an 11th value (the deployment angle, as in the states this function returns), it's taken as a state from part way through deployment, and its airspeed uses the full wind as the steps before it did. The angle itself is given by deployment_function.
     deployment_function : function
         A function that takes the height of the rocket (in meters) as an argument and returns the angle of airbrakes deployment at that height (in radians).
     timestep : float, optional
         The time increment for the simulation in seconds.
+    stats : SimStats, optional
+        A SimStats object to record the stage's run time and step count in. Defaults to None.
 
     Returns
     -------
     list
-        A list of tuples containing the state of the rocket at each timestep. Each tuple contains the time, x, y, z, v_x, v_y, v_z, a_x, a_y, a_z, and deployment_angle of the rocket at that time.
+        A list of tuples containing the state of the rocket at each timestep. Each tuple contains the time, x, y, z, v_x, v_y, v_z, a_x, a_y, a_z, and deployment_angle of the rocket at that time. The last state is the state at apogee, located between timesteps.
     """
-    # TODO maybe after first implementation, have it determine the exact state (between timesteps) at apogee and replace the last state with that
+    if stats is not None:
+        start_time = perf_counter()
 
     # unpack environmental variables
     launchpad_temp = environment.launchpad_temp
@@ -179,14 +198,16 @@ def sim_airbrakes_deployment_to_apogee_fn_height(rocket, environment, airbrakes,
 
     # unpack simulation variables
     time = initial_state_vector[0]
-    # x = initial_state_vector[1]
-    # y = initial_state_vector[2]
-    z = initial_state_vector[1]
-    v_x = initial_state_vector[2]
-    v_y = initial_state_vector[3]
-    v_z = initial_state_vector[4]
+    x = initial_state_vector[1]
+    y = initial_state_vector[2]
+    z = initial_state_vector[3]
+    v_x = initial_state_vector[4]
+    v_y = initial_state_vector[5]
+    v_z = initial_state_vector[6]
     groundspeed = np.sqrt(v_x**2 + v_y**2 + v_z**2) # will be used for AoA
-    airspeed = np.sqrt((v_x - 0.2*windspeed_x)**2 + (v_y - 0.2*windspeed_y)**2 + v_z**2)
+    # deployment starts from a coast state with a fifth of the wind in the first airspeed. A state from part way through deployment (with a deployment angle) carries on with the full wind, as the steps before it did
+    wind_fraction = 1 if len(initial_state_vector) > 10 else 0.2
+    airspeed = np.sqrt((v_x - wind_fraction*windspeed_x)**2 + (v_y - wind_fraction*windspeed_y)**2 + v_z**2)
 
     compass_heading = np.arctan(v_x / v_y)
     angle_to_vertical = np.arccos(v_z / airspeed)
@@ -215,9 +236,8 @@ def sim_airbrakes_deployment_to_apogee_fn_height(rocket, environment, airbrakes,
         v_y += a_y * timestep
         v_z += a_z * timestep
 
-        # add x and y after finishing implementation and comparing speed to old version
-        # x += v_x * timestep
-        # y += v_y * timestep
+        x += v_x * timestep
+        y += v_y * timestep
         z += v_z * timestep
 
         # determine new headings
@@ -231,8 +251,8 @@ def sim_airbrakes_deployment_to_apogee_fn_height(rocket, environment, airbrakes,
         simulated_states.append(
             (
                 time,
-                # x,
-                # y,
+                x,
+                y,
                 z,
                 v_x,
                 v_y,
@@ -244,9 +264,16 @@ def sim_airbrakes_deployment_to_apogee_fn_height(rocket, environment, airbrakes,
             )
         )
 
+    # replace the last state with the state at apogee
+    end_at_event(simulated_states, initial_state_vector, event_function('apogee'))
+
+    if stats is not None:
+        steps = len(simulated_states)
+        stats.record_stage('airbrakes', perf_counter() - start_time, steps = steps, drag_calls = steps, atmosphere_calls = steps)
+
     return simulated_states
 
-def sim_airbrakes_deployment_to_apogee_fn_time(rocket, environment, airbrakes, initial_state_vector, deployment_function, timestep = con.default_timestep):
+def sim_airbrakes_deployment_to_apogee_fn_time(rocket, environment, airbrakes, initial_state_vector, deployment_function, timestep = con.default_timestep, stats = None):
     """
     Simulate a rocket's flight from the moment airbrake deployment begins until apogee, given the airbrakes deploy according to a given deployment function.
 
@@ -259,18 +286,21 @@ def sim_airbrakes_deployment_to_apogee_fn_time(rocket, environment, airbrakes, i
     airbrakes : Airbrakes
         An instance of the Airbrakes class.
     initial_state_vector : tuple
-        A tuple detailing the state of the rocket at the time airbrake deployment begins. AAA
+        A tuple detailing the state of the rocket at the time airbrake deployment begins, or at a checkpoint during deployment. If it has an 11th value (the deployment angle, as in the states this function returns), it's taken as a state from part way through deployment, and its airspeed uses the full wind as the steps before it did. The angle itself is given by deployment_function.
     deployment_function : function
-        A function that takes the time since airbrake deployment began (in seconds) as an argument and returns the angle of airbrakes deployment at that time (in radians).
+        A function that takes the time of the state (in seconds after ignition) as an argument and returns the angle of airbrakes deployment at that time (in radians).
     timestep : float, optional
         The time increment for the simulation in seconds.
+    stats : SimStats, optional
+        A SimStats object to record the stage's run time and step count in. Defaults to None.
 
     Returns
     -------
     list
-        A list of tuples containing the state of the rocket at each timestep. Each tuple contains the time, x, y, z, v_x, v_y, v_z, a_x, a_y, a_z, and deployment_angle of the rocket at that time.
+        A list of tuples containing the state of the rocket at each timestep. Each tuple contains the time, x, y, z, v_x, v_y, v_z, a_x, a_y, a_z, and deployment_angle of the rocket at that time. Each state is stamped with the time at the end of its step, as in the other airbrake stages, and its deployment_angle is the one deployment_function gave for the start of the step. The last state is the state at apogee, located between timesteps.
     """
-    # TODO maybe after first implementation, have it determine the exact state (between timesteps) at apogee and replace the last state with that
+    if stats is not None:
+        start_time = perf_counter()
 
     # unpack environmental variables
     launchpad_temp = environment.launchpad_temp
@@ -305,7 +335,9 @@ def sim_airbrakes_deployment_to_apogee_fn_time(rocket, environment, airbrakes, i
     v_y = initial_state_vector[5]
     v_z = initial_state_vector[6]
     groundspeed = np.sqrt(v_x**2 + v_y**2 + v_z**2) # will be used for AoA
-    airspeed = np.sqrt((v_x - 0.2*windspeed_x)**2 + (v_y - 0.2*windspeed_y)**2 + v_z**2)
+    # deployment starts from a coast state with a fifth of the wind in the first airspeed. A state from part way through deployment (with a deployment angle) carries on with the full wind, as the steps before it did
+    wind_fraction = 1 if len(initial_state_vector) > 10 else 0.2
+    airspeed = np.sqrt((v_x - wind_fraction*windspeed_x)**2 + (v_y - wind_fraction*windspeed_y)**2 + v_z**2)
 
     compass_heading = np.arctan(v_x / v_y)
     angle_to_vertical = np.arccos(v_z / airspeed)
@@ -343,9 +375,15 @@ def sim_airbrakes_deployment_to_apogee_fn_time(rocket, environment, airbrakes, i
         compass_heading = np.arctan(v_x / v_y)
         angle_to_vertical = np.arccos(v_z / airspeed)
 
+        time += timestep
 
         simulated_states.append((time, x, y, z, v_x, v_y, v_z, a_x, a_y, a_z, deployment_angle))
 
-        time += timestep
+    # replace the last state with the state at apogee
+    end_at_event(simulated_states, initial_state_vector, event_function('apogee'))
+
+    if stats is not None:
+        steps = len(simulated_states)
+        stats.record_stage('airbrakes', perf_counter() - start_time, steps = steps, drag_calls = steps, atmosphere_calls = steps)
 
     return simulated_states
\ No newline at end of file
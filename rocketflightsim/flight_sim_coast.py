@@ -1,9 +1,12 @@
+from time import perf_counter
+
 import numpy as np
 
 from . import helper_functions as hfunc
 from . import constants as con
+from .events import event_function, end_at_event
 
-def sim_coast(rocket, environment, initial_state_vector, stop_condition = 'apogee', stop_condition_value = None, timestep = con.default_timestep):
+def sim_coast(rocket, environment, initial_state_vector, stop_condition = 'apogee', stop_condition_value = None, timestep = con.default_timestep, stats = None):
     """
     Simulate the coast phase of a rocket's flight until a specified stop condition.
 
@@ -15,18 +18,22 @@ def sim_coast(rocket, environment, initial_state_vector, stop_condition = 'apoge
         An instance of the Environment class.
     initial_state_vector : tuple
         A tuple detailing the initial state of the rocket. AAA
-    stop_condition : str
-        The condition that will stop the simulation. Must be 'apogee', 'impact', 'below_altitude' or 'after_delay'. Default is 'apogee'.
+    stop_condition : str or function
+        The condition that will stop the simulation. Must be 'apogee', 'impact', 'below_altitude' or 'after_delay', or a function that takes the state tuple and returns True once the simulation should stop. Default is 'apogee'. The last state is the state at the moment the condition is met, located between timesteps.
     stop_condition_value : float
         The value that the stop condition will be compared to. For 'below_altitude', this is the altitude in meters. For 'after_delay', this is the time in seconds.
     timestep : float, optional
         The time increment for the simulation in seconds.
+    stats : SimStats, optional
+        A SimStats object to record the stage's run time and step count in. Defaults to None.
 
     Returns
     -------
     list
         A list of tuples containing the kinematic state of the rocket at each timestep. Each tuple contains the time, x, y, z, v_x, v_y, v_z, a_x, a_y, and a_z of the rocket at that time.
     """
+    if stats is not None:
+        start_time = perf_counter()
 
     # unpack environmental variables
     launchpad_temp = environment.launchpad_temp
@@ -61,7 +68,9 @@ def sim_coast(rocket, environment, initial_state_vector, stop_condition = 'apoge
     angle_to_vertical = np.arccos(v_z / airspeed)
 
     # set stop condition
-    if stop_condition == 'apogee':
+    if callable(stop_condition):
+        stop_condition_fn = lambda: stop_condition(simulated_states[-1] if simulated_states else initial_state_vector)
+    elif stop_condition == 'apogee':
         stop_condition_fn = lambda: v_z <= 0
     elif stop_condition == 'impact':
         stop_condition_fn = lambda: z <= 0
@@ -69,12 +78,15 @@ def sim_coast(rocket, environment, initial_state_vector, stop_condition = 'apoge
         stop_condition_fn = lambda: z <= stop_condition_value
     elif stop_condition == 'after_delay':
         stop_condition_fn = lambda: time - initial_state_vector[0] >= stop_condition_value
+    else:
+        raise ValueError(f"Invalid stop_condition '{stop_condition}'. Must be a function or one of 'apogee', 'impact', 'below_altitude', or 'after_delay'")
+    event = event_function(stop_condition, stop_condition_value, initial_state_vector[0])
+
+    simulated_states = []
 
     if stop_condition_fn():
         raise ValueError(f"Stop condition '{stop_condition}' is already met at the start of the simulation.")
 
-    simulated_states = []
-
     while not stop_condition_fn():
         # update air properties based on height
         temperature = hfunc.temp_at_altitude(z, launchpad_temp, lapse_rate = T_lapse_rate)
@@ -122,40 +134,11 @@ def sim_coast(rocket, environment, initial_state_vector, stop_condition = 'apoge
             )
         )
 
-    # interpolate to determine the exact state at the transition and replace the last state with that
-    if len(simulated_states) >= 2:
-        last_state = simulated_states[-1]
-        second_last_state = simulated_states[-2]
-
-        t1 = second_last_state[0]
-        t2 = last_state[0]
-
-        if stop_condition == 'apogee':
-            # interpolate where v_z crosses zero
-            v_z1 = second_last_state[6]
-            v_z2 = last_state[6]
-            t_interp = t1 - v_z1 * (t2 - t1) / (v_z2 - v_z1)
-            fraction = (t_interp - t1) / (t2 - t1)
-        elif stop_condition == 'impact' or stop_condition == 'below_altitude':
-            # interpolate where z crosses zero
-            z1 = second_last_state[3]
-            z2 = last_state[3]
-            target = 0 if stop_condition == 'impact' else stop_condition_value
-            t_interp = t1 + (target - z1) * (t2 - t1) / (z2 - z1)
-            fraction = (t_interp - t1) / (t2 - t1)
-        elif stop_condition == 'after_delay':
-            # interpolate where time crosses the stop time
-            t_start = initial_state_vector[0]
-            t_stop = t_start + stop_condition_value
-            fraction = (t_stop - t1) / (t2 - t1)
-
-        # interpolate all state components
-        interpolated_state = tuple(
-            second_last_state[i] + fraction * (last_state[i] - second_last_state[i])
-            for i in range(len(last_state))
-        )
+    # replace the last state with the state at the moment the stop condition is met
+    end_at_event(simulated_states, initial_state_vector, event)
 
-        # replace the last simulated state with interpolated state
-        simulated_states[-1] = interpolated_state
+    if stats is not None:
+        steps = len(simulated_states)
+        stats.record_stage('coast', perf_counter() - start_time, steps = steps, drag_calls = steps, atmosphere_calls = steps)
 
     return simulated_states
\ No newline at end of file
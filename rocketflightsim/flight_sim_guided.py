@@ -1,9 +1,12 @@
+from time import perf_counter
+
 import numpy as np
 
 from . import helper_functions as hfunc
 from . import constants as con
+from .events import event_function, end_at_event
 
-def sim_liftoff_to_rail_clearance(rocket, environment, launchpad, t_liftoff, timestep = con.default_timestep):
+def sim_liftoff_to_rail_clearance(rocket, environment, launchpad, t_liftoff, timestep = con.default_timestep, stats = None):
     """
     Simulate the flight of a rocket on a launch rail from the time of liftoff unitl the moment the rocket clears the rail.
 
@@ -19,6 +22,8 @@ def sim_liftoff_to_rail_clearance(rocket, environment, launchpad, t_liftoff, tim
         Time after ignition at which the rocket lifts off in seconds.
     timestep : float
         The time increment for the simulation in seconds.
+    stats : SimStats, optional
+        A SimStats object to record the stage's run time and step count in. Defaults to None.
 
     Returns
     -------
@@ -30,6 +35,8 @@ def sim_liftoff_to_rail_clearance(rocket, environment, launchpad, t_liftoff, tim
     This could be done in 1 dimension to save computation time, given the change in air properties over the length of the rail is negligible. Further, if the distance along the rail was taken as height - which it effectively is given most launch angles are close to vertical - accounting for the change in air properties that way would mean an even more negligeable difference compared to the real properties. The 1D motion could then be converted to 3D motion after the rocket has cleared the rail, given the location at the rail exit is determined by the (effective) length of the rail and the direction it is pointed in. For the sake of consistency, 3D motion is simulated here.
     """
     # TODO: in the future, maybe account for effects of wind while on the rail
+    if stats is not None:
+        start_time = perf_counter()
 
     # unpack rail variables
     rail_unit_vector_x = launchpad.rail_unit_vector_x
@@ -119,20 +126,12 @@ def sim_liftoff_to_rail_clearance(rocket, environment, launchpad, t_liftoff, tim
             )
         )
 
-    # interpolate to find the exact state at rail clearance
-    last_state = simulated_states[-1]
-    second_last_state = simulated_states[-2]
-
-    # linear interpolation between the last two states
-    fraction = (effective_rail_height - second_last_state[3]) / (last_state[3] - second_last_state[3])
-
-    interpolated_state = tuple(
-        second_last_state[i] + fraction * (last_state[i] - second_last_state[i])
-        for i in range(len(last_state))
-    )
+    # replace the last state with the state at rail clearance
+    end_at_event(simulated_states, (t_liftoff, 0, 0, 0, 0, 0, 0, 0, 0, 0), event_function('above_altitude', effective_rail_height))
 
-    # replace the last state with the interpolated state
-    simulated_states[-1] = interpolated_state
+    if stats is not None:
+        steps = len(simulated_states)
+        stats.record_stage('rail', perf_counter() - start_time, steps = steps, drag_calls = steps, motor_calls = 2 * steps, atmosphere_calls = steps)
 
     # raise a warning if the rocket doesn't clear the rail before burnout
     if time >= rocket.motor.burn_time:
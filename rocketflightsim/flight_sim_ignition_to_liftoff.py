@@ -1,3 +1,5 @@
+from time import perf_counter
+
 import numpy as np
 
 from . import helper_functions as hfunc
@@ -9,7 +11,7 @@ from . import constants as con
     # for μ ~ 0.7, F_N = m * g * sin(θ_to_vertical) ~ m * 0.8, F_fric ~ m/2 ~ 10 N for Prometheus/Hyperion, very minor. Change in takeoff time would be in the tens of milliseconds at most?
 # TODO: account for when keys of engine_thrust_lookup and fuel_mass_lookup aren't aligned
 
-def sim_ignition_to_liftoff(rocket, environment, launchpad):
+def sim_ignition_to_liftoff(rocket, environment, launchpad, stats = None):
     """
     Determine the time after ignition at which a rocket lifts off.
 
@@ -21,6 +23,8 @@ def sim_ignition_to_liftoff(rocket, environment, launchpad):
         An instance of the Environment class.
     launchpad : Launchpad
         An instance of the Launchpad class.
+    stats : SimStats, optional
+        A SimStats object to record the stage's run time and step count in. Defaults to None.
 
     Returns
     -------
@@ -32,6 +36,9 @@ def sim_ignition_to_liftoff(rocket, environment, launchpad):
     This implementation assumes linear interpolation of mass and thrust curves. This is reasonable given that the curves should have enough points to be relatively smooth.
     """
 
+    if stats is not None:
+        start_time = perf_counter()
+
     # unpack rocket, environment, and launchpad variables
     dry_mass = rocket.dry_mass
     fuel_mass_lookup = rocket.motor.fuel_mass_curve
@@ -69,6 +76,8 @@ def sim_ignition_to_liftoff(rocket, environment, launchpad):
 
                 # if thrust > liftoff thrust at release time, moment of release is the time of liftoff
                 if engine_thrust_lookup[hold_down_clamp_release_time] > liftoff_thrusts[hold_down_clamp_release_time]:
+                    if stats is not None:
+                        stats.record_stage('ignition_to_liftoff', perf_counter() - start_time, motor_calls = len(masses))
                     return hold_down_clamp_release_time
 
                 # if rocket doesn't lift off at moment of release, remove liftoff thrusts before release time
@@ -111,4 +120,7 @@ def sim_ignition_to_liftoff(rocket, environment, launchpad):
     # interpolate time of liftoff
     time_of_liftoff = (liftoff_thrust_intercept - thrust_intercept) / (thrust_slope - liftoff_thrust_slope)
 
+    if stats is not None:
+        stats.record_stage('ignition_to_liftoff', perf_counter() - start_time, motor_calls = len(masses))
+
     return time_of_liftoff
\ No newline at end of file
@@ -1,11 +1,14 @@
+from time import perf_counter
+
 import numpy as np
 
 from . import helper_functions as hfunc
 from . import constants as con
+from .events import event_function, locate_event
 
 # TODO more work on picking the default timestep
 
-def sim_parachute(rocket, environment, initial_state_vector, parachute, stop_condition = 'landed', stop_condition_value = None, timestep = con.default_timestep * 2):
+def sim_parachute(rocket, environment, initial_state_vector, parachute, stop_condition = 'landed', stop_condition_value = None, timestep = con.default_timestep * 2, stats = None):
     """
     Simulate the flight of a rocket with a deployed parachute.
 
@@ -19,12 +22,14 @@ def sim_parachute(rocket, environment, initial_state_vector, parachute, stop_con
         A tuple detailing the state of the rocket at AAA.
     parachute : Parachute
         An instance of the Parachute class.
-    stop_condition : str, optional
-        The condition that will stop the simulation. Must be 'landed', 'below_altitude', or 'after_delay'. Default is 'landed'.
+    stop_condition : str or function, optional
+        The condition that will stop the simulation. Must be 'landed', 'below_altitude', or 'after_delay', or a function that takes the state tuple and returns True once the simulation should stop. Default is 'landed'. The last state is the state at the moment the condition is met, located between timesteps.
     stop_condition_value : float, optional
         The value that the stop condition will be compared to. For 'below_altitude', this is the altitude in meters. For 'after_delay', this is the time in seconds. Default is None.
     timestep : float, optional
         The time increment for the simulation in seconds.
+    stats : SimStats, optional
+        A SimStats object to record the stage's run time and step count in. Defaults to None.
 
     Returns
     -------
@@ -63,18 +68,18 @@ def sim_parachute(rocket, environment, initial_state_vector, parachute, stop_con
 
     if not parachute.deploy_altitude and not parachute.deploy_delay:
         # unpack the initial state vector
-        time, x, y, z, v_x, v_y, v_z = initial_state_vector
+        time, x, y, z, v_x, v_y, v_z = initial_state_vector[:7]
     elif parachute.deploy_altitude and not parachute.deploy_delay:
-        if z < deploy_altitude:
+        if initial_state_vector[3] < deploy_altitude:
             # unpack the initial state vector
-            time, x, y, z, v_x, v_y, v_z = initial_state_vector
+            time, x, y, z, v_x, v_y, v_z = initial_state_vector[:7]
         else:
             from . import flight_sim_coast as sim_coast
-            simulated_states = sim_coast.sim_coast(rocket, environment, initial_state_vector, stop_condition = 'below_altitude', stop_condition_value = deploy_altitude)
+            simulated_states = sim_coast.sim_coast(rocket, environment, initial_state_vector, stop_condition = 'below_altitude', stop_condition_value = deploy_altitude, timestep = timestep, stats = stats)
             time, x, y, z, v_x, v_y, v_z = simulated_states[-1][:7]
     elif not parachute.deploy_altitude and parachute.deploy_delay:
         from . import flight_sim_coast as sim_coast
-        simulated_states = sim_coast.sim_coast(rocket, environment, initial_state_vector, stop_condition = 'after_delay', stop_condition_value = deploy_delay)
+        simulated_states = sim_coast.sim_coast(rocket, environment, initial_state_vector, stop_condition = 'after_delay', stop_condition_value = deploy_delay, timestep = timestep, stats = stats)
         time, x, y, z, v_x, v_y, v_z = simulated_states[-1][:7]
     else:
         # TODO implement 'both' and 'either' methods
@@ -86,7 +91,10 @@ def sim_parachute(rocket, environment, initial_state_vector, parachute, stop_con
     unit_vz = v_z / airspeed
 
     # set stop condition logic
-    if stop_condition == 'landed':
+    if callable(stop_condition):
+        def continue_while() -> bool:
+            return not stop_condition(simulated_states[-1] if len(simulated_states) > num_deployment_states else deployment_state)
+    elif stop_condition == 'landed':
         def continue_while() -> bool:
             return z >= 0
     elif stop_condition == 'below_altitude':
@@ -98,10 +106,17 @@ def sim_parachute(rocket, environment, initial_state_vector, parachute, stop_con
     else:
         # TODO add a 'both' stop condition
         # TODO maybe add stop conditions for 'velocity' and 'acceleration', and change 'below_altitude' to 'altitude', with all positive values meaning 'below' and all negative values being 'above'
-            # TODO have the user pass a function that takes in the current state and returns a boolean?
-        raise ValueError("Invalid stop_condition. Must be AAA")
+        raise ValueError(f"Invalid stop_condition '{stop_condition}'. Must be a function or one of 'landed', 'below_altitude', or 'after_delay'")
+    event = event_function(stop_condition, stop_condition_value, initial_state_vector[0])
+
+    # the state the parachute deploys at, and the number of states simulated before it deploys
+    deployment_state = (time, x, y, z, v_x, v_y, v_z)
+    num_deployment_states = len(simulated_states)
 
     # simulate descent under parachute
+    if stats is not None:
+        start_time = perf_counter()
+
     while continue_while():
         # update air properties based on height
         temperature = hfunc.temp_at_altitude(z, launchpad_temp, lapse_rate = T_lapse_rate)
@@ -148,6 +163,13 @@ def sim_parachute(rocket, environment, initial_state_vector, parachute, stop_con
             )
         )
 
-    return simulated_states
-# TODO after first implementation, have it determine the exact state (between timesteps) that the transition from chute to no chute occurs, and then again for the transition out of the function
-    # TODO could I make a function for interpolating between states based on any transition condition? Then don't have to repeat it in every flight stage function
\ No newline at end of file
+    # replace the last state with the state at the moment the stop condition is met
+    if len(simulated_states) > num_deployment_states:
+        previous_state = simulated_states[-2] if len(simulated_states) - num_deployment_states >= 2 else deployment_state
+        simulated_states[-1] = locate_event(previous_state, simulated_states[-1], event)
+
+    if stats is not None:
+        steps = len(simulated_states) - num_deployment_states
+        stats.record_stage('parachute', perf_counter() - start_time, steps = steps, atmosphere_calls = steps)
+
+    return simulated_states
\ No newline at end of file
@@ -1,9 +1,12 @@
+from time import perf_counter
+
 import numpy as np
 
 from . import helper_functions as hfunc
 from . import constants as con
+from .events import event_function, end_at_event
 # TODO merge this with the coast sim functions into an unguided flight sim file?
-def sim_unguided_boost(rocket, environment, initial_state_vector, timestep = con.default_timestep):
+def sim_unguided_boost(rocket, environment, initial_state_vector, timestep = con.default_timestep, stats = None):
     """
     Simulate the flight of a rocket from the moment of launch rail clearance until motor burnout.
 
@@ -17,12 +20,16 @@ def sim_unguided_boost(rocket, environment, initial_state_vector, timestep = con
         A tuple detailing the state of the rocket at launch rail clearance. AAA
     timestep : float
         The time increment for the simulation in seconds.
+    stats : SimStats, optional
+        A SimStats object to record the stage's run time and step count in. Defaults to None.
 
     Returns
     -------
     list
         A list of tuples containing the kinematic state of the rocket at each timestep. Each tuple contains the time, x, y, z, v_x, v_y, v_z, a_x, a_y, and a_z of the rocket at that time.
     """
+    if stats is not None:
+        start_time = perf_counter()
 
     # unpack environmental variables
     launchpad_temp = environment.launchpad_temp
@@ -112,20 +119,11 @@ def sim_unguided_boost(rocket, environment, initial_state_vector, timestep = con
             )
         )
 
-    # interpolate to find the exact state at burnout time
-    last_state = simulated_states[-1]
-    second_last_state = simulated_states[-2]
-
-    # linear interpolation between the last two states
-    time_diff = last_state[0] - second_last_state[0]
-    fraction = (burnout_time - second_last_state[0]) / time_diff
-
-    interpolated_state = tuple(
-        second_last_state[i] + fraction * (last_state[i] - second_last_state[i])
-        for i in range(len(last_state))
-    )
+    # replace the last state with the state at burnout
+    end_at_event(simulated_states, initial_state_vector, event_function('at_time', burnout_time))
 
-    # replace the last state with the interpolated state
-    simulated_states[-1] = interpolated_state
+    if stats is not None:
+        steps = len(simulated_states)
+        stats.record_stage('boost', perf_counter() - start_time, steps = steps, drag_calls = steps, motor_calls = 2 * steps, atmosphere_calls = steps)
 
     return simulated_states
\ No newline at end of file
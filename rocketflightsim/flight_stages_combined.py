@@ -9,8 +9,92 @@ from .flight_sim_guided import sim_liftoff_to_rail_clearance
 from .flight_sim_unguided_boost import sim_unguided_boost
 from .flight_sim_coast import sim_coast
 from .flight_sim_parachute import sim_parachute
+from .rocket_classes import Flightpath
+from .precision import precision_type, cast_config, cast_value
+from .classes.checkpoint import make_checkpoint
 
-def flight_sim_ignition_to_apogee(rocket, environment, launchpad, timestep=default_timestep):
+def phase_timesteps(timestep):
+    """
+    Expand a timestep or timestep schedule into a timestep for each flight phase.
+
+    Args
+    ----
+    timestep : float or dict
+        A single timestep for every phase, or a dictionary of timesteps keyed by phase ('rail', 'boost', 'coast', 'descent'). Phases missing from the dictionary use the default timestep.
+
+    Returns
+    -------
+    dict
+        The timestep for each phase in seconds.
+    """
+    if isinstance(timestep, dict):
+        unknown_phases = set(timestep) - set(con.timestep_phases)
+        if unknown_phases:
+            raise ValueError(f"Unknown phase(s) in timestep schedule: {', '.join(sorted(unknown_phases))}. Must be among {', '.join(con.timestep_phases)}")
+        return {phase: timestep.get(phase, default_timestep) for phase in con.timestep_phases}
+    return dict.fromkeys(con.timestep_phases, timestep)
+
+def _at_precision(precision, *configs):
+    # the configuration objects are already in float64, so they're only copied for other precisions
+    if precision_type(precision) is np.float64:
+        return configs
+    return tuple(cast_config(config, precision) for config in configs)
+
+class _FlightRecorder:
+    # collects the states of a flight as it's simulated, and records stats and checkpoints at each phase transition
+    def __init__(self, rocket, stats, checkpoints, resume_from):
+        self.rocket = rocket
+        self.stats = stats
+        self.checkpoints = checkpoints
+        if resume_from is None:
+            self.prefix = None
+            self.states = []
+        else:
+            # the checkpoint's state is where the stages carry on from, the states before it are only needed for the final flightpath
+            self.prefix = resume_from.states[:-1]
+            self.states = [resume_from.state]
+
+    def all_states(self):
+        if self.prefix is None or not len(self.prefix):
+            return self.states
+        return np.concatenate((self.prefix, np.asarray(self.states, dtype = float)))
+
+    def transition(self, event, **context):
+        if self.stats is not None:
+            self.stats.phase_transition(event, self.states)
+        if self.checkpoints is not None:
+            self.checkpoints.append(make_checkpoint(event, self.all_states(), self.rocket, **context))
+
+def _resume_point(resume_from, events):
+    # index in events of the transition the flight resumes from, or -1 to start from ignition
+    if resume_from is None:
+        return -1
+    if resume_from.event not in events:
+        raise ValueError(f"Can't resume from a '{resume_from.event}' checkpoint here. Must be one of {', '.join(events)}")
+    return events.index(resume_from.event)
+
+_ascent_events = ('liftoff', 'rail_clearance', 'burnout', 'apogee')
+
+def _simulate_ascent(flight, resumed, rocket, environment, launchpad, timesteps, stats):
+    # simulates each phase up to apogee that comes after the phase the flight resumed from
+    if resumed < 0:
+        t_liftoff = sim_ignition_to_liftoff(rocket, environment, launchpad, stats=stats)
+        flight.states.append((t_liftoff, 0, 0, 0, 0, 0, 0, 0, 0, 0))  # state at liftoff (time, x, y, z, v_x, v_y, v_z, a_x, a_y, a_z)
+        flight.transition('liftoff')
+    if resumed < 1:
+        guided_flightpath = sim_liftoff_to_rail_clearance(rocket, environment, launchpad, flight.states[-1][0], timesteps['rail'], stats=stats)
+        flight.states.extend(guided_flightpath)
+        flight.transition('rail_clearance')
+    if resumed < 2:
+        flightpath_to_burnout = sim_unguided_boost(rocket, environment, flight.states[-1], timesteps['boost'], stats=stats)
+        flight.states.extend(flightpath_to_burnout)
+        flight.transition('burnout')
+    if resumed < 3:
+        flightpath_to_apogee = sim_coast(rocket, environment, flight.states[-1], timestep=timesteps['coast'], stats=stats)
+        flight.states.extend(flightpath_to_apogee)
+        flight.transition('apogee')
+
+def flight_sim_ignition_to_apogee(rocket, environment, launchpad, timestep=default_timestep, stats=None, precision='float64', storage_precision=None, checkpoints=None, resume_from=None):
     """
     Simulate the flight of a rocket from ignition to apogee given its specifications and launch conditions.
 
@@ -22,27 +106,37 @@ def flight_sim_ignition_to_apogee(rocket, environment, launchpad, timestep=defau
         An instance of the Environment class.
     launchpad : Launchpad
         An instance of the Launchpad class.
-    timestep : float, optional
-        The time increment for the simulation in seconds.
+    timestep : float or dict, optional
+        The time increment for the simulation in seconds, or a dictionary of time increments keyed by flight phase ('rail', 'boost', 'coast', 'descent'), e.g. {'boost': 0.01, 'coast': 0.02, 'descent': 0.1}. Phases left out of the dictionary use the default timestep.
+    stats : SimStats, optional
+        A SimStats object to record the run time and step count of each stage in, and whose callbacks are called at each phase transition. Defaults to None.
+    precision : str, optional
+        Floating point precision to simulate in, 'float64' or 'float32'. In float32, the configuration objects are copied with their floats cast, so the stages run in single precision as they would on a microcontroller (slower than float64 on a desktop). Defaults to 'float64'.
+    storage_precision : str, optional
+        Floating point precision to store the flightpath in, 'float64' or 'float32'. Defaults to the simulation precision.
+    checkpoints : list, optional
+        A list to append a Checkpoint to at each phase transition ('liftoff', 'rail_clearance', 'burnout', 'apogee'). Defaults to None.
+    resume_from : Checkpoint, optional
+        A checkpoint to resume the flight from instead of simulating it from ignition, e.g. a burnout checkpoint from an earlier flight of the same rocket with the same environment and launchpad. The returned flightpath includes the flight up to the checkpoint. Defaults to None.
 
     Returns
     -------
-    list
-        A list of tuples containing the kinematic state of the rocket at each timestep. Each tuple contains the time, x, y, z, v_x, v_y, v_z, a_x, a_y, and a_z of the rocket at that time.
+    Flightpath
+        The kinematic state of the rocket at each timestep, starting at liftoff. Each state contains the time, x, y, z, v_x, v_y, v_z, a_x, a_y, and a_z of the rocket at that time. Derived quantities such as airspeed and Mach number can be accessed by name, and to_numpy() and to_pandas() give the states without copying them.
     """
-    flightpath = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0]  # Initial state vector (time, x, y, z, v_x, v_y, v_z, a_x, a_y, a_z)
-    t_liftoff = sim_ignition_to_liftoff(rocket, environment, launchpad)
-    flightpath.append((t_liftoff, 0, 0, 0, 0, 0, 0, 0, 0, 0))  # append liftoff time to flightpath
-    guided_flightpath = sim_liftoff_to_rail_clearance(rocket, environment, launchpad, t_liftoff, timestep)
-    flightpath.extend(guided_flightpath)  # append the last state vector to flightpath
-    flightpath_to_burnout = sim_unguided_boost(rocket, environment, guided_flightpath[-1], timestep)
-    flightpath.extend(flightpath_to_burnout)  # combine the flight paths
-    flightpath_to_apogee = sim_coast(rocket, environment, flightpath[-1], timestep=timestep)
-    flightpath.extend(flightpath_to_apogee)  # combine the flight paths
-
-    return flightpath
-
-def flight_sim_ignition_to_landing(rocket, environment, launchpad, parachutes_and_conditions, timestep=default_timestep):
+    if stats is not None:
+        stats.start_flight()
+    timesteps = phase_timesteps(timestep)
+    flight_configs = (environment, rocket, launchpad)
+    rocket, environment, launchpad = _at_precision(precision, rocket, environment, launchpad)
+    resumed = _resume_point(resume_from, _ascent_events)
+    flight = _FlightRecorder(rocket, stats, checkpoints, resume_from)
+
+    _simulate_ascent(flight, resumed, rocket, environment, launchpad, timesteps, stats)
+
+    return Flightpath(flight.all_states(), *flight_configs, dtype=precision_type(storage_precision or precision))
+
+def flight_sim_ignition_to_landing(rocket, environment, launchpad, parachutes_and_conditions, timestep=default_timestep, stats=None, precision='float64', storage_precision=None, checkpoints=None, resume_from=None):
     """
     Simulate the flight of a rocket from ignition to landing under a parachute given its specifications and launch conditions.
 
@@ -56,29 +150,44 @@ def flight_sim_ignition_to_landing(rocket, environment, launchpad, parachutes_an
         An instance of the Launchpad class.
     parachutes_and_conditions : list
         A list of tuples, each containing an instance of the Parachute class and the conditions upon which that parachute stops controlling the flight. Takes the form (parachute, stop_condition, stop_condition_value).
-    timestep : float, optional
-        The time increment for the simulation in seconds.
+    timestep : float or dict, optional
+        The time increment for the simulation in seconds, or a dictionary of time increments keyed by flight phase ('rail', 'boost', 'coast', 'descent'), e.g. {'boost': 0.01, 'coast': 0.02, 'descent': 0.1}. Phases left out of the dictionary use the default timestep.
+    stats : SimStats, optional
+        A SimStats object to record the run time and step count of each stage in, and whose callbacks are called at each phase transition. Defaults to None.
+    precision : str, optional
+        Floating point precision to simulate in, 'float64' or 'float32'. In float32, the configuration objects are copied with their floats cast, so the stages run in single precision as they would on a microcontroller (slower than float64 on a desktop). Defaults to 'float64'.
+    storage_precision : str, optional
+        Floating point precision to store the flightpath in, 'float64' or 'float32'. Defaults to the simulation precision.
+    checkpoints : list, optional
+        A list to append a Checkpoint to at each phase transition ('liftoff', 'rail_clearance', 'burnout', 'apogee', and 'parachute_stop' after each parachute, with the number of parachutes finished as its 'parachute_index'). Defaults to None.
+    resume_from : Checkpoint, optional
+        A checkpoint to resume the flight from instead of simulating it from ignition, e.g. a burnout checkpoint from an earlier flight of the same rocket with the same environment and launchpad. The returned flightpath includes the flight up to the checkpoint. Defaults to None.
 
     Returns
     -------
-    list
-        A list of tuples containing the kinematic state of the rocket at each timestep. Each tuple contains the time, x, y, z, v_x, v_y, v_z, a_x, a_y, and a_z of the rocket at that time.
+    Flightpath
+        The kinematic state of the rocket at each timestep, starting at liftoff. Each state contains the time, x, y, z, v_x, v_y, v_z, a_x, a_y, and a_z of the rocket at that time. Derived quantities such as airspeed and Mach number can be accessed by name, and to_numpy() and to_pandas() give the states without copying them.
     """
-    flightpath = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0]  # Initial state vector (time, x, y, z, v_x, v_y, v_z, a_x, a_y, a_z)
-    t_liftoff = sim_ignition_to_liftoff(rocket, environment, launchpad)
-    flightpath.append((t_liftoff, 0, 0, 0, 0, 0, 0, 0, 0, 0))  # append liftoff time to flightpath
-    guided_flightpath = sim_liftoff_to_rail_clearance(rocket, environment, launchpad, t_liftoff, timestep)
-    flightpath.extend(guided_flightpath)  # append the last state vector to flightpath
-    flightpath_to_burnout = sim_unguided_boost(rocket, environment, guided_flightpath[-1], timestep)
-    flightpath.extend(flightpath_to_burnout)  # combine the flight paths
-    flightpath_to_apogee = sim_coast(rocket, environment, flightpath[-1], timestep=timestep)
-    for parachute, stop_condition, stop_condition_value in parachutes_and_conditions:
-        flightpath_with_chute = sim_parachute(rocket, environment, flightpath_to_apogee[-1], parachute, stop_condition=stop_condition, stop_condition_value=stop_condition_value, timestep=timestep)
-        flightpath.extend(flightpath_with_chute)
-
-    return flightpath
-
-def flight_sim_ballistic_recovery(rocket, environment, launchpad, timestep=default_timestep):
+    if stats is not None:
+        stats.start_flight()
+    timesteps = phase_timesteps(timestep)
+    flight_configs = (environment, rocket, launchpad)
+    rocket, environment, launchpad = _at_precision(precision, rocket, environment, launchpad)
+    resumed = _resume_point(resume_from, _ascent_events + ('parachute_stop',))
+    flight = _FlightRecorder(rocket, stats, checkpoints, resume_from)
+
+    _simulate_ascent(flight, resumed, rocket, environment, launchpad, timesteps, stats)
+
+    first_parachute = resume_from.context.get('parachute_index', 0) if resumed == len(_ascent_events) else 0
+    for parachute_index, (parachute, stop_condition, stop_condition_value) in enumerate(parachutes_and_conditions[first_parachute:], start=first_parachute):
+        parachute, stop_condition_value = _at_precision(precision, parachute)[0], cast_value(stop_condition_value, precision)
+        flightpath_with_chute = sim_parachute(rocket, environment, flight.states[-1], parachute, stop_condition=stop_condition, stop_condition_value=stop_condition_value, timestep=timesteps['descent'], stats=stats)
+        flight.states.extend(flightpath_with_chute)
+        flight.transition('parachute_stop', parachute_index=parachute_index + 1)
+
+    return Flightpath(flight.all_states(), *flight_configs, dtype=precision_type(storage_precision or precision))
+
+def flight_sim_ballistic_recovery(rocket, environment, launchpad, timestep=default_timestep, stats=None, precision='float64', storage_precision=None, checkpoints=None, resume_from=None):
     """
     Simulate the flight of a rocket that does not deploy a parachute and instead falls ballistically back to the ground.
 
@@ -90,22 +199,37 @@ def flight_sim_ballistic_recovery(rocket, environment, launchpad, timestep=defau
         An instance of the Environment class.
     launchpad : Launchpad
         An instance of the Launchpad class.
-    timestep : float, optional
-        The time increment for the simulation in seconds.
+    timestep : float or dict, optional
+        The time increment for the simulation in seconds, or a dictionary of time increments keyed by flight phase ('rail', 'boost', 'coast', 'descent'), e.g. {'boost': 0.01, 'coast': 0.02, 'descent': 0.1}. Phases left out of the dictionary use the default timestep.
+    stats : SimStats, optional
+        A SimStats object to record the run time and step count of each stage in, and whose callbacks are called at each phase transition. Defaults to None.
+    precision : str, optional
+        Floating point precision to simulate in, 'float64' or 'float32'. In float32, the configuration objects are copied with their floats cast, so the stages run in single precision as they would on a microcontroller (slower than float64 on a desktop). Defaults to 'float64'.
+    storage_precision : str, optional
+        Floating point precision to store the flightpath in, 'float64' or 'float32'. Defaults to the simulation precision.
+    checkpoints : list, optional
+        A list to append a Checkpoint to at each phase transition ('liftoff', 'rail_clearance', 'burnout', 'apogee', and 'impact'). Defaults to None.
+    resume_from : Checkpoint, optional
+        A checkpoint to resume the flight from instead of simulating it from ignition, e.g. a burnout checkpoint from an earlier flight of the same rocket with the same environment and launchpad. The returned flightpath includes the flight up to the checkpoint. Defaults to None.
 
     Returns
     -------
-    list
-        A list of tuples containing the kinematic state of the rocket at each timestep. Each tuple contains the time, x, y, z, v_x, v_y, v_z, a_x, a_y, and a_z of the rocket at that time.
+    Flightpath
+        The kinematic state of the rocket at each timestep, starting at liftoff. Each state contains the time, x, y, z, v_x, v_y, v_z, a_x, a_y, and a_z of the rocket at that time. Derived quantities such as airspeed and Mach number can be accessed by name, and to_numpy() and to_pandas() give the states without copying them.
     """
-    flightpath = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0]  # Initial state vector (time, x, y, z, v_x, v_y, v_z, a_x, a_y, a_z)
-    t_liftoff = sim_ignition_to_liftoff(rocket, environment, launchpad)
-    flightpath.append((t_liftoff, 0, 0, 0, 0, 0, 0, 0, 0, 0))  # append liftoff time to flightpath
-    guided_flightpath = sim_liftoff_to_rail_clearance(rocket, environment, launchpad, t_liftoff, timestep)
-    flightpath.extend(guided_flightpath)  # append the last state vector to flightpath
-    flightpath_to_burnout = sim_unguided_boost(rocket, environment, guided_flightpath[-1], timestep)
-    flightpath.extend(flightpath_to_burnout)  # combine the flight paths
-    flightpath_to_impact = sim_coast(rocket, environment, flightpath[-1], stop_condition='impact', timestep=timestep)
-    flightpath.extend(flightpath_to_impact)  # combine the flight paths
-
-    return flightpath
+    if stats is not None:
+        stats.start_flight()
+    timesteps = phase_timesteps(timestep)
+    flight_configs = (environment, rocket, launchpad)
+    rocket, environment, launchpad = _at_precision(precision, rocket, environment, launchpad)
+    resumed = _resume_point(resume_from, _ascent_events + ('impact',))
+    flight = _FlightRecorder(rocket, stats, checkpoints, resume_from)
+
+    _simulate_ascent(flight, resumed, rocket, environment, launchpad, timesteps, stats)
+
+    if resumed < len(_ascent_events):
+        flightpath_to_impact = sim_coast(rocket, environment, flight.states[-1], stop_condition='impact', timestep=timesteps['descent'], stats=stats)
+        flight.states.extend(flightpath_to_impact)
+        flight.transition('impact')
+
+    return Flightpath(flight.all_states(), *flight_configs, dtype=precision_type(storage_precision or precision))
@@ -97,6 +97,44 @@ def mach_number_fn(v, temp):
     """
     return v / np.sqrt(con.adiabatic_index_air_times_R_specific_air * temp)
 
+def compass_heading(v_x, v_y):
+    """
+    Calculate the compass heading of a velocity. Works on arrays as well as single values.
+
+    Args
+    ----
+    v_x : float or numpy.ndarray
+        Velocity east in meters per second.
+    v_y : float or numpy.ndarray
+        Velocity north in meters per second.
+
+    Returns
+    -------
+    float or numpy.ndarray
+        Compass heading in radians, from 0 to 2π. 0 is north, π/2 is east, π is south, 3π/2 is west. 0 when there is no horizontal velocity.
+    """
+    return np.arctan2(v_x, v_y) % (2 * np.pi)
+
+def angle_to_vertical(v_x, v_y, v_z):
+    """
+    Calculate the angle between a velocity and the vertical. Works on arrays as well as single values.
+
+    Args
+    ----
+    v_x : float or numpy.ndarray
+        Velocity east in meters per second.
+    v_y : float or numpy.ndarray
+        Velocity north in meters per second.
+    v_z : float or numpy.ndarray
+        Velocity up in meters per second.
+
+    Returns
+    -------
+    float or numpy.ndarray
+        Angle to vertical in radians, from 0 (straight up) to π (straight down).
+    """
+    return np.arctan2(np.hypot(v_x, v_y), v_z)
+
 # gravity
 def get_local_gravity(latitude, h = 0):
     """
@@ -0,0 +1,321 @@
+import sys
+import os
+import hashlib
+import multiprocessing as mp
+from collections import OrderedDict
+
+import numpy as np
+
+# objects shared by every task run in a worker process, set once when the worker starts
+_worker_shared = None
+
+def _init_worker(shared):
+    global _worker_shared
+    _worker_shared = shared
+
+def _run_chunk(fn, chunk):
+    return [fn(_worker_shared, task) for task in chunk]
+
+def get_context():
+    """
+    Return the multiprocessing context used for RFS worker pools.
+
+    Returns
+    -------
+    multiprocessing.context.BaseContext
+        The 'fork' context where the platform supports it, otherwise the platform default.
+
+    Notes
+    -----
+    With 'fork', the objects shared with the workers are inherited by the worker processes rather than pickled, so configurations that can't be pickled, such as a rocket whose drag coefficient is a function defined inside another function, can still be used. With 'spawn' (the only option on Windows), everything passed to the workers must be picklable. The configuration classes are, as long as any drag coefficient is a number, a DragCurve, or a function defined at the top level of a module.
+    """
+    if 'fork' in mp.get_all_start_methods():
+        return mp.get_context('fork')
+    return mp.get_context()
+
+def run_in_parallel(fn, tasks, shared = None, processes = None, chunksize = None, ordered = True):
+    """
+    Run a function over many tasks on a pool of worker processes, yielding the results as they become available.
+
+    Args
+    ----
+    fn : function
+        A module-level function taking (shared, task) and returning the result for that task.
+    tasks : iterable
+        The tasks to run. Each task should be small (a few scalars or a tuple of them), as it is sent to a worker for every call.
+    shared : object, optional
+        Objects needed by every task (e.g. a Rocket and Launchpad). Sent to each worker once when it starts instead of with every task. Defaults to None.
+    processes : int, optional
+        Number of worker processes. Defaults to the number of CPUs. If 1, the tasks are run serially in the calling process.
+    chunksize : int, optional
+        Number of tasks sent to a worker at a time. Defaults to splitting the tasks into about four chunks per worker.
+    ordered : bool, optional
+        If True, results are yielded in the order of the tasks. If False, they are yielded as soon as they complete. Defaults to True.
+
+    Yields
+    ------
+    object
+        The result of fn for each task.
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    if processes == 1:
+        for task in tasks:
+            yield fn(shared, task)
+        return
+
+    tasks = list(tasks)
+    if not tasks:
+        return
+    if chunksize is None:
+        chunksize = max(1, len(tasks) // (4 * processes))
+
+    chunks = [tasks[i:i + chunksize] for i in range(0, len(tasks), chunksize)]
+
+    from functools import partial
+    with get_context().Pool(processes, initializer = _init_worker, initargs = (shared,)) as pool:
+        if ordered:
+            results = pool.imap(partial(_run_chunk, fn), chunks)
+        else:
+            results = pool.imap_unordered(partial(_run_chunk, fn), chunks)
+        for chunk_results in results:
+            yield from chunk_results
+
+# shared memory blocks this process has created or attached to, by name, least recently used first. Kept open so the arrays in them stay valid
+_attached_blocks = OrderedDict()
+# the process that created each block made by SharedTables, which keeps its blocks open until it frees them
+_created_blocks = {}
+
+def _attach_block(name):
+    if name not in _attached_blocks:
+        from multiprocessing import shared_memory, resource_tracker
+        if sys.version_info >= (3, 13):
+            block = shared_memory.SharedMemory(name = name, track = False)
+        else:
+            block = shared_memory.SharedMemory(name = name)
+            # attaching registers the block with the resource tracker, which unlinks it when the process exits if it's the tracker of a worker. The process that created it frees it
+            resource_tracker.unregister(block._name, 'shared_memory')
+        _attached_blocks[name] = block
+    _attached_blocks.move_to_end(name)
+    return _attached_blocks[name]
+
+def detach_blocks(max_bytes = 0):
+    """
+    Close this process's mappings of the shared memory blocks it attached to, least recently used first, until the ones left open take up at most max_bytes. Call it in worker processes between tasks, so blocks that the tasks no longer use, including ones freed by the process that shared them, don't stay mapped for the life of the worker. Blocks created by this process, and blocks still used by arrays, are left open.
+
+    Args
+    ----
+    max_bytes : int, optional
+        Largest total size of the blocks to keep open (bytes), to reuse for later tasks with the same tables. Defaults to 0.
+
+    Returns
+    -------
+    int
+        The number of blocks closed.
+    """
+    pid = os.getpid()
+    attached = [name for name in _attached_blocks if _created_blocks.get(name) != pid]
+    total = sum(_attached_blocks[name].size for name in attached)
+    closed = 0
+    for name in attached:
+        if total <= max_bytes:
+            break
+        block = _attached_blocks[name]
+        try:
+            block.close()
+        except BufferError:
+            # an array still uses it
+            continue
+        del _attached_blocks[name]
+        total -= block.size
+        closed += 1
+    return closed
+
+class SharedArray:
+    """
+    A handle to a read-only array in shared memory, made by SharedTables.share(). It pickles to just its block name, shape, and dtype, so sending it to a worker process costs a few dozen bytes, and the worker maps the array without copying it.
+
+    Attributes
+    ----------
+    name : str
+        Name of the shared memory block holding the array.
+    shape : tuple
+        Shape of the array.
+    dtype : str
+        Data type of the array.
+    """
+    def __init__(self, name, shape, dtype):
+        self.name = name
+        self.shape = tuple(shape)
+        self.dtype = dtype
+
+    @property
+    def array(self):
+        """ Returns the array, attaching to its shared memory block the first time it's used in a process. """
+        array = np.ndarray(self.shape, dtype = self.dtype, buffer = _attach_block(self.name).buf)
+        array.flags.writeable = False
+        return array
+
+    def __repr__(self):
+        return f"SharedArray(name={self.name!r}, shape={self.shape}, dtype={self.dtype!r})"
+
+class SharedTables:
+    """
+    The SharedTables class places large immutable arrays, such as thrust and fuel mass curves and drag tables, in shared memory once, so tasks sent to worker processes carry SharedArray handles instead of the arrays. Arrays are keyed by their content, so sharing the same table again returns the same handle. Use it as a context manager, or call close(), to free the shared memory once the workers are done.
+
+    For long-lived stores, such as one shared by every request to a service, set max_bytes and release() each configuration made by share_tables once the workers are done with it. Arrays that no task is using are then freed, least recently shared first, whenever the store is larger than max_bytes.
+
+    Attributes
+    ----------
+    max_bytes : int
+        Size the store is kept within by freeing arrays that aren't in use (bytes), or None to keep every array until close().
+    nbytes : int
+        Total size of the shared arrays (bytes).
+    """
+    def __init__(self, max_bytes = None):
+        """Initialize a SharedTables object.
+
+        Parameters
+        ----------
+        max_bytes : int, optional
+            Size to keep the store within by freeing arrays that aren't in use (bytes). Defaults to None, for no limit.
+        """
+        self.max_bytes = max_bytes
+        # blocks by the content of their array, least recently shared first, and the number of shares of each not yet released
+        self._blocks = OrderedDict()
+        self._handles = {}
+        self._keys = {}
+        self._uses = {}
+        self.nbytes = 0
+
+    def share(self, array):
+        """
+        Place an array in shared memory.
+
+        Args
+        ----
+        array : array_like
+            The array.
+
+        Returns
+        -------
+        SharedArray
+            A handle to the shared copy of the array. It stays valid until it's released as many times as it was shared, if the store has a max_bytes, or until close().
+        """
+        from multiprocessing import shared_memory
+
+        array = np.ascontiguousarray(array)
+        key = (array.dtype.str, array.shape, hashlib.blake2b(array.tobytes(), digest_size = 16).digest())
+        if key not in self._handles:
+            block = shared_memory.SharedMemory(create = True, size = max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype = array.dtype, buffer = block.buf)[...] = array
+            _attached_blocks[block.name] = block
+            _created_blocks[block.name] = os.getpid()
+            self._blocks[key] = block
+            self._handles[key] = SharedArray(block.name, array.shape, array.dtype.str)
+            self._keys[block.name] = key
+            self._uses[key] = 0
+            self.nbytes += array.nbytes
+        self._blocks.move_to_end(key)
+        self._uses[key] += 1
+        self._free_unused()
+        return self._handles[key]
+
+    def release(self, config):
+        """
+        Release the shared arrays of a configuration made by share_tables, once the tasks using it are done. If the store is larger than max_bytes, the arrays no longer in use are freed.
+
+        Args
+        ----
+        config : dict or list
+            A configuration made by share_tables with this store.
+        """
+        for handle in _handles_in(config):
+            key = self._keys.get(handle.name)
+            if key is not None:
+                self._uses[key] -= 1
+        self._free_unused()
+
+    def _free_unused(self):
+        if self.max_bytes is None:
+            return
+        for key in [key for key in self._blocks if self._uses[key] <= 0]:
+            if self.nbytes <= self.max_bytes:
+                break
+            self._free(key)
+
+    def _free(self, key):
+        block = self._blocks.pop(key)
+        del self._keys[self._handles.pop(key).name]
+        del self._uses[key]
+        self.nbytes -= int(np.prod(key[1], dtype = int)) * np.dtype(key[0]).itemsize
+        _attached_blocks.pop(block.name, None)
+        _created_blocks.pop(block.name, None)
+        block.close()
+        block.unlink()
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def close(self):
+        """ Free the shared memory. Handles to it can't be used afterwards. """
+        for key in list(self._blocks):
+            self._free(key)
+        self.nbytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def share_tables(config, tables, min_size = 64):
+    """
+    Replace the large numeric lists in a configuration dictionary, such as the thrust curve of a motor dictionary or the table of a drag curve, with handles to shared copies of them.
+
+    Args
+    ----
+    config : dict or list
+        A JSON-compatible configuration, e.g. a simulation request.
+    tables : SharedTables
+        Where to share the lists.
+    min_size : int, optional
+        Smallest number of values in a list worth sharing. Defaults to 64.
+
+    Returns
+    -------
+    dict or list
+        A copy of the configuration with SharedArray handles in place of the shared lists. attach_tables() turns it back into a configuration.
+    """
+    if isinstance(config, dict):
+        return {key: share_tables(value, tables, min_size) for key, value in config.items()}
+    if isinstance(config, (list, tuple)) and config:
+        try:
+            array = np.array(config, dtype = float)
+        except (TypeError, ValueError):
+            array = None
+        if array is not None and array.size >= min_size and array.ndim <= 2:
+            return tables.share(array)
+        return [share_tables(value, tables, min_size) for value in config]
+    return config
+
+def _handles_in(config):
+    if isinstance(config, SharedArray):
+        yield config
+    elif isinstance(config, dict):
+        for value in config.values():
+            yield from _handles_in(value)
+    elif isinstance(config, list):
+        for value in config:
+            yield from _handles_in(value)
+
+def attach_tables(config):
+    """ Returns a configuration made by share_tables with the shared arrays in place of their handles. The arrays are read-only views of the shared memory, not copies. """
+    if isinstance(config, SharedArray):
+        return config.array
+    if isinstance(config, dict):
+        return {key: attach_tables(value) for key, value in config.items()}
+    if isinstance(config, list):
+        return [attach_tables(value) for value in config]
+    return config
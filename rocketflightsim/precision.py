@@ -0,0 +1,109 @@
+""" Floating point precision of simulations.
+
+The flight stages are written with plain arithmetic, so they run in whatever precision their inputs are in. Casting every float in the configuration objects and the initial state to np.float32 makes a whole simulation run in single precision, as it would on a microcontroller without double precision hardware. Under NumPy's promotion rules (NEP 50) Python floats such as the constants and the timestep don't promote float32 values back up to float64.
+
+Simulating in float32 through NumPy scalars is slower than in float64 with Python floats, so it's meant for checking how a flight or controller behaves in single precision before porting it. Storing trajectories in float32 halves their size at any simulation precision.
+"""
+import copy
+import types
+import functools
+
+import numpy as np
+
+precisions = {
+    'float64': np.float64,
+    'float32': np.float32,
+}
+
+def precision_type(precision):
+    """
+    Get the NumPy scalar type for a precision.
+
+    Args
+    ----
+    precision : str or type
+        'float64' or 'float32', or the matching NumPy type or dtype.
+
+    Returns
+    -------
+    type
+        np.float64 or np.float32.
+    """
+    name = np.dtype(precision).name
+    if name not in precisions:
+        raise ValueError(f"Unsupported precision: {precision}. Must be one of {', '.join(precisions)}")
+    return precisions[name]
+
+class _CastOutput:
+    # wraps a function (e.g. a drag coefficient as a function of Mach number) so it returns values in the given precision
+    def __init__(self, fn, scalar_type):
+        self.fn = fn
+        self.scalar_type = scalar_type
+        functools.update_wrapper(self, fn)
+
+    def __call__(self, *args, **kwargs):
+        result = self.fn(*args, **kwargs)
+        if isinstance(result, np.ndarray):
+            return result.astype(self.scalar_type)
+        return self.scalar_type(result)
+
+def cast_value(value, precision):
+    """
+    Cast the floats in a value to a precision. Integers, strings, and None are left as they are.
+
+    Args
+    ----
+    value : any
+        A float, array, dict, list, tuple, function, or configuration object.
+    precision : str or type
+        'float64' or 'float32'.
+
+    Returns
+    -------
+    any
+        The value with its floats cast. Dicts (such as thrust curves), lists, tuples, and configuration objects are copied rather than changed, and functions are wrapped so they return values in the precision.
+    """
+    scalar_type = precision_type(precision)
+    if isinstance(value, (bool, int, np.integer, str)) or value is None:
+        return value
+    if isinstance(value, (float, np.floating)):
+        return scalar_type(value)
+    if isinstance(value, np.ndarray):
+        return value.astype(scalar_type) if np.issubdtype(value.dtype, np.floating) else value
+    if isinstance(value, dict):
+        return {cast_value(key, precision): cast_value(item, precision) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(cast_value(item, precision) for item in value)
+    if isinstance(value, (types.FunctionType, types.BuiltinFunctionType, types.MethodType, functools.partial, _CastOutput)):
+        if isinstance(value, _CastOutput):
+            value = value.fn
+        return _CastOutput(value, scalar_type)
+    if hasattr(value, '__dict__'):
+        return cast_config(value, precision)
+    return value
+
+def cast_config(config, precision):
+    """
+    Make a copy of a configuration object (Rocket, Motor, Environment, Launchpad, Parachute, Airbrakes) with all its floats in a precision.
+
+    Args
+    ----
+    config : object
+        The configuration object.
+    precision : str or type
+        'float64' or 'float32'.
+
+    Returns
+    -------
+    object
+        A copy of the configuration object. Objects it holds, such as a Rocket's Motor, are copied and cast too.
+    """
+    cast = copy.copy(config)
+    for name, value in vars(config).items():
+        setattr(cast, name, cast_value(value, precision))
+    return cast
+
+def cast_state(state, precision):
+    """ Returns a state tuple with its values in a precision. """
+    scalar_type = precision_type(precision)
+    return tuple(scalar_type(value) for value in state)
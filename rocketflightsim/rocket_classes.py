@@ -51,11 +51,11 @@ class StateVector:
         self.a_z = kinematic_tuple[9]
     
     def compass_heading(self):
-        """ Returns the compass heading of the rocket in degrees. """
+        """ Returns the compass heading of the rocket in radians. """
         return hfunc.compass_heading(self.v_x, self.v_y)
     
     def angle_to_vertical(self):
-        """ Returns the angle to vertical of the rocket in degrees. """
+        """ Returns the angle to vertical of the rocket in radians. """
         return hfunc.angle_to_vertical(self.v_x, self.v_y, self.v_z)
     
     def groundspeed(self):
@@ -69,6 +69,207 @@ class StateVector:
 
 class Flightpath:
     """
-    The Flightpath class 
-    just make it a series of StateVectors? Does it need a class in that case?
-    """
\ No newline at end of file
+    The Flightpath class stores the states of a rocket over a flight as columns of one array, and computes derived quantities for the whole flight at once with NumPy. Each derived column is computed the first time it's accessed and then kept, so later accesses are free.
+
+    Columns are accessed by name, either by indexing (flightpath['airspeed']) or as attributes (flightpath.airspeed). Indexing with an integer returns the state at that index as a tuple, like the lists of state tuples returned by the flight stages, and indexing with a slice returns the rows of the states array. to_numpy() and to_pandas() give the states without copying them.
+
+    State columns:
+    - time: time since ignition (s)
+    - x, y, z: displacement east, north, and up (m)
+    - v_x, v_y, v_z: velocity east, north, and up (m/s)
+    - a_x, a_y, a_z: acceleration east, north, and up (m/s^2)
+    - deployment_angle: airbrake deployment angle (rad), for flights simulated with airbrakes
+
+    Derived columns:
+    - groundspeed: speed relative to the ground (m/s)
+    - compass_heading: heading of the velocity relative to the ground (rad), 0 is north and π/2 is east
+    - total_acceleration: magnitude of the acceleration (m/s^2)
+    - g_force: total acceleration in multiples of local gravity
+    - airspeed: speed relative to the air (m/s)
+    - angle_to_vertical: angle between the velocity relative to the air and the vertical (rad)
+    - temperature: air temperature (K)
+    - air_density: air density (kg/m^3)
+    - mach_number: Mach number
+    - dynamic_pressure, q: dynamic pressure (Pa)
+    - mass: mass of the rocket (kg)
+    - drag_force: drag on the rocket (N)
+
+    The atmospheric columns need the flight's environment and the mass and drag need its rocket. Airspeed is taken relative to the wind the flight stages use: none on the launch rail, 20% of it until burnout, and all of it after.
+    """
+    derived_columns = {
+        'groundspeed': '_groundspeed',
+        'compass_heading': '_compass_heading',
+        'total_acceleration': '_total_acceleration',
+        'g_force': '_g_force',
+        'airspeed': '_airspeed',
+        'angle_to_vertical': '_angle_to_vertical',
+        'temperature': '_temperature',
+        'air_density': '_air_density',
+        'mach_number': '_mach_number',
+        'dynamic_pressure': '_dynamic_pressure',
+        'q': '_dynamic_pressure',
+        'mass': '_mass',
+        'drag_force': '_drag_force',
+    }
+
+    def __init__(self, states, environment = None, rocket = None, launchpad = None, dtype = np.float64):
+        """Initialize a Flightpath object.
+
+        Parameters
+        ----------
+        states : array_like
+            The states of the rocket, one row per state, as returned by the flight stages. Rows have 10 values (time, x, y, z, v_x, v_y, v_z, a_x, a_y, a_z), or 11 with the airbrake deployment angle.
+        environment : Environment, optional
+            The Environment the flight was simulated in. Needed for the atmospheric and wind-dependent columns. Defaults to None.
+        rocket : Rocket, optional
+            The Rocket that was simulated. Needed for the mass and drag columns. Defaults to None.
+        launchpad : Launchpad, optional
+            The Launchpad the rocket was launched from. Used to tell which states were on the launch rail, where the rocket doesn't see the wind. Defaults to None.
+        dtype : type, optional
+            Floating point type to store the states in. np.float32 halves the memory used. Defaults to np.float64.
+        """
+        self.states = np.asarray(states, dtype = dtype).reshape(-1, len(states[0]) if len(states) else len(con.state_columns))
+        self.environment = environment
+        self.rocket = rocket
+        self.launchpad = launchpad
+        self.state_columns = con.state_columns + ('deployment_angle',) * (self.states.shape[1] > len(con.state_columns))
+        self._derived = {}
+
+    def __len__(self):
+        return len(self.states)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.column(key)
+        if isinstance(key, (int, np.integer)):
+            # a tuple, so it can be passed to the flight stages as an initial state like the states they return
+            return tuple(self.states[key])
+        return self.states[key]
+
+    def __iter__(self):
+        return map(tuple, self.states)
+
+    def __array__(self, dtype = None, copy = None):
+        if copy:
+            return np.array(self.states, dtype = dtype)
+        return np.asarray(self.states, dtype = dtype)
+
+    def to_numpy(self):
+        """ Returns the states as a 2D array with a row per state and columns in the order of state_columns. This is the array the Flightpath uses, not a copy. """
+        return self.states
+
+    def to_pandas(self, derived = ()):
+        """
+        Returns the flight as a DataFrame with a row per state.
+
+        Args
+        ----
+        derived : tuple, optional
+            Names of derived columns to add, e.g. ('airspeed', 'q'). Defaults to none.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The state columns, named as in state_columns, followed by any derived columns. Without derived columns the DataFrame wraps the states array without copying it.
+        """
+        import pandas as pd
+
+        dataframe = pd.DataFrame(self.states, columns = list(self.state_columns), copy = False)
+        for name in derived:
+            dataframe[name] = self.column(name)
+        return dataframe
+
+    def __getattr__(self, name):
+        # only called for attributes that aren't otherwise found, so columns can be accessed as attributes
+        if not name.startswith('_') and (name in self.derived_columns or name in self.__dict__.get('state_columns', ())):
+            return self.column(name)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def column(self, name):
+        """ Returns a column by name. State columns are views into the states, and derived columns are computed on first access. """
+        if name in self.state_columns:
+            return self.states[:, self.state_columns.index(name)]
+        if name not in self.derived_columns:
+            raise KeyError(f"Unknown column '{name}'. Must be one of {', '.join(self.state_columns + tuple(self.derived_columns))}")
+        method = self.derived_columns[name]
+        if method not in self._derived:
+            self._derived[method] = getattr(self, method)()
+        return self._derived[method]
+
+    def columns(self):
+        """ Returns the names of all the columns available. """
+        return self.state_columns + tuple(self.derived_columns)
+
+    def _require(self, attribute, column):
+        value = getattr(self, attribute)
+        if value is None:
+            raise ValueError(f"The '{column}' column needs the flight's {attribute}")
+        return value
+
+    def _wind_velocity(self):
+        # the boost stage sees 20% of the wind and the stages after burnout see all of it (see the notes in environment.py)
+        environment = self._require('environment', 'airspeed')
+        wind_fraction = np.ones(len(self))
+        if self.rocket is not None:
+            wind_fraction[self.time < self.rocket.motor.burn_time] = 0.2
+            if self.launchpad is not None:
+                on_rail = np.sqrt(self.x**2 + self.y**2 + self.z**2) < self.launchpad.rail_length - self.rocket.h_second_rail_button
+                wind_fraction[on_rail] = 0
+        windspeed_x = environment.mean_wind_speed * np.sin(environment.wind_heading)
+        windspeed_y = environment.mean_wind_speed * np.cos(environment.wind_heading)
+        return wind_fraction * windspeed_x, wind_fraction * windspeed_y
+
+    def _air_velocity(self):
+        if '_air_velocity' not in self._derived:
+            windspeed_x, windspeed_y = self._wind_velocity()
+            self._derived['_air_velocity'] = (self.v_x - windspeed_x, self.v_y - windspeed_y, self.v_z)
+        return self._derived['_air_velocity']
+
+    def _groundspeed(self):
+        return np.sqrt(self.v_x**2 + self.v_y**2 + self.v_z**2)
+
+    def _compass_heading(self):
+        return hfunc.compass_heading(self.v_x, self.v_y)
+
+    def _total_acceleration(self):
+        return np.sqrt(self.a_x**2 + self.a_y**2 + self.a_z**2)
+
+    def _g_force(self):
+        F_gravity = self.environment.local_gravity if self.environment is not None else con.F_gravity
+        return self.total_acceleration / F_gravity
+
+    def _airspeed(self):
+        v_x, v_y, v_z = self._air_velocity()
+        return np.sqrt(v_x**2 + v_y**2 + v_z**2)
+
+    def _angle_to_vertical(self):
+        return hfunc.angle_to_vertical(*self._air_velocity())
+
+    def _temperature(self):
+        environment = self._require('environment', 'temperature')
+        return hfunc.temp_at_altitude(self.z, environment.launchpad_temp, environment.local_T_lapse_rate)
+
+    def _air_density(self):
+        environment = self._require('environment', 'air_density')
+        return hfunc.air_density_optimized(self.temperature, environment.density_multiplier, environment.density_exponent)
+
+    def _mach_number(self):
+        return hfunc.mach_number_fn(self.airspeed, self.temperature)
+
+    def _dynamic_pressure(self):
+        return hfunc.calculate_dynamic_pressure(self.air_density, self.airspeed)
+
+    def _mass(self):
+        rocket = self._require('rocket', 'mass')
+        fuel_times, fuel_masses = zip(*sorted(rocket.motor.fuel_mass_curve.items()))
+        return rocket.dry_mass + np.interp(self.time, fuel_times, fuel_masses, right = 0)
+
+    def _drag_force(self):
+        rocket = self._require('rocket', 'drag_force')
+        mach_number = self.mach_number
+        try:
+            Cd_A = np.broadcast_to(rocket.Cd_A_rocket(mach_number), mach_number.shape)
+        except (TypeError, ValueError):
+            # drag curves written for single Mach numbers, e.g. with if statements
+            Cd_A = np.array([rocket.Cd_A_rocket(Ma) for Ma in mach_number])
+        return self.dynamic_pressure * Cd_A
@@ -0,0 +1,244 @@
+""" Conversion of configurations to and from JSON-compatible dictionaries, JSON, and bytes.
+
+Used to send configurations to the simulation service, to store them in job files, and to save them. Each dictionary holds the arguments the configuration's class is initialized with:
+- motor: {'thrust_curve': [[time, thrust], ...], 'dry_mass', 'fuel_mass_curve': [[time, mass], ...]}
+- rocket: {'rocket_mass', 'motor', 'A_rocket', 'Cd_rocket', 'h_second_rail_button'}, where Cd_rocket is a number or a drag curve {'mach': [...], 'Cd': [...]}
+- environment: {'launchpad_pressure', 'launchpad_temp' (°C), 'local_gravity', 'local_T_lapse_rate', 'mean_wind_speed', 'wind_heading' (deg)}
+- launchpad: {'rail_length', 'launch_rail_elevation', 'launch_rail_heading', 'hold_down_clamp_release_time', 'hold_down_clamp_force'}
+- parachute: {'Cd', 'area', 'deploy_altitude', 'deploy_delay'}
+- airbrakes: {'num_flaps', 'A_flap', 'Cd_brakes', 'max_deployment_angle', 'max_deployment_rate', 'max_retraction_rate'}
+- drag curve: {'mach': [...], 'Cd': [...]}
+
+Keys left out of a dictionary take the class's defaults. to_dict() adds the configuration's 'type' and the 'version' of the format, so from_dict() can tell what to make and reject dictionaries from newer versions of RFS; the functions for each type accept dictionaries with or without them.
+"""
+import hashlib
+import json
+import zlib
+
+import numpy as np
+
+from .classes.motor import Motor
+from .classes.rocket import Rocket
+from .classes.environment import Environment
+from .classes.launchpad import Launchpad
+from .classes.parachute import Parachute
+from .classes.airbrakes import Airbrakes
+from .classes.drag_curve import DragCurve
+
+format_version = 1
+# prefix of the binary form, followed by the format version as one byte and the compressed JSON
+_binary_magic = b'RFS'
+
+def _fields(config):
+    # the dictionary without the keys added by to_dict
+    return {key: value for key, value in config.items() if key not in ('type', 'version')}
+
+def _curve_to_list(curve):
+    return [[float(time), float(value)] for time, value in curve.items()]
+
+def _curve_from_list(curve):
+    if isinstance(curve, dict):
+        return {float(time): float(value) for time, value in curve.items()}
+    return {float(time): float(value) for time, value in curve}
+
+def motor_to_dict(motor):
+    """ Returns a Motor as a dictionary. """
+    return {
+        'thrust_curve': _curve_to_list(motor.thrust_curve),
+        'dry_mass': float(motor.dry_mass),
+        'fuel_mass_curve': _curve_to_list(motor.fuel_mass_curve),
+    }
+
+def motor_from_dict(config):
+    """ Returns the Motor of a dictionary made by motor_to_dict. A fuel_mass may be given instead of a fuel_mass_curve. """
+    config = _fields(config)
+    return Motor(
+        _curve_from_list(config['thrust_curve']),
+        config.get('dry_mass', 0),
+        fuel_mass_curve = _curve_from_list(config['fuel_mass_curve']) if config.get('fuel_mass_curve') is not None and len(config['fuel_mass_curve']) else None,
+        fuel_mass = config.get('fuel_mass'),
+    )
+
+def drag_curve_to_dict(drag_curve):
+    """ Returns a DragCurve as a dictionary. """
+    return {'mach': list(drag_curve.mach), 'Cd': list(drag_curve.Cd)}
+
+def drag_curve_from_dict(config):
+    """ Returns the DragCurve of a dictionary made by drag_curve_to_dict. """
+    return DragCurve(config['mach'], config['Cd'])
+
+def rocket_to_dict(rocket):
+    """ Returns a Rocket as a dictionary. Its Cd_rocket must be a number or a DragCurve. """
+    Cd_rocket = rocket.Cd_rocket
+    if isinstance(Cd_rocket, DragCurve):
+        Cd_rocket = drag_curve_to_dict(Cd_rocket)
+    elif callable(Cd_rocket):
+        raise ValueError("Drag coefficient functions can't be converted to a dictionary. Tabulate the function with DragCurve.from_function first")
+    else:
+        Cd_rocket = float(Cd_rocket)
+    return {
+        'rocket_mass': float(rocket.rocket_mass),
+        'motor': motor_to_dict(rocket.motor) if rocket.motor is not None else None,
+        'A_rocket': float(rocket.A_rocket),
+        'Cd_rocket': Cd_rocket,
+        'h_second_rail_button': float(rocket.h_second_rail_button),
+    }
+
+def rocket_from_dict(config):
+    """ Returns the Rocket of a dictionary made by rocket_to_dict. """
+    config = _fields(config)
+    Cd_rocket = config.get('Cd_rocket', 0.45)
+    if isinstance(Cd_rocket, dict):
+        Cd_rocket = drag_curve_from_dict(Cd_rocket)
+    kwargs = {'h_second_rail_button': config['h_second_rail_button']} if 'h_second_rail_button' in config else {}
+    return Rocket(
+        config['rocket_mass'],
+        motor_from_dict(config['motor']) if config.get('motor') is not None else None,
+        config['A_rocket'],
+        Cd_rocket,
+        **kwargs,
+    )
+
+def environment_to_dict(environment):
+    """ Returns an Environment as a dictionary. """
+    return {
+        'launchpad_pressure': float(environment.launchpad_pressure),
+        'launchpad_temp': float(environment.launchpad_temp - 273.15),
+        'local_gravity': float(environment.local_gravity),
+        'local_T_lapse_rate': float(environment.local_T_lapse_rate),
+        'mean_wind_speed': float(environment.mean_wind_speed),
+        'wind_heading': float(np.rad2deg(environment.wind_heading)),
+    }
+
+def environment_from_dict(config):
+    """ Returns the Environment of a dictionary made by environment_to_dict. latitude and altitude may be given instead of local_gravity. """
+    return Environment(**_fields(config))
+
+def launchpad_to_dict(launchpad):
+    """ Returns a Launchpad as a dictionary. """
+    return {
+        'rail_length': float(launchpad.rail_length),
+        'launch_rail_elevation': float(launchpad.launch_rail_elevation),
+        'launch_rail_heading': float(launchpad.launch_rail_heading),
+        'hold_down_clamp_release_time': float(launchpad.hold_down_clamp_release_time),
+        'hold_down_clamp_force': float(launchpad.hold_down_clamp_force),
+    }
+
+def launchpad_from_dict(config):
+    """ Returns the Launchpad of a dictionary made by launchpad_to_dict. """
+    return Launchpad(**_fields(config))
+
+def parachute_to_dict(parachute):
+    """ Returns a Parachute as a dictionary. """
+    return {
+        'Cd': float(parachute.Cd),
+        'area': float(parachute.area),
+        'deploy_altitude': parachute.deploy_altitude,
+        'deploy_delay': parachute.deploy_delay,
+    }
+
+def parachute_from_dict(config):
+    """ Returns the Parachute of a dictionary made by parachute_to_dict. """
+    return Parachute(**_fields(config))
+
+def airbrakes_to_dict(airbrakes):
+    """ Returns an Airbrakes as a dictionary. """
+    return {
+        'num_flaps': int(airbrakes.num_flaps),
+        'A_flap': float(airbrakes.A_flap),
+        'Cd_brakes': float(airbrakes.Cd_brakes),
+        'max_deployment_angle': float(airbrakes.max_deployment_angle),
+        'max_deployment_rate': float(airbrakes.max_deployment_rate),
+        'max_retraction_rate': float(airbrakes.max_retraction_rate),
+    }
+
+def airbrakes_from_dict(config):
+    """ Returns the Airbrakes of a dictionary made by airbrakes_to_dict. """
+    return Airbrakes(**_fields(config))
+
+# type name -> (class, to_dict function, from_dict function)
+config_types = {
+    'Motor': (Motor, motor_to_dict, motor_from_dict),
+    'Rocket': (Rocket, rocket_to_dict, rocket_from_dict),
+    'Environment': (Environment, environment_to_dict, environment_from_dict),
+    'Launchpad': (Launchpad, launchpad_to_dict, launchpad_from_dict),
+    'Parachute': (Parachute, parachute_to_dict, parachute_from_dict),
+    'Airbrakes': (Airbrakes, airbrakes_to_dict, airbrakes_from_dict),
+    'DragCurve': (DragCurve, drag_curve_to_dict, drag_curve_from_dict),
+}
+
+def to_dict(config):
+    """
+    Convert a configuration object to a versioned dictionary.
+
+    Args
+    ----
+    config : object
+        A Motor, Rocket, Environment, Launchpad, Parachute, Airbrakes, or DragCurve.
+
+    Returns
+    -------
+    dict
+        The configuration's 'type' and the format 'version', followed by the configuration's fields.
+    """
+    for type_name, (config_class, config_to_dict, _) in config_types.items():
+        if type(config) is config_class:
+            return {'type': type_name, 'version': format_version, **config_to_dict(config)}
+    raise TypeError(f"Can't convert a {type(config).__name__} to a dictionary. Must be one of {', '.join(config_types)}")
+
+def from_dict(config):
+    """
+    Make a configuration object from a dictionary made by to_dict.
+
+    Args
+    ----
+    config : dict
+        The dictionary.
+
+    Returns
+    -------
+    object
+        The configuration object.
+    """
+    type_name = config.get('type')
+    if type_name not in config_types:
+        raise ValueError(f"Unknown configuration type {type_name!r}. Must be one of {', '.join(config_types)}")
+    version = config.get('version', format_version)
+    if version > format_version:
+        raise ValueError(f"The {type_name} was saved in format version {version}, but this version of RFS only reads up to version {format_version}")
+    return config_types[type_name][2](config)
+
+def to_json(config):
+    """ Returns a configuration object as JSON. """
+    return json.dumps(to_dict(config), separators = (',', ':'), allow_nan = False)
+
+def from_json(text):
+    """ Returns the configuration object of JSON made by to_json. """
+    return from_dict(json.loads(text))
+
+def to_bytes(config):
+    """ Returns a configuration object in a compact binary form: a header with the format version, followed by its compressed JSON. """
+    return _binary_magic + bytes([format_version]) + zlib.compress(to_json(config).encode())
+
+def from_bytes(data):
+    """ Returns the configuration object of bytes made by to_bytes. """
+    if data[:len(_binary_magic)] != _binary_magic:
+        raise ValueError("Not an RFS configuration")
+    return from_json(zlib.decompress(data[len(_binary_magic) + 1:]).decode())
+
+def config_key(config):
+    """
+    Make a key identifying a configuration by its content.
+
+    Args
+    ----
+    config : dict
+        A JSON-compatible dictionary, e.g. of configuration dictionaries.
+
+    Returns
+    -------
+    str
+        A hash of the dictionary's canonical JSON, the same for equal dictionaries whatever the order of their keys.
+    """
+    canonical = json.dumps(config, sort_keys = True, separators = (',', ':'), allow_nan = False)
+    return hashlib.blake2b(canonical.encode(), digest_size = 16).hexdigest()
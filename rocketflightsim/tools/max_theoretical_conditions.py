@@ -1,6 +1,9 @@
+import warnings
+
 import numpy as np
 from .. import constants as con
 from .. import helper_functions as hfunc
+from ..classes.motor import Motor
 from ..classes.rocket import Rocket
 from ..classes.environment import Environment
 
@@ -31,7 +34,159 @@ def max_theoretical_accel_motor(rocket: Rocket, environment: Environment=None):
 
     return max_acceleration
 
-def max_theoretical_speed(rocket: Rocket, environment: Environment=None, timestep: float=0.0005):
+def _phi(x, n):
+    # integral of w^n / (1 + x w) from w = 0 to 1, for n = 0, 1, 2, with a series expansion near x = 0 to avoid cancellation
+    x = np.asarray(x, dtype = float)
+    small = np.abs(x) < 1e-3
+    x_safe = np.where(small, 1.0, x)
+    log_term = np.log1p(x_safe)
+    if n == 0:
+        exact = log_term / x_safe
+    elif n == 1:
+        exact = (x_safe - log_term) / x_safe**2
+    else:
+        exact = (x_safe**2 / 2 - x_safe + log_term) / x_safe**3
+    series = sum((-x)**k / (n + k + 1) for k in range(5))
+    return np.where(small, series, exact)
+
+def _pack_motor_curves(motors):
+    """
+    Put the thrust and fuel mass curves of one or more motors onto common breakpoints.
+
+    Args
+    ----
+    motors : list
+        A list of Motor objects.
+
+    Returns
+    -------
+    tuple
+        Arrays of the breakpoint times, thrust, and fuel mass, each of shape (number of motors, number of breakpoints). Both curves are linear between breakpoints. Motors with fewer breakpoints are padded by repeating their last breakpoint, which adds segments of zero length.
+    """
+    curves = []
+    for motor in motors:
+        thrust_times, thrusts = (np.array(values, dtype = float) for values in zip(*sorted(motor.thrust_curve.items())))
+        mass_times, masses = (np.array(values, dtype = float) for values in zip(*sorted(motor.fuel_mass_curve.items())))
+        times = np.union1d(thrust_times, mass_times)
+        times = times[(times >= 0) & (times <= motor.burn_time)]
+        curves.append((times, np.interp(times, thrust_times, thrusts), np.interp(times, mass_times, masses)))
+
+    num_breakpoints = max(len(times) for times, _, _ in curves)
+    packed = np.empty((3, len(curves), num_breakpoints))
+    for i, curve in enumerate(curves):
+        for j, values in enumerate(curve):
+            packed[j, i, :len(values)] = values
+            packed[j, i, len(values):] = values[-1]
+    return packed[0], packed[1], packed[2]
+
+def _burnout_conditions(motors, dry_masses, F_gravity):
+    """
+    Calculate the drag-free speed and height at burnout of one or more rockets exactly, by integrating the piecewise-linear thrust and mass curves in closed form.
+
+    Args
+    ----
+    motors : list
+        A list of Motor objects.
+    dry_masses : array_like
+        Dry mass of each rocket including the motor's dry mass (kg). Broadcast against the motors.
+    F_gravity : array_like
+        Acceleration due to gravity (m/s^2). Broadcast against the motors.
+
+    Returns
+    -------
+    tuple
+        Arrays of the speed (m/s) and height (m) at burnout.
+
+    Notes
+    -----
+    Between two breakpoints, thrust T = T_0 + q*u and mass m = M_0 + s*u are linear in the time u since the first breakpoint, so the integral of T/m over a segment of length L is T_0*L/M_0*phi_0(x) + q*L^2/M_0*phi_1(x), where x = s*L/M_0 and phi_n(x) is the integral of w^n/(1 + x*w) from 0 to 1. The same kernels give the integral of u*T/m, which gives the distance covered over the segment. As in the stepped versions of these tools, acceleration is taken as 0 while thrust is less than weight (the rocket sits on the pad), so each segment is only integrated over the part where T - m*g > 0. Since T - m*g is linear within a segment, that part is found exactly from its root.
+    """
+    times, thrust, fuel_mass = _pack_motor_curves(motors)
+    dry_masses = np.broadcast_to(np.asarray(dry_masses, dtype = float), (len(motors),))[:, np.newaxis]
+    g = np.broadcast_to(np.asarray(F_gravity, dtype = float), (len(motors),))[:, np.newaxis]
+
+    h = np.diff(times, axis = 1)
+    has_length = h > 0
+    h_safe = np.where(has_length, h, 1.0)
+    T_0 = thrust[:, :-1]
+    q = np.where(has_length, np.diff(thrust, axis = 1) / h_safe, 0.0)
+    M_0 = dry_masses + fuel_mass[:, :-1]
+    s = np.where(has_length, np.diff(fuel_mass, axis = 1) / h_safe, 0.0)
+
+    # net force f_0 + f_1*u, only integrated over the part of the segment where it's positive
+    f_0 = T_0 - g * M_0
+    f_1 = q - g * s
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        root = np.clip(-f_0 / f_1, 0, h)
+    lo = np.where(f_1 > 0, root, 0.0)
+    hi = np.where(f_1 < 0, root, np.where((f_1 == 0) & (f_0 <= 0), 0.0, h))
+    L = np.maximum(hi - lo, 0.0)
+
+    T_lo = T_0 + q * lo
+    M_lo = M_0 + s * lo
+    x = s * L / M_lo
+
+    delta_v = T_lo * L / M_lo * _phi(x, 0) + q * L**2 / M_lo * _phi(x, 1) - g * L
+    integral_u_a = T_lo * L**2 / M_lo * _phi(x, 1) + q * L**3 / M_lo * _phi(x, 2) - g * L**2 / 2
+    # distance covered within each segment on top of the speed it started with
+    delta_z_accel = (h - lo) * delta_v - integral_u_a
+
+    v_end = np.cumsum(delta_v, axis = 1)
+    v_start = v_end - delta_v
+    z_burnout = np.sum(v_start * h + delta_z_accel, axis = 1)
+
+    return v_end[:, -1], z_burnout
+
+def _as_list(motors):
+    return [motors] if isinstance(motors, Motor) else list(motors)
+
+def max_theoretical_speed_batch(motors, dry_masses, F_gravity = con.F_gravity):
+    """
+    Returns the maximum theoretical speeds that many rockets can reach, e.g. to screen thousands of designs. Assumes no drag, the motor performs at or below spec thrust curve, and no parts of the rocket fall off.
+
+    Args
+    ----
+    - motors (Motor or list of Motor): The motor of each rocket. A single Motor is used for every rocket.
+    - dry_masses (float or array_like): Dry mass of each rocket including the motor's dry mass, i.e. Rocket.dry_mass (kg).
+    - F_gravity (float or array_like, optional): Acceleration due to gravity for each rocket (m/s^2).
+
+    Returns
+    -------
+    - numpy.ndarray: The maximum theoretical speed each rocket can reach in m/s.
+    """
+    motors = _as_list(motors)
+    dry_masses = np.asarray(dry_masses, dtype = float)
+    if len(motors) == 1 and dry_masses.ndim:
+        motors = motors * len(dry_masses)
+    return _burnout_conditions(motors, dry_masses, F_gravity)[0]
+
+def max_theoretical_apogee_batch(motors, dry_masses, F_gravity = con.F_gravity):
+    """
+    Returns the maximum theoretical apogees that many rockets can reach, e.g. to screen thousands of designs. Assumes no drag, the motor performs at or below spec thrust curve, and no parts of the rocket fall off.
+
+    Args
+    ----
+    - motors (Motor or list of Motor): The motor of each rocket. A single Motor is used for every rocket.
+    - dry_masses (float or array_like): Dry mass of each rocket including the motor's dry mass, i.e. Rocket.dry_mass (kg).
+    - F_gravity (float or array_like, optional): Acceleration due to gravity for each rocket (m/s^2).
+
+    Returns
+    -------
+    - numpy.ndarray: The maximum theoretical apogee each rocket can reach in meters.
+    """
+    motors = _as_list(motors)
+    dry_masses = np.asarray(dry_masses, dtype = float)
+    if len(motors) == 1 and dry_masses.ndim:
+        motors = motors * len(dry_masses)
+    v_burnout, z_burnout = _burnout_conditions(motors, dry_masses, F_gravity)
+    # the ballistic coast after burnout has a closed form without drag
+    return z_burnout + v_burnout**2 / (2 * np.asarray(F_gravity, dtype = float))
+
+def _warn_timestep(timestep):
+    if timestep is not None:
+        warnings.warn("The timestep argument is ignored, as maximum theoretical conditions are now calculated exactly, and will be removed in a future version", DeprecationWarning, stacklevel = 3)
+
+def max_theoretical_speed(rocket: Rocket, environment: Environment=None, timestep: float=None):
     """
     Returns the maximum theoretical theoretical speed that a rocket can reach. Assumes no drag, the motor performs at or below spec thrust curve, and no parts of the rocket fall off.
 
@@ -39,65 +194,36 @@ def max_theoretical_speed(rocket: Rocket, environment: Environment=None, timeste
     ----
     - rocket (Rocket): A Rocket object.
     - environment (Environment, optional): An Environment object.
-    - timestep (float, optional): The time increment for the integration in seconds.
+    - timestep (float, optional): Deprecated and ignored. The speed was integrated with this timestep before it was calculated exactly.
 
     Returns
     -------
     - float: The maximum theoretical speed the rocket can reach in m/s.
     """
-    t = 0
-    v = 0
-    v_max = 0
+    _warn_timestep(timestep)
     if environment:
         F_gravity = environment.local_gravity
     else:
         F_gravity = con.F_gravity
-    
-    while t < rocket.motor.burn_time:
-        mass = hfunc.mass_at_time(t, rocket.dry_mass, rocket.motor.fuel_mass_curve)
-        thrust = hfunc.thrust_at_time(t, rocket.motor.thrust_curve)
-        acceleration = thrust / mass - F_gravity
-        if acceleration < 0:
-            acceleration = 0
-        v += acceleration * timestep
-        if v > v_max:
-            v_max = v
-        t += timestep
-    
-    return v_max
-
-def max_theoretical_apogee(rocket: Rocket, environment: Environment=None, timestep: float=0.0005):
+
+    return float(max_theoretical_speed_batch(rocket.motor, rocket.dry_mass, F_gravity)[0])
+
+def max_theoretical_apogee(rocket: Rocket, environment: Environment=None, timestep: float=None):
     """
     Returns the maximum theoretical apogee that a rocket can reach. Assumes no drag, the motor performs at or below spec thrust curve, and no parts of the rocket fall off.
     Args
     ----
     - rocket (Rocket): A Rocket object.
     - environment (Environment, optional): An Environment object.
-    - timestep (float, optional): The time increment for the integration in seconds.
+    - timestep (float, optional): Deprecated and ignored. The apogee was integrated with this timestep before it was calculated exactly.
     Returns
     -------
     - float: The maximum theoretical apogee the rocket can reach in meters.
     """
-    t = 0
-    v = 0
-    z = 0
+    _warn_timestep(timestep)
     if environment:
         F_gravity = environment.local_gravity
     else:
         F_gravity = con.F_gravity
-    
-    while t < rocket.motor.burn_time:
-        mass = hfunc.mass_at_time(t, rocket.dry_mass, rocket.motor.fuel_mass_curve)
-        thrust = hfunc.thrust_at_time(t, rocket.motor.thrust_curve)
-        acceleration = thrust / mass - F_gravity
-        if acceleration < 0:
-            acceleration = 0
-        v += acceleration * timestep
-        z += v * timestep
-        t += timestep
-    
-    acceleration = - F_gravity
-    while v > 0:
-        v += acceleration * timestep
-        z += v * timestep
-    return z
\ No newline at end of file
+
+    return float(max_theoretical_apogee_batch(rocket.motor, rocket.dry_mass, F_gravity)[0])
@@ -0,0 +1,439 @@
+""" Monte Carlo analysis of flights with dispersed parameters.
+
+Each flight of a study perturbs the parameters of a nominal flight (the motor's curves, the rocket's mass and drag, and the environment and launchpad) by amounts drawn from its own random stream. The stream of flight i is derived from the study's root seed with numpy.random.SeedSequence, as the i-th child that SeedSequence.spawn() would make, so it depends only on the root seed and the flight's index. A study therefore draws bitwise-identical inputs whether it runs on one process or many, in whatever order the flights are scheduled, and when it's resumed part way through.
+
+Each flight's stream is split in two: one stream draws a uniform number for each dispersed parameter, which is transformed into the parameter's distribution through its inverse CDF, and the other draws the noise on the points of the thrust curve. The uniform numbers can instead come from a scrambled Sobol sequence or a Latin hypercube (see tools.sampling), which cover the parameters more evenly than random numbers, so statistics of a study converge in fewer flights. convergence_comparison() measures how many fewer.
+"""
+import functools
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+from .. import constants as con
+from ..classes.motor import Motor
+from ..classes.rocket import Rocket
+from ..classes.environment import Environment
+from ..classes.launchpad import Launchpad
+from ..flight_stages_combined import flight_sim_ignition_to_apogee, flight_sim_ignition_to_landing
+from ..parallel import run_in_parallel
+from .sampling import sobol_points, latin_hypercube_points
+
+distributions = ('normal', 'uniform', 'truncated_normal')
+samplers = ('random', 'sobol', 'latin_hypercube')
+# the key of the stream that seeds Sobol and Latin hypercube samples, past any flight index
+_sampler_stream = 2**63
+
+# the parameters that can be dispersed: (configuration, attribute or argument, units)
+parameters = {
+    'total_impulse': ('motor', 'total_impulse', 'Ns'),
+    'burn_time': ('motor', 'burn_time', 's'),
+    'thrust_noise': ('motor', 'thrust_curve', 'fraction of thrust at each point'),
+    'rocket_mass': ('rocket', 'rocket_mass', 'kg'),
+    'Cd_rocket': ('rocket', 'Cd_rocket', 'drag coefficient'),
+    'launchpad_pressure': ('environment', 'launchpad_pressure', 'Pa'),
+    'launchpad_temp': ('environment', 'launchpad_temp', '°C'),
+    'local_T_lapse_rate': ('environment', 'local_T_lapse_rate', '°C/m'),
+    'mean_wind_speed': ('environment', 'mean_wind_speed', 'm/s'),
+    'wind_heading': ('environment', 'wind_heading', 'deg'),
+    'launch_rail_elevation': ('launchpad', 'launch_rail_elevation', 'deg'),
+    'launch_rail_heading': ('launchpad', 'launch_rail_heading', 'deg'),
+}
+
+_normal = NormalDist()
+_normal_cdf = np.vectorize(lambda x: 0.5 * (1 + math.erf(x / math.sqrt(2))), otypes = [float])
+_normal_ppf = np.vectorize(_normal.inv_cdf, otypes = [float])
+
+class Dispersion:
+    """
+    The Dispersion class describes how a parameter is dispersed around its nominal value.
+
+    Attributes
+    ----------
+    distribution : str
+        'normal', 'uniform', or 'truncated_normal'.
+    scale : float
+        Standard deviation of a normal or truncated normal distribution, or half the width of a uniform distribution.
+    low, high : float
+        Bounds of a truncated normal distribution, as offsets from the nominal value. None for no bound.
+    relative : bool
+        Whether the offsets are fractions of the nominal value rather than in the parameter's units.
+    """
+    def __init__(self, distribution, scale, low = None, high = None, relative = False):
+        """Initialize a Dispersion object.
+
+        Parameters
+        ----------
+        distribution : str
+            'normal', 'uniform', or 'truncated_normal'.
+        scale : float
+            Standard deviation of a normal or truncated normal distribution, or half the width of a uniform distribution.
+        low, high : float, optional
+            Bounds of a truncated normal distribution, as offsets from the nominal value. Default to no bounds.
+        relative : bool, optional
+            Whether the offsets are fractions of the nominal value rather than in the parameter's units. Defaults to False.
+        """
+        if distribution not in distributions:
+            raise ValueError(f"Invalid distribution '{distribution}'. Must be one of {', '.join(distributions)}")
+        self.distribution = distribution
+        self.scale = scale
+        self.low = low
+        self.high = high
+        self.relative = relative
+
+    def transform(self, u):
+        """
+        Transform uniform numbers into offsets from the nominal value.
+
+        Args
+        ----
+        u : float or numpy.ndarray
+            Numbers uniformly distributed between 0 and 1.
+
+        Returns
+        -------
+        float or numpy.ndarray
+            The offsets, distributed as the dispersion describes.
+        """
+        u = np.asarray(u, dtype = float)
+        if self.distribution == 'uniform':
+            return (2 * u - 1) * self.scale
+        # keeps the inverse CDF finite for numbers right at 0
+        u = np.clip(u, 1e-16, 1 - 1e-16)
+        if self.distribution == 'truncated_normal':
+            cdf_low = _normal_cdf(self.low / self.scale) if self.low is not None else 0.0
+            cdf_high = _normal_cdf(self.high / self.scale) if self.high is not None else 1.0
+            u = np.clip(cdf_low + u * (cdf_high - cdf_low), 1e-16, 1 - 1e-16)
+        return _normal_ppf(u) * self.scale
+
+    def __repr__(self):
+        bounds = f", low={self.low}, high={self.high}" if self.distribution == 'truncated_normal' else ''
+        return f"Dispersion({self.distribution!r}, {self.scale}{bounds}, relative={self.relative})"
+
+# dispersions typical of a student team's competition flight
+default_dispersions = {
+    'total_impulse': Dispersion('normal', 0.02, relative = True),
+    'burn_time': Dispersion('normal', 0.02, relative = True),
+    'thrust_noise': Dispersion('normal', 0.01),
+    'rocket_mass': Dispersion('normal', 0.01, relative = True),
+    'Cd_rocket': Dispersion('truncated_normal', 0.05, low = -0.15, high = 0.15, relative = True),
+    'launchpad_pressure': Dispersion('normal', 200),
+    'launchpad_temp': Dispersion('normal', 2),
+    'mean_wind_speed': Dispersion('truncated_normal', 1.5, low = -3, high = 3),
+    'wind_heading': Dispersion('uniform', 20),
+    'launch_rail_elevation': Dispersion('truncated_normal', 0.5, low = -1, high = 0),
+    'launch_rail_heading': Dispersion('uniform', 2),
+}
+
+def _check_dispersions(dispersions):
+    unknown_parameters = set(dispersions) - set(parameters)
+    if unknown_parameters:
+        raise ValueError(f"Unknown parameter(s): {', '.join(sorted(unknown_parameters))}. Must be among {', '.join(parameters)}")
+
+def flight_seed_sequence(root_seed, flight_index, stream = None):
+    """
+    Derive the seed sequence of a flight from the root seed of a study.
+
+    Args
+    ----
+    root_seed : int or numpy.random.SeedSequence
+        The root seed of the study.
+    flight_index : int
+        Index of the flight in the study.
+    stream : int, optional
+        Index of a stream within the flight: 0 for the parameters and 1 for the thrust curve noise. Defaults to the flight's own sequence.
+
+    Returns
+    -------
+    numpy.random.SeedSequence
+        The same sequence as SeedSequence(root_seed).spawn(flight_index + 1)[flight_index], without spawning the flights before it.
+    """
+    root = root_seed if isinstance(root_seed, np.random.SeedSequence) else np.random.SeedSequence(root_seed)
+    spawn_key = root.spawn_key + (flight_index,) + ((stream,) if stream is not None else ())
+    return np.random.SeedSequence(root.entropy, spawn_key = spawn_key, pool_size = root.pool_size)
+
+def flight_rng(root_seed, flight_index, stream = None):
+    """ Returns the random number generator of a flight, or of a stream within it, as for flight_seed_sequence. """
+    return np.random.default_rng(flight_seed_sequence(root_seed, flight_index, stream))
+
+def draw_offsets(dispersions, root_seed, flight_index, u = None):
+    """
+    Draw the offsets of a flight's parameters from their nominal values.
+
+    Args
+    ----
+    dispersions : dict
+        The Dispersion of each parameter, keyed by parameter name.
+    root_seed : int or numpy.random.SeedSequence
+        The root seed of the study.
+    flight_index : int
+        Index of the flight in the study.
+    u : array_like, optional
+        A uniform number for each dispersion, in the order of dispersions, e.g. from a quasi-random sampler. Defaults to drawing them from the flight's stream.
+
+    Returns
+    -------
+    dict
+        The offset of each parameter, keyed by parameter name.
+    """
+    _check_dispersions(dispersions)
+    if u is None:
+        u = flight_rng(root_seed, flight_index, 0).random(len(dispersions))
+    return {name: float(dispersion.transform(value)) for (name, dispersion), value in zip(dispersions.items(), u)}
+
+def _scaled_Cd(Cd_rocket, scale, Ma):
+    return Cd_rocket(Ma) * scale
+
+def perturbed_flight(rocket, environment, launchpad, dispersions, offsets, noise_rng = None):
+    """
+    Make the rocket, environment, and launchpad of a flight with its parameters offset from the nominal flight's.
+
+    Args
+    ----
+    rocket, environment, launchpad
+        The configurations of the nominal flight.
+    dispersions : dict
+        The Dispersion of each parameter, keyed by parameter name, which say whether each offset is relative.
+    offsets : dict
+        The offset of each parameter, keyed by parameter name, as drawn by draw_offsets.
+    noise_rng : numpy.random.Generator, optional
+        The generator to draw thrust curve noise from, the flight's stream 1. Needed if thrust_noise is dispersed.
+
+    Returns
+    -------
+    tuple
+        The (rocket, environment, launchpad) of the flight. The nominal configurations are left as they are.
+    """
+    def value(name, nominal):
+        if name not in offsets:
+            return nominal
+        if dispersions[name].relative:
+            return nominal * (1 + offsets[name])
+        return nominal + offsets[name]
+
+    motor = rocket.motor
+    thrust_curve = motor.thrust_curve
+    if 'thrust_noise' in offsets:
+        # the scale of the noise is drawn like any other parameter, and each point of the curve gets its own noise. The curve is then scaled back to its total impulse, so the noise changes only its shape
+        noise = noise_rng.standard_normal(len(thrust_curve)) * abs(offsets['thrust_noise'])
+        thrust_curve = {time: thrust * (1 + point_noise) for (time, thrust), point_noise in zip(thrust_curve.items(), noise)}
+    if thrust_curve is not motor.thrust_curve or 'total_impulse' in offsets or 'burn_time' in offsets:
+        total_impulse = np.trapezoid(list(thrust_curve.values()), list(thrust_curve.keys()))
+        time_scale = value('burn_time', motor.burn_time) / motor.burn_time
+        thrust_scale = value('total_impulse', motor.total_impulse) / total_impulse / time_scale
+        fuel_scale = value('total_impulse', motor.total_impulse) / motor.total_impulse
+        motor = Motor(
+            {time * time_scale: thrust * thrust_scale for time, thrust in thrust_curve.items()},
+            motor.dry_mass,
+            fuel_mass_curve = {time * time_scale: mass * fuel_scale for time, mass in motor.fuel_mass_curve.items()},
+        )
+
+    if motor is not rocket.motor or 'rocket_mass' in offsets or 'Cd_rocket' in offsets:
+        Cd_rocket = rocket.Cd_rocket
+        if 'Cd_rocket' in offsets:
+            if callable(Cd_rocket):
+                scale = value('Cd_rocket', 1.0) if dispersions['Cd_rocket'].relative else None
+                if scale is None:
+                    raise ValueError("Dispersions of a drag coefficient that varies with Mach number must be relative")
+                Cd_rocket = functools.partial(_scaled_Cd, Cd_rocket, scale)
+            else:
+                Cd_rocket = value('Cd_rocket', Cd_rocket)
+        rocket = Rocket(value('rocket_mass', rocket.rocket_mass), motor, rocket.A_rocket, Cd_rocket, rocket.h_second_rail_button)
+
+    if {'launchpad_pressure', 'launchpad_temp', 'local_T_lapse_rate', 'mean_wind_speed', 'wind_heading'} & set(offsets):
+        environment = Environment(
+            launchpad_pressure = value('launchpad_pressure', environment.launchpad_pressure),
+            launchpad_temp = value('launchpad_temp', environment.launchpad_temp - 273.15),
+            local_gravity = environment.local_gravity,
+            local_T_lapse_rate = value('local_T_lapse_rate', environment.local_T_lapse_rate),
+            mean_wind_speed = max(value('mean_wind_speed', environment.mean_wind_speed), 0),
+            wind_heading = value('wind_heading', np.rad2deg(environment.wind_heading)),
+        )
+
+    if {'launch_rail_elevation', 'launch_rail_heading'} & set(offsets):
+        launchpad = Launchpad(
+            launchpad.rail_length,
+            launch_rail_elevation = min(value('launch_rail_elevation', launchpad.launch_rail_elevation), 90),
+            launch_rail_heading = value('launch_rail_heading', launchpad.launch_rail_heading),
+            hold_down_clamp_release_time = launchpad.hold_down_clamp_release_time,
+            hold_down_clamp_force = launchpad.hold_down_clamp_force,
+        )
+    return rocket, environment, launchpad
+
+outputs = ('apogee', 'apogee_time', 'max_speed', 'landing_x', 'landing_y')
+
+def _simulate_flight(shared, task):
+    rocket, environment, launchpad, dispersions, root_seed, parachutes_and_conditions, timestep = shared
+    flight_index, u = task
+    offsets = draw_offsets(dispersions, root_seed, flight_index, u)
+    configs = perturbed_flight(rocket, environment, launchpad, dispersions, offsets, flight_rng(root_seed, flight_index, 1))
+    inputs = [offsets[name] for name in dispersions]
+    try:
+        if parachutes_and_conditions:
+            states = flight_sim_ignition_to_landing(*configs, parachutes_and_conditions, timestep = timestep).to_numpy()
+        else:
+            states = flight_sim_ignition_to_apogee(*configs, timestep = timestep).to_numpy()
+    except Exception:
+        # e.g. a flight that doesn't clear the rail
+        return flight_index, inputs, (np.nan,) * len(outputs)
+    apogee_index = states[:, 3].argmax()
+    ascent = states[:apogee_index + 1]
+    max_speed = np.sqrt(ascent[:, 4]**2 + ascent[:, 5]**2 + ascent[:, 6]**2).max()
+    landing = (states[-1, 1], states[-1, 2]) if parachutes_and_conditions else (np.nan, np.nan)
+    return flight_index, inputs, (states[apogee_index, 3], states[apogee_index, 0], max_speed, *landing)
+
+def sample_uniform(sampler, dimensions, root_seed, flight_indices, sample_size = None):
+    """
+    Sample the uniform numbers of flights, from which their offsets are transformed.
+
+    Args
+    ----
+    sampler : str
+        'random', 'sobol', or 'latin_hypercube' (see samplers).
+    dimensions : int
+        Number of dispersed parameters.
+    root_seed : int or numpy.random.SeedSequence
+        The root seed of the study.
+    flight_indices : array_like
+        Indices of the flights.
+    sample_size : int, optional
+        Number of flights in the whole study, which a Latin hypercube sample needs. Defaults to one past the last flight index.
+
+    Returns
+    -------
+    numpy.ndarray
+        The uniform numbers of each flight, one row per flight.
+    """
+    flight_indices = np.asarray(flight_indices, dtype = int)
+    if sampler == 'random':
+        return np.array([flight_rng(root_seed, int(i), 0).random(dimensions) for i in flight_indices]).reshape(len(flight_indices), dimensions)
+    # the sample is seeded from a stream that no flight uses
+    seed = flight_seed_sequence(root_seed, _sampler_stream)
+    if sampler == 'sobol':
+        return sobol_points(dimensions, flight_indices, seed = seed)
+    if sampler == 'latin_hypercube':
+        if sample_size is None:
+            sample_size = int(flight_indices.max()) + 1 if flight_indices.size else 0
+        if flight_indices.size and flight_indices.max() >= sample_size:
+            raise ValueError("The flights of a Latin hypercube sample must be within its sample size")
+        return latin_hypercube_points(dimensions, sample_size, flight_indices, seed = seed)
+    raise ValueError(f"Invalid sampler '{sampler}'. Must be one of {', '.join(samplers)}")
+
+def monte_carlo(rocket, environment, launchpad, num_flights, root_seed, dispersions = None, parachutes_and_conditions = None, first_flight = 0, sampler = 'random', sample_size = None, timestep = con.default_timestep, processes = None):
+    """
+    Simulate flights with dispersed parameters in parallel.
+
+    Args
+    ----
+    rocket, environment, launchpad
+        The configurations of the nominal flight.
+    num_flights : int
+        Number of flights to simulate.
+    root_seed : int or numpy.random.SeedSequence
+        The root seed of the study. Record it with the results, as it's all that's needed to reproduce them.
+    dispersions : dict, optional
+        The Dispersion of each parameter to disperse, keyed by parameter name. Defaults to default_dispersions.
+    parachutes_and_conditions : list, optional
+        Parachutes to descend under, as for flight_sim_ignition_to_landing. Defaults to None, to simulate to apogee.
+    first_flight : int, optional
+        Index of the first flight to simulate, e.g. to resume a study or to split it into parts. Defaults to 0.
+    sampler : str, optional
+        How the parameters are sampled: 'random' (the default), from each flight's own stream, or 'sobol' or 'latin_hypercube', which spread the flights more evenly over the parameters and so need fewer of them for the same confidence (see tools.sampling). Sobol samples are best in powers of 2.
+    sample_size : int, optional
+        Number of flights in the whole study, for Latin hypercube samples split into parts or resumed. Defaults to first_flight + num_flights.
+    timestep : float or dict, optional
+        The timestep or timestep schedule of the simulations.
+    processes : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+
+    Returns
+    -------
+    dict
+        'flight_index': the index of each flight; 'inputs': the offset of each dispersed parameter from its nominal value, one row per flight with a column for each parameter in the order of dispersions; 'parameters': the names of the columns of inputs; and an array of each output ('apogee', 'apogee_time', 'max_speed', 'landing_x', 'landing_y'), NaN where it wasn't simulated. Flights are in order of index, whatever order they were simulated in.
+    """
+    dispersions = default_dispersions if dispersions is None else dispersions
+    _check_dispersions(dispersions)
+    if not isinstance(root_seed, np.random.SeedSequence):
+        root_seed = np.random.SeedSequence(root_seed)
+
+    flight_indices = np.arange(first_flight, first_flight + num_flights)
+    if sampler == 'random':
+        # workers draw the numbers of their flights themselves
+        tasks = [(int(i), None) for i in flight_indices]
+    else:
+        uniform_points = sample_uniform(sampler, len(dispersions), root_seed, flight_indices, sample_size if sample_size is not None else first_flight + num_flights)
+        tasks = [(int(i), tuple(u)) for i, u in zip(flight_indices, uniform_points)]
+    shared = (rocket, environment, launchpad, dispersions, root_seed, parachutes_and_conditions, timestep)
+
+    inputs = np.empty((num_flights, len(dispersions)))
+    results = np.empty((num_flights, len(outputs)))
+    for flight_index, flight_inputs, flight_outputs in run_in_parallel(_simulate_flight, tasks, shared = shared, processes = processes, ordered = False):
+        inputs[flight_index - first_flight] = flight_inputs
+        results[flight_index - first_flight] = flight_outputs
+
+    study = {'flight_index': flight_indices, 'inputs': inputs, 'parameters': tuple(dispersions)}
+    for j, output in enumerate(outputs):
+        study[output] = results[:, j]
+    return study
+
+def study_statistics(values, percentiles = (5, 50, 95)):
+    """ Returns the mean, standard deviation, and percentiles of an output of a study, ignoring flights that weren't simulated, keyed 'mean', 'std', and e.g. 'p95'. """
+    values = np.asarray(values, dtype = float)
+    values = values[~np.isnan(values)]
+    statistics = {'mean': values.mean(), 'std': values.std(ddof = 1)}
+    for percentile in percentiles:
+        statistics[f"p{percentile:g}"] = np.percentile(values, percentile)
+    return statistics
+
+def convergence_comparison(rocket, environment, launchpad, sample_sizes = (16, 32, 64, 128), num_repeats = 8, root_seed = 0, samplers = samplers, output = 'apogee', percentiles = (5, 50, 95), dispersions = None, parachutes_and_conditions = None, timestep = con.default_timestep, processes = None):
+    """
+    Compare how quickly the statistics of an output converge with the number of flights for each sampler.
+
+    Each sampler runs num_repeats independent studies of each sample size, and the spread of a statistic across them is the standard error of estimating it from a study of that size. A sampler whose error at N flights matches plain random sampling's at M flights gives the same confidence for N/M of the simulations.
+
+    Args
+    ----
+    rocket, environment, launchpad
+        The configurations of the nominal flight.
+    sample_sizes : tuple, optional
+        Numbers of flights per study, increasing. Powers of 2 suit Sobol samples. Defaults to (16, 32, 64, 128).
+    num_repeats : int, optional
+        Number of independent studies of each size. Defaults to 8.
+    root_seed : int or numpy.random.SeedSequence, optional
+        The root seed of the comparison. Repeat r has the r-th child of it as its root seed. Defaults to 0.
+    samplers : tuple, optional
+        The samplers to compare. Defaults to all of them.
+    output : str, optional
+        The output to compare the statistics of, e.g. 'apogee' or 'landing_x'. Defaults to 'apogee'.
+    percentiles : tuple, optional
+        Percentiles of the output to compare, along with its mean and standard deviation. Defaults to (5, 50, 95).
+    dispersions, parachutes_and_conditions, timestep, processes
+        As for monte_carlo.
+
+    Returns
+    -------
+    dict
+        'sample_sizes', 'statistics' (the names of the statistics), and for each sampler, an array of the standard error of each statistic (columns) at each sample size (rows). 'estimates' holds, for each sampler, the estimates themselves, indexed [repeat, sample size, statistic].
+    """
+    if output not in outputs:
+        raise ValueError(f"Invalid output '{output}'. Must be one of {', '.join(outputs)}")
+    sample_sizes = sorted(sample_sizes)
+    statistics = ('mean', 'std') + tuple(f"p{percentile:g}" for percentile in percentiles)
+    estimates = {sampler: np.empty((num_repeats, len(sample_sizes), len(statistics))) for sampler in samplers}
+    for repeat in range(num_repeats):
+        repeat_seed = flight_seed_sequence(root_seed, repeat)
+        for sampler in samplers:
+            if sampler == 'latin_hypercube':
+                # a smaller Latin hypercube isn't part of a larger one, so each size is its own study
+                values = [monte_carlo(rocket, environment, launchpad, size, repeat_seed, dispersions, parachutes_and_conditions, sampler = sampler, timestep = timestep, processes = processes)[output] for size in sample_sizes]
+            else:
+                # random and Sobol studies of each size are the first flights of the largest
+                largest = monte_carlo(rocket, environment, launchpad, sample_sizes[-1], repeat_seed, dispersions, parachutes_and_conditions, sampler = sampler, timestep = timestep, processes = processes)[output]
+                values = [largest[:size] for size in sample_sizes]
+            for j, size_values in enumerate(values):
+                estimates[sampler][repeat, j] = list(study_statistics(size_values, percentiles).values())
+
+    comparison = {'sample_sizes': np.array(sample_sizes), 'statistics': statistics, 'estimates': estimates}
+    for sampler in samplers:
+        comparison[sampler] = estimates[sampler].std(axis = 0, ddof = 1)
+    return comparison
@@ -0,0 +1,400 @@
+""" Offline motor library of RASP (.eng) and RockSim (.rse) motor files.
+
+Reads a local directory of motor files (e.g. a download of the thrustcurve.org library) into Motor objects. Parsing thousands of files is slow, so the parsed curves and specifications are stored in a compact binary cache (a NumPy .npz file) keyed by a hash of each file's contents: on later loads, only new or edited files are parsed. The specifications are kept as arrays indexed by impulse class, so searches by impulse class, diameter, total impulse, and burn time don't touch the curves.
+"""
+import hashlib
+import math
+import os
+import xml.etree.ElementTree as ElementTree
+
+import numpy as np
+
+from ..classes.motor import Motor
+
+motor_file_extensions = ('.eng', '.rse')
+default_cache_name = '.rfs_motor_cache.npz'
+cache_version = 1
+
+# specifications stored for each motor, in the order of the cache arrays
+_text_fields = ('name', 'manufacturer', 'delays', 'path', 'file_hash')
+_number_fields = ('diameter', 'length', 'propellant_mass', 'total_mass', 'total_impulse', 'burn_time', 'peak_thrust')
+
+def impulse_class(total_impulse):
+    """
+    Get the impulse class of a motor, the letter for its range of total impulse.
+
+    Args
+    ----
+    total_impulse : float
+        Total impulse of the motor (Ns).
+
+    Returns
+    -------
+    str
+        The impulse class, from '1/8A' and 'A' (up to 2.5 Ns) to 'Z', with each letter covering twice the impulse of the one before.
+    """
+    if total_impulse <= 0.3125:
+        return '1/8A'
+    if total_impulse <= 0.625:
+        return '1/4A'
+    if total_impulse <= 1.25:
+        return '1/2A'
+    return chr(ord('A') + min(max(math.ceil(math.log2(total_impulse / 1.25)) - 1, 0), 25))
+
+def _curve_motor(name, manufacturer, diameter, length, delays, propellant_mass, total_mass, times, thrusts, masses):
+    # specifications and curves of a parsed motor, with the curves starting at ignition
+    if times[0] > 0:
+        times = [0.0] + times
+        thrusts = [0.0] + thrusts
+        masses = [propellant_mass] + masses if masses else masses
+    return {
+        'name': name,
+        'manufacturer': manufacturer,
+        'diameter': diameter,
+        'length': length,
+        'delays': delays,
+        'propellant_mass': propellant_mass,
+        'total_mass': total_mass,
+        'times': np.array(times, dtype = float),
+        'thrusts': np.array(thrusts, dtype = float),
+        'masses': np.array(masses, dtype = float) if masses else np.full(len(times), np.nan),
+    }
+
+def parse_eng(text):
+    """
+    Parse the motors in a RASP (.eng) motor file.
+
+    Args
+    ----
+    text : str
+        Contents of the file.
+
+    Returns
+    -------
+    list
+        A dictionary for each motor in the file with its 'name', 'manufacturer', 'diameter' (mm), 'length' (mm), 'delays', 'propellant_mass' (kg), 'total_mass' (kg), and its thrust curve as arrays of 'times' (s) and 'thrusts' (N). 'masses' is all NaN, as .eng files don't have a fuel mass curve.
+    """
+    motors = []
+    header = None
+    times, thrusts = [], []
+    for line in text.splitlines():
+        line = line.split(';', 1)[0].strip()
+        if not line:
+            continue
+        fields = line.split()
+        if header is None:
+            # name, diameter (mm), length (mm), delays, propellant mass (kg), total mass (kg), manufacturer
+            if len(fields) < 7:
+                raise ValueError(f"Invalid .eng header line: '{line}'")
+            header = fields
+            times, thrusts = [], []
+            continue
+        time, thrust = float(fields[0]), float(fields[1])
+        if times and time <= times[-1]:
+            continue
+        times.append(time)
+        thrusts.append(thrust)
+        # a thrust of zero after ignition ends the curve
+        if thrust == 0 and time > 0:
+            motors.append(_curve_motor(header[0], ' '.join(header[6:]), float(header[1]), float(header[2]), header[3], float(header[4]), float(header[5]), times, thrusts, []))
+            header = None
+    if header is not None and times:
+        motors.append(_curve_motor(header[0], ' '.join(header[6:]), float(header[1]), float(header[2]), header[3], float(header[4]), float(header[5]), times, thrusts, []))
+    return motors
+
+def parse_rse(text):
+    """
+    Parse the motors in a RockSim (.rse) motor file.
+
+    Args
+    ----
+    text : str
+        Contents of the file.
+
+    Returns
+    -------
+    list
+        A dictionary for each motor in the file, as for parse_eng. 'masses' is the propellant mass at each time (kg) where the file gives it, and NaN otherwise.
+    """
+    motors = []
+    root = ElementTree.fromstring(text)
+    for engine in root.iter('engine'):
+        times, thrusts, masses = [], [], []
+        for point in engine.iter('eng-data'):
+            time = float(point.get('t'))
+            if times and time <= times[-1]:
+                continue
+            times.append(time)
+            thrusts.append(float(point.get('f')))
+            masses.append(float(point.get('m')) / 1000 if point.get('m') is not None else None)
+        if not times:
+            continue
+        if None in masses:
+            masses = []
+        # masses in .rse files are in grams
+        motors.append(_curve_motor(
+            engine.get('code'),
+            engine.get('mfg', ''),
+            float(engine.get('dia', 'nan')),
+            float(engine.get('len', 'nan')),
+            engine.get('delays', ''),
+            float(engine.get('propWt', 'nan')) / 1000,
+            float(engine.get('initWt', 'nan')) / 1000,
+            times, thrusts, masses,
+        ))
+    return motors
+
+def parse_motor_file(path):
+    """
+    Parse the motors in a .eng or .rse motor file.
+
+    Args
+    ----
+    path : str
+        Path to the file.
+
+    Returns
+    -------
+    list
+        A dictionary for each motor in the file, as for parse_eng.
+    """
+    with open(path, 'r', encoding = 'utf-8', errors = 'replace') as file:
+        text = file.read()
+    if path.lower().endswith('.rse'):
+        return parse_rse(text)
+    return parse_eng(text)
+
+def _file_hash(path):
+    with open(path, 'rb') as file:
+        return hashlib.blake2b(file.read(), digest_size = 16).hexdigest()
+
+class MotorLibrary:
+    """
+    The MotorLibrary class is used to load a directory of motor files and search the motors in it.
+
+    Specifications are stored as arrays with one value per motor, and the thrust curves of all the motors are stored end to end in single arrays. Motor objects are only made when a motor is asked for.
+
+    Attributes
+    ----------
+    directory : str
+        The directory the motor files are in. Subdirectories are included.
+    cache_path : str
+        Path of the cache file, or None if the library isn't cached.
+    name, manufacturer, delays, path, file_hash : numpy.ndarray
+        Designation, manufacturer, available ejection delays, file path relative to the directory, and hash of the file contents of each motor.
+    diameter, length : numpy.ndarray
+        Diameter and length of each motor (mm).
+    propellant_mass, total_mass : numpy.ndarray
+        Propellant mass and total mass of each motor before ignition (kg).
+    total_impulse, burn_time, peak_thrust : numpy.ndarray
+        Total impulse (Ns), burn time (s), and peak thrust (N) of each motor, from its thrust curve.
+    impulse_class : numpy.ndarray
+        Impulse class of each motor.
+    errors : dict
+        Files that couldn't be parsed, with their error message, keyed by path relative to the directory.
+    num_parsed : int
+        Number of files parsed on the last load, rather than read from the cache.
+    """
+    def __init__(self, directory, cache_path = None, use_cache = True):
+        """Initialize a MotorLibrary object and load the motors in a directory.
+
+        Parameters
+        ----------
+        directory : str
+            The directory the motor files are in. Subdirectories are included.
+        cache_path : str, optional
+            Path of the cache file. Defaults to a file named .rfs_motor_cache.npz in the directory.
+        use_cache : bool, optional
+            Whether to read and write the cache. Defaults to True.
+        """
+        self.directory = directory
+        self.cache_path = (cache_path or os.path.join(directory, default_cache_name)) if use_cache else None
+        self.errors = {}
+        self.num_parsed = 0
+        self.load()
+
+    def __len__(self):
+        return len(self.name)
+
+    def load(self):
+        """ Loads the motors from the directory, parsing only the files that aren't in the cache, and rewrites the cache if any files were parsed or removed. """
+        paths = []
+        for root, _, files in os.walk(self.directory):
+            for file in files:
+                if file.lower().endswith(motor_file_extensions):
+                    paths.append(os.path.relpath(os.path.join(root, file), self.directory))
+        paths.sort()
+
+        cached = self._read_cache()
+        # rows of the cache by the hash of the file they came from
+        cached_rows = {}
+        if cached is not None:
+            for row, file_hash in enumerate(cached['file_hash']):
+                cached_rows.setdefault(file_hash, []).append(row)
+
+        self.errors = {}
+        self.num_parsed = 0
+        fields = {field: [] for field in _text_fields + _number_fields}
+        curves = []
+        cache_rows_used = set()
+        for path in paths:
+            file_hash = _file_hash(os.path.join(self.directory, path))
+            if file_hash in cached_rows:
+                for row in cached_rows[file_hash]:
+                    cache_rows_used.add(row)
+                    for field in _text_fields + _number_fields:
+                        fields[field].append(cached[field][row])
+                    fields['path'][-1] = path
+                    start, end = cached['offsets'][row], cached['offsets'][row + 1]
+                    curves.append((cached['times'][start:end], cached['thrusts'][start:end], cached['masses'][start:end]))
+                continue
+
+            try:
+                motors = parse_motor_file(os.path.join(self.directory, path))
+            except (ValueError, IndexError, ElementTree.ParseError) as error:
+                self.errors[path] = str(error)
+                continue
+            self.num_parsed += 1
+            for motor in motors:
+                for field in ('name', 'manufacturer', 'delays', 'diameter', 'length', 'propellant_mass', 'total_mass'):
+                    fields[field].append(motor[field])
+                fields['path'].append(path)
+                fields['file_hash'].append(file_hash)
+                fields['total_impulse'].append(np.trapezoid(motor['thrusts'], motor['times']))
+                fields['burn_time'].append(motor['times'][-1])
+                fields['peak_thrust'].append(motor['thrusts'].max())
+                curves.append((motor['times'], motor['thrusts'], motor['masses']))
+
+        for field in _text_fields:
+            setattr(self, field, np.array(fields[field], dtype = str))
+        for field in _number_fields:
+            setattr(self, field, np.array(fields[field], dtype = float))
+        lengths = [len(times) for times, _, _ in curves]
+        self._offsets = np.concatenate(([0], np.cumsum(lengths, dtype = np.int64)))
+        self._times = np.concatenate([times for times, _, _ in curves]) if curves else np.empty(0)
+        self._thrusts = np.concatenate([thrusts for _, thrusts, _ in curves]) if curves else np.empty(0)
+        self._masses = np.concatenate([masses for _, _, masses in curves]) if curves else np.empty(0)
+        self._build_index()
+
+        if self.cache_path is not None and (self.num_parsed or cached is None or len(cache_rows_used) != len(cached['file_hash'])):
+            self._write_cache()
+
+    def _build_index(self):
+        self.impulse_class = np.array([impulse_class(total_impulse) for total_impulse in self.total_impulse], dtype = str)
+        # motors of each impulse class, in order of total impulse
+        order = np.argsort(self.total_impulse, kind = 'stable')
+        self._by_class = {}
+        for i in order:
+            self._by_class.setdefault(self.impulse_class[i], []).append(i)
+        self._by_class = {key: np.array(indices, dtype = np.int64) for key, indices in self._by_class.items()}
+
+    def _read_cache(self):
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with np.load(self.cache_path, allow_pickle = False) as cache:
+                if int(cache['version']) != cache_version:
+                    return None
+                return {key: cache[key] for key in cache.files}
+        except (OSError, ValueError, KeyError):
+            # an unreadable cache is rebuilt
+            return None
+
+    def _write_cache(self):
+        arrays = {field: getattr(self, field) for field in _text_fields + _number_fields}
+        temporary_path = self.cache_path + '.tmp.npz'
+        np.savez(temporary_path, version = cache_version, offsets = self._offsets, times = self._times, thrusts = self._thrusts, masses = self._masses, **arrays)
+        os.replace(temporary_path, self.cache_path)
+
+    def query(self, impulse_class = None, diameter = None, min_total_impulse = None, max_total_impulse = None, min_burn_time = None, max_burn_time = None, manufacturer = None, name = None):
+        """
+        Find the motors that match all of the given criteria.
+
+        Args
+        ----
+        impulse_class : str or iterable, optional
+            Impulse class, e.g. 'L', or several impulse classes.
+        diameter : float, optional
+            Motor diameter (mm). Matches motors within 0.5 mm of it.
+        min_total_impulse, max_total_impulse : float, optional
+            Range of total impulse (Ns).
+        min_burn_time, max_burn_time : float, optional
+            Range of burn time (s).
+        manufacturer : str, optional
+            Manufacturer, matched case-insensitively against the start of the manufacturer's name.
+        name : str, optional
+            Motor designation, matched case-insensitively anywhere in the designation.
+
+        Returns
+        -------
+        numpy.ndarray
+            Indices of the matching motors, in order of total impulse.
+        """
+        if impulse_class is None:
+            candidates = np.argsort(self.total_impulse, kind = 'stable')
+        else:
+            classes = [impulse_class] if isinstance(impulse_class, str) else list(impulse_class)
+            candidates = np.concatenate([self._by_class.get(key, np.empty(0, dtype = np.int64)) for key in classes])
+            candidates = candidates[np.argsort(self.total_impulse[candidates], kind = 'stable')]
+
+        match = np.ones(len(candidates), dtype = bool)
+        if diameter is not None:
+            match &= np.abs(self.diameter[candidates] - diameter) <= 0.5
+        if min_total_impulse is not None:
+            match &= self.total_impulse[candidates] >= min_total_impulse
+        if max_total_impulse is not None:
+            match &= self.total_impulse[candidates] <= max_total_impulse
+        if min_burn_time is not None:
+            match &= self.burn_time[candidates] >= min_burn_time
+        if max_burn_time is not None:
+            match &= self.burn_time[candidates] <= max_burn_time
+        if manufacturer is not None:
+            match &= np.char.startswith(np.char.lower(self.manufacturer[candidates]), manufacturer.lower())
+        if name is not None:
+            match &= np.char.find(np.char.lower(self.name[candidates]), name.lower()) >= 0
+        return candidates[match]
+
+    def find(self, name):
+        """ Returns the index of the motor with a designation, ignoring case. Raises a KeyError if there isn't exactly one. """
+        matches = np.flatnonzero(np.char.lower(self.name) == name.lower())
+        if len(matches) != 1:
+            raise KeyError(f"{len(matches)} motors named '{name}' in the library")
+        return int(matches[0])
+
+    def thrust_curve(self, index):
+        """ Returns the thrust curve of a motor as arrays of times (s) and thrusts (N). """
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._times[start:end], self._thrusts[start:end]
+
+    def motor(self, index):
+        """
+        Make a Motor object for a motor in the library.
+
+        Args
+        ----
+        index : int or str
+            Index of the motor, or its designation.
+
+        Returns
+        -------
+        Motor
+            The motor. Its dry mass is the total mass less the propellant mass. Its fuel mass curve comes from the motor file where it has one, and is otherwise calculated from the thrust curve.
+        """
+        if isinstance(index, str):
+            index = self.find(index)
+        start, end = self._offsets[index], self._offsets[index + 1]
+        times = self._times[start:end].tolist()
+        thrust_curve = dict(zip(times, self._thrusts[start:end].tolist()))
+        masses = self._masses[start:end]
+        dry_mass = self.total_mass[index] - self.propellant_mass[index]
+        if np.isnan(masses).any():
+            return Motor(thrust_curve, dry_mass, fuel_mass = self.propellant_mass[index])
+        return Motor(thrust_curve, dry_mass, fuel_mass_curve = dict(zip(times, masses.tolist())))
+
+    def summary(self, indices = None):
+        """ Returns the designation, manufacturer, impulse class, diameter, total impulse, and burn time of motors as a table. Defaults to every motor. """
+        indices = range(len(self)) if indices is None else indices
+        lines = [f"{'motor':<20}{'manufacturer':<22}{'class':>6}{'dia (mm)':>10}{'impulse (Ns)':>14}{'burn (s)':>10}"]
+        for i in indices:
+            lines.append(f"{self.name[i]:<20}{self.manufacturer[i][:21]:<22}{self.impulse_class[i]:>6}{self.diameter[i]:>10.0f}{self.total_impulse[i]:>14.1f}{self.burn_time[i]:>10.2f}")
+        return "\n".join(lines)
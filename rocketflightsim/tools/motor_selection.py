@@ -0,0 +1,181 @@
+""" Motor selection for an airframe.
+
+Evaluates every motor in a motor library, or a list of motors, in a rocket airframe against one or more environments, and ranks the motors by apogee, rail exit velocity, max acceleration, or closeness to a target apogee. Motors that can't lift the rocket off, or can't get within tolerance of the target apogee even without drag, are pruned with the closed-form bounds of max_theoretical_conditions before anything is simulated. The rest are simulated in parallel.
+"""
+import numpy as np
+
+from .. import constants as con
+from ..flight_stages_combined import flight_sim_ignition_to_apogee
+from ..parallel import run_in_parallel
+from .max_theoretical_conditions import max_theoretical_apogee_batch
+from .motor_library import MotorLibrary
+
+# how each ranking sorts the evaluated motors: the summary metric it sorts by, and whether higher is better
+rankings = {
+    'apogee': ('mean_apogee', True),
+    'rail_exit_velocity': ('min_rail_exit_velocity', True),
+    'max_acceleration': ('max_acceleration', False),
+    'target_error': ('target_error', False),
+}
+
+def _motor_candidates(motors, indices):
+    # names and Motor objects of the motors to evaluate
+    if isinstance(motors, MotorLibrary):
+        indices = range(len(motors)) if indices is None else indices
+        return [str(motors.name[i]) for i in indices], [motors.motor(i) for i in indices]
+    if isinstance(motors, dict):
+        return list(motors.keys()), list(motors.values())
+    motors = list(motors)
+    return [f"motor {i}" for i in range(len(motors))], motors
+
+def _evaluate_motor(shared, index):
+    rocket, motors, environments, launchpad, timestep = shared
+    rocket = rocket.with_motor(motors[index])
+    metrics = []
+    for environment in environments:
+        checkpoints = []
+        try:
+            flightpath = flight_sim_ignition_to_apogee(rocket, environment, launchpad, timestep = timestep, checkpoints = checkpoints)
+        except Exception as error:
+            # e.g. the motor never lifts the rocket off, or the rocket doesn't clear the rail before burnout
+            return index, str(error)
+        rail_clearance_state = checkpoints[1].state
+        metrics.append((
+            float(flightpath[-1][3]),
+            float(np.sqrt(rail_clearance_state[4]**2 + rail_clearance_state[5]**2 + rail_clearance_state[6]**2)),
+            float(flightpath.total_acceleration.max()),
+        ))
+    return index, metrics
+
+def evaluate_motors(rocket, motors, environments, launchpad, target_apogee = None, apogee_tolerance = 0, indices = None, timestep = con.default_timestep, processes = None):
+    """
+    Evaluate motors in a rocket airframe, pruning the motors that can't lift it off or reach a target apogee.
+
+    Args
+    ----
+    rocket : Rocket
+        The airframe. Its motor, if it has one, is replaced by each motor in turn.
+    motors : MotorLibrary, dict, or list
+        The motors to evaluate: a MotorLibrary, a dictionary of Motor objects keyed by name, or a list of Motor objects.
+    environments : Environment or list
+        One or more environments to fly each motor in.
+    launchpad : Launchpad
+        An instance of the Launchpad class.
+    target_apogee : float, optional
+        The target apogee (m). Motors whose drag-free apogee is below target_apogee - apogee_tolerance in every environment are pruned, as their simulated apogee can only be lower. Defaults to None, for no target.
+    apogee_tolerance : float, optional
+        How far below the target apogee a motor may fall and still be evaluated (m). Defaults to 0.
+    indices : array_like, optional
+        Indices of the motors in a MotorLibrary to evaluate, e.g. from MotorLibrary.query(). Defaults to every motor.
+    timestep : float or dict, optional
+        The timestep or timestep schedule of the simulations.
+    processes : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+
+    Returns
+    -------
+    list
+        A dictionary for each motor, in the order given, with:
+        - 'name', 'motor': the motor's name and Motor object
+        - 'status': 'evaluated', 'pruned', or 'failed' (the simulation raised an error)
+        - 'reason': why the motor was pruned or failed, or None
+        - 'max_theoretical_apogee': the drag-free apogee in each environment (m)
+        - 'apogee', 'rail_exit_velocity', 'max_acceleration_by_environment': the apogee (m), speed at rail clearance (m/s), and largest acceleration (m/s^2) in each environment, for evaluated motors
+        - 'mean_apogee', 'min_rail_exit_velocity', 'max_acceleration': the mean apogee, the lowest rail exit velocity, and the largest acceleration over all environments, for evaluated motors
+        - 'target_error': the mean absolute difference between the apogee and the target apogee (m), or None without a target
+    """
+    if not isinstance(environments, (list, tuple)):
+        environments = [environments]
+    names, motor_objects = _motor_candidates(motors, indices)
+
+    results = [{'name': name, 'motor': motor, 'status': 'evaluated', 'reason': None} for name, motor in zip(names, motor_objects)]
+    if not results:
+        return results
+
+    # closed-form bounds for every motor at once
+    dry_masses = [rocket.rocket_mass + motor.dry_mass for motor in motor_objects]
+    bounds = np.array([max_theoretical_apogee_batch(motor_objects, dry_masses, environment.local_gravity) for environment in environments]).T
+    to_simulate = []
+    for i, result in enumerate(results):
+        motor = result['motor']
+        result['max_theoretical_apogee'] = bounds[i]
+        liftoff_weight = dry_masses[i] * min(environment.local_gravity for environment in environments) * launchpad.rail_unit_vector_z
+        if max(motor.thrust_curve.values()) <= liftoff_weight:
+            result['status'], result['reason'] = 'pruned', "peak thrust is below the rocket's weight without fuel"
+        elif target_apogee is not None and bounds[i].max() < target_apogee - apogee_tolerance:
+            result['status'], result['reason'] = 'pruned', f"drag-free apogee of {bounds[i].max():.0f} m is below the target"
+        else:
+            to_simulate.append(i)
+
+    shared = (rocket, motor_objects, environments, launchpad, timestep)
+    for i, metrics in run_in_parallel(_evaluate_motor, to_simulate, shared = shared, processes = processes):
+        result = results[i]
+        if isinstance(metrics, str):
+            result['status'], result['reason'] = 'failed', metrics
+            continue
+        apogee, rail_exit_velocity, max_acceleration = (np.array(values) for values in zip(*metrics))
+        result.update({
+            'apogee': apogee,
+            'rail_exit_velocity': rail_exit_velocity,
+            'max_acceleration_by_environment': max_acceleration,
+            'mean_apogee': apogee.mean(),
+            'min_rail_exit_velocity': rail_exit_velocity.min(),
+            'max_acceleration': max_acceleration.max(),
+            'target_error': np.abs(apogee - target_apogee).mean() if target_apogee is not None else None,
+        })
+    return results
+
+def rank_motors(results, by = 'target_error'):
+    """
+    Rank evaluated motors.
+
+    Args
+    ----
+    results : list
+        The results of evaluate_motors.
+    by : str, optional
+        What to rank by: 'apogee' (highest mean apogee first), 'rail_exit_velocity' (highest lowest rail exit velocity first), 'max_acceleration' (lowest max acceleration first), or 'target_error' (closest mean apogee to the target first). Defaults to 'target_error'.
+
+    Returns
+    -------
+    list
+        The results of the evaluated motors, best first. Pruned and failed motors are left out.
+    """
+    if by not in rankings:
+        raise ValueError(f"Invalid ranking '{by}'. Must be one of {', '.join(rankings)}")
+    key, higher_is_better = rankings[by]
+    evaluated = [result for result in results if result['status'] == 'evaluated']
+    if by == 'target_error' and evaluated and evaluated[0]['target_error'] is None:
+        raise ValueError("The motors weren't evaluated against a target apogee")
+    return sorted(evaluated, key = lambda result: result[key], reverse = higher_is_better)
+
+def select_motors(rocket, motors, environments, launchpad, target_apogee = None, by = None, **evaluate_kwargs):
+    """
+    Evaluate motors in a rocket airframe and rank them.
+
+    Args
+    ----
+    rocket, motors, environments, launchpad, target_apogee
+        As for evaluate_motors.
+    by : str, optional
+        What to rank by, as for rank_motors. Defaults to 'target_error' with a target apogee and 'apogee' without one.
+    **evaluate_kwargs
+        Passed on to evaluate_motors (e.g. apogee_tolerance, indices, timestep, processes).
+
+    Returns
+    -------
+    list
+        The results of the evaluated motors, best first.
+    """
+    if by is None:
+        by = 'target_error' if target_apogee is not None else 'apogee'
+    results = evaluate_motors(rocket, motors, environments, launchpad, target_apogee = target_apogee, **evaluate_kwargs)
+    return rank_motors(results, by)
+
+def selection_report(ranked):
+    """ Returns ranked motor results as a table. """
+    lines = [f"{'rank':>4}  {'motor':<20}{'apogee (m)':>12}{'target err (m)':>16}{'rail exit (m/s)':>17}{'max accel (m/s^2)':>19}"]
+    for rank, result in enumerate(ranked, start = 1):
+        target_error = f"{result['target_error']:>16.1f}" if result['target_error'] is not None else f"{'-':>16}"
+        lines.append(f"{rank:>4}  {result['name']:<20}{result['mean_apogee']:>12.1f}{target_error}{result['min_rail_exit_velocity']:>17.2f}{result['max_acceleration']:>19.1f}")
+    return "\n".join(lines)
@@ -0,0 +1,63 @@
+""" Reports on simplified thrust curves.
+
+Compares a motor simplified with Motor.simplify against the original: the number of points in each curve, the change in total impulse, burn time, and peak thrust, and the change in apogee and run time of a flight of a reference rocket with each motor.
+"""
+import copy
+import time
+
+from .. import constants as con
+from ..flight_stages_combined import flight_sim_ignition_to_apogee
+
+def simplification_report(motor, rocket, environment, launchpad, timestep = con.default_timestep, **simplify_kwargs):
+    """
+    Simplify a motor and compare it to the original on a reference rocket.
+
+    Args
+    ----
+    motor : Motor
+        The motor to simplify.
+    rocket : Rocket
+        The reference rocket. Its motor is swapped for the original and the simplified motor.
+    environment : Environment
+        An instance of the Environment class.
+    launchpad : Launchpad
+        An instance of the Launchpad class.
+    timestep : float or dict, optional
+        The timestep or timestep schedule of the reference flights.
+    **simplify_kwargs
+        Passed on to Motor.simplify (impulse_tolerance, fuel_mass_tolerance, thrust_tolerance).
+
+    Returns
+    -------
+    dict
+        The simplified motor ('motor') and the comparison:
+        - 'points': the number of points in the original and simplified thrust curves
+        - 'total_impulse_error': relative change in total impulse
+        - 'burn_time_error': change in burn time (s)
+        - 'peak_thrust_error': change in peak thrust (N)
+        - 'apogee': apogee of the reference rocket with the original motor (m)
+        - 'apogee_change': apogee with the simplified motor minus the apogee with the original (m)
+        - 'wall_time': run time of the reference flight with the original and simplified motors (s)
+    """
+    simplified = motor.simplify(**simplify_kwargs)
+
+    apogees = []
+    wall_times = []
+    for flight_motor in (motor, simplified):
+        reference_rocket = copy.copy(rocket)
+        reference_rocket.motor = flight_motor
+        start_time = time.perf_counter()
+        flightpath = flight_sim_ignition_to_apogee(reference_rocket, environment, launchpad, timestep = timestep)
+        wall_times.append(time.perf_counter() - start_time)
+        apogees.append(flightpath[-1][3])
+
+    return {
+        'motor': simplified,
+        'points': (len(motor.thrust_curve), len(simplified.thrust_curve)),
+        'total_impulse_error': (simplified.total_impulse - motor.total_impulse) / motor.total_impulse,
+        'burn_time_error': simplified.burn_time - motor.burn_time,
+        'peak_thrust_error': max(simplified.thrust_curve.values()) - max(motor.thrust_curve.values()),
+        'apogee': apogees[0],
+        'apogee_change': apogees[1] - apogees[0],
+        'wall_time': tuple(wall_times),
+    }
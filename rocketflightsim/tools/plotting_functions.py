@@ -1,7 +1,6 @@
 # TODO: do a major refresh of these (consider deleting them?)
 
-import matplotlib.pyplot as plt
-import pandas as pd
+# matplotlib and pandas are imported in the functions that use them, as they take far longer to import than the rest of the package
 import numpy as np
 from .. import constants as con
 from .. import helper_functions as hfunc
@@ -19,6 +18,8 @@ def plot_ascent(time, z, airspeed, v_z, a_z, unit="m"):
     - a_z (pd.Series): Vertical acceleration series data.
     - unit (str): Unit of measurement for height, airspeed, etc.
     """
+    import matplotlib.pyplot as plt
+
     fig, ax1 = plt.subplots()
     ax1.plot(time, z, color="b")
     ax1.set_xlabel("Time (s)")
@@ -53,6 +54,8 @@ def plot_aerodynamics(time, z, airspeed, q, angle_to_vertical, air_density, unit
     - air_density (pd.Series): Air density series data.
     - unit (str): Unit of measurement for height, airspeed, etc.
     """
+    import matplotlib.pyplot as plt
+
     fig, ax1 = plt.subplots()
     ax1.plot(time, z, color="b", label="Height")
     ax1.set_xlabel("Time (s)")
@@ -100,6 +103,7 @@ def plot_airbrakes_ascent(ascent, airbrakes, unit="m"):
     - ascent (pd.DataFrame): Dataframe containing the ascent data with airbrakes.
     - unit (str): Unit of measurement for height, airspeed, etc.
     """
+    import matplotlib.pyplot as plt
 
     # Existing code for height, airspeed, and acceleration plots
     z = (
@@ -170,6 +174,8 @@ def display_apogee_parameters_table(ascent, parameters_at_flight_events, unit="m
     - parameters_at_flight_events (pd.DataFrame): Dataframe containing parameters at key flight events.
     - unit (str): Unit of length.
     """
+    import pandas as pd
+
     # Calculate the relevant parameters for ascent with airbrakes
     last_index = len(ascent) - 1
     time_with_airbrakes = ascent["time"].iloc[last_index]
@@ -258,6 +264,8 @@ def create_flight_event_table(
     Returns:
     - pd.DataFrame: Table of parameters at key flight events.
     """
+    import pandas as pd
+
     max_g_index = g_force.idxmax()
     max_speed_Ma_index = airspeed.idxmax()
     max_q_index = dataset["q"][:apogee_index].idxmax()
@@ -390,3 +398,223 @@ def create_flight_event_table(
     ).sort_values(by=["Time (s)"])
 
     return parameters_at_flight_events
+
+
+# Plotting of large sets of trajectories, e.g. Monte Carlo ensembles
+
+def lttb_indices(x, y, num_points):
+    """
+    Pick the points of a curve to keep when downsampling it with the Largest-Triangle-Three-Buckets algorithm, which preserves its visual shape.
+
+    Args:
+    - x (np.ndarray): x values of the curve, increasing.
+    - y (np.ndarray): y values of the curve.
+    - num_points (int): Number of points to keep.
+
+    Returns:
+    - np.ndarray: Indices of the points to keep, including the first and last points.
+    """
+    n = len(x)
+    if num_points >= n or num_points < 3:
+        return np.arange(n)
+
+    # the first and last points are always kept, the rest are split into num_points - 2 buckets
+    edges = np.linspace(1, n - 1, num_points - 1).astype(int)
+    indices = np.empty(num_points, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(num_points - 2):
+        start, end = edges[i], edges[i + 1]
+        if i == num_points - 3:
+            next_x, next_y = x[-1], y[-1]
+        else:
+            next_x, next_y = x[end:edges[i + 2]].mean(), y[end:edges[i + 2]].mean()
+
+        # keep the point forming the largest triangle with the last kept point and the average of the next bucket
+        areas = np.abs((x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(areas.argmax())
+        indices[i + 1] = a
+    return indices
+
+
+def minmax_indices(y, num_buckets):
+    """
+    Pick the points of a curve to keep when downsampling it by keeping the minimum and maximum of each bucket of points. With one bucket per pixel, the downsampled curve looks the same as the full one.
+
+    Args:
+    - y (np.ndarray): y values of the curve.
+    - num_buckets (int): Number of buckets to split the curve into.
+
+    Returns:
+    - np.ndarray: Sorted indices of the points to keep, including the first and last points.
+    """
+    n = len(y)
+    if 2 * num_buckets >= n:
+        return np.arange(n)
+
+    bucket = np.arange(n) * num_buckets // n
+    bucket_starts = np.searchsorted(bucket, np.arange(num_buckets))
+    bucket_ends = np.append(bucket_starts[1:], n)
+    # sorted by bucket then y, so each bucket's minimum and maximum are at its start and end
+    order = np.lexsort((y, bucket))
+    return np.unique(np.concatenate((order[bucket_starts], order[bucket_ends - 1], [0, n - 1])))
+
+
+def downsample(x, y, num_points, method="minmax"):
+    """
+    Downsample a curve while keeping its shape.
+
+    Args:
+    - x (np.ndarray): x values of the curve, increasing.
+    - y (np.ndarray): y values of the curve.
+    - num_points (int): Maximum number of points to keep.
+    - method (str): "minmax" to keep the minimum and maximum of each of num_points/2 buckets, or "lttb" for Largest-Triangle-Three-Buckets.
+
+    Returns:
+    - tuple: The downsampled x and y values.
+    """
+    if method == "minmax":
+        indices = minmax_indices(y, num_points // 2)
+    elif method == "lttb":
+        indices = lttb_indices(x, y, num_points)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}. Must be 'minmax' or 'lttb'")
+    return x[indices], y[indices]
+
+
+def trajectory_column(trajectory, column):
+    """
+    Get a column of a trajectory as an array.
+
+    Args:
+    - trajectory (np.ndarray, dict, or pd.DataFrame): A 2D array with a row per state and columns ordered as in constants.state_columns, e.g. np.array(flightpath), or anything that returns a column when indexed by its name.
+    - column (str): Name of the column, e.g. "time" or "z".
+
+    Returns:
+    - np.ndarray: The column.
+    """
+    if isinstance(trajectory, np.ndarray):
+        return trajectory[:, con.state_columns.index(column)]
+    return np.asarray(trajectory[column], dtype=float)
+
+
+def _default_num_points(ax):
+    # two points (a minimum and a maximum) per horizontal pixel of the axes
+    return max(int(ax.get_window_extent().width) * 2, 4)
+
+
+def plot_trajectory_ensemble(trajectories, x="time", y="z", ax=None, num_points=None, method="minmax", color="b", alpha=0.1, linewidth=0.5, **line_kwargs):
+    """
+    Plot many trajectories at once, e.g. a Monte Carlo ensemble. Each trajectory is downsampled and the whole ensemble is drawn as a single LineCollection, so thousands of trajectories render quickly and only their downsampled copies are kept in memory.
+
+    Args:
+    - trajectories (iterable): Trajectories as taken by trajectory_column. Can be a generator, so that trajectories are only loaded or simulated as they are plotted.
+    - x (str): Column to plot on the x axis.
+    - y (str): Column to plot on the y axis.
+    - ax (matplotlib.axes.Axes): Axes to plot on. Defaults to new axes.
+    - num_points (int): Maximum number of points kept for each trajectory. Defaults to two per pixel of the width of the axes.
+    - method (str): Downsampling method, "minmax" or "lttb".
+    - color, alpha, linewidth: Line style. Low alpha lets overlapping trajectories show their density.
+    - **line_kwargs: Passed on to LineCollection.
+
+    Returns:
+    - matplotlib.collections.LineCollection: The plotted lines.
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+
+    if ax is None:
+        fig, ax = plt.subplots()
+    if num_points is None:
+        num_points = _default_num_points(ax)
+
+    segments = []
+    for trajectory in trajectories:
+        x_values, y_values = downsample(trajectory_column(trajectory, x), trajectory_column(trajectory, y), num_points, method)
+        segments.append(np.column_stack((x_values, y_values)))
+
+    lines = LineCollection(segments, colors=color, alpha=alpha, linewidths=linewidth, **line_kwargs)
+    ax.add_collection(lines)
+    ax.autoscale_view()
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+    return lines
+
+
+def trajectory_percentiles(trajectories, x="time", y="z", percentiles=(5, 25, 50, 75, 95), num_points=500, x_range=None):
+    """
+    Calculate percentiles of a column across an ensemble of trajectories on a common grid.
+
+    Trajectories are read one at a time, and each is interpolated onto the grid and dropped before the next is read, so memory grows with the number of trajectories times the number of points in the grid, however long the trajectories are.
+
+    Args:
+    - trajectories (iterable): Trajectories as taken by trajectory_column. Can be a generator if x_range is given, so that trajectories are only loaded or simulated as they're needed.
+    - x (str): Column to make the grid from. Must be increasing in each trajectory.
+    - y (str): Column to calculate the percentiles of.
+    - percentiles (tuple): Percentiles to calculate.
+    - num_points (int): Number of points in the grid.
+    - x_range (tuple): (start, end) of the grid. Defaults to the span of x across the trajectories, found in a first pass over them, which needs trajectories that can be iterated over twice.
+
+    Returns:
+    - tuple: The grid, of shape (num_points,), and the percentiles of y at each point of the grid, of shape (len(percentiles), num_points). Trajectories only count towards the points of the grid within their span of x, and percentiles are NaN where no trajectory spans the grid.
+    """
+    if x_range is None:
+        if iter(trajectories) is trajectories:
+            raise ValueError("Trajectories given as a generator or iterator can only be read once, so x_range must be given to make the grid from")
+        # a first pass keeps only the ends of each trajectory's x
+        x_min, x_max = np.inf, -np.inf
+        for trajectory in trajectories:
+            x_values = trajectory_column(trajectory, x)
+            x_min, x_max = min(x_min, x_values[0]), max(x_max, x_values[-1])
+        x_range = (x_min, x_max)
+    grid = np.linspace(x_range[0], x_range[1], num_points)
+
+    rows = []
+    for trajectory in trajectories:
+        rows.append(np.interp(grid, trajectory_column(trajectory, x), trajectory_column(trajectory, y), left=np.nan, right=np.nan))
+        # so the trajectory can be freed while the next one is made
+        del trajectory
+    values = np.array(rows).reshape(len(rows), num_points)
+
+    all_nan = np.isnan(values).all(axis=0)
+    result = np.full((len(percentiles), num_points), np.nan)
+    result[:, ~all_nan] = np.nanpercentile(values[:, ~all_nan], percentiles, axis=0)
+    return grid, result
+
+
+def plot_trajectory_envelope(trajectories, x="time", y="z", ax=None, bands=((5, 95), (25, 75)), num_points=500, x_range=None, color="b", alpha=0.2, median=True):
+    """
+    Plot the spread of an ensemble of trajectories as shaded percentile bands, each band shaded darker the more central it is.
+
+    Args:
+    - trajectories (iterable): Trajectories as taken by trajectory_column.
+    - x (str): Column to plot on the x axis. Must be increasing in each trajectory.
+    - y (str): Column to plot on the y axis.
+    - ax (matplotlib.axes.Axes): Axes to plot on. Defaults to new axes.
+    - bands (tuple): Pairs of lower and upper percentiles to shade between.
+    - num_points (int): Number of points in the common grid the trajectories are interpolated onto.
+    - x_range (tuple): (start, end) of the grid, as for trajectory_percentiles. Needed if trajectories is a generator.
+    - color (str): Colour of the bands and median.
+    - alpha (float): Opacity of each band. Overlapping bands add up.
+    - median (bool): Whether to also plot the median.
+
+    Returns:
+    - matplotlib.axes.Axes: The axes plotted on.
+    """
+    import matplotlib.pyplot as plt
+
+    if ax is None:
+        fig, ax = plt.subplots()
+
+    percentiles = sorted({p for band in bands for p in band} | ({50} if median else set()))
+    grid, values = trajectory_percentiles(trajectories, x, y, percentiles, num_points, x_range)
+    by_percentile = dict(zip(percentiles, values))
+
+    for lower, upper in bands:
+        ax.fill_between(grid, by_percentile[lower], by_percentile[upper], color=color, alpha=alpha, linewidth=0, label=f"{lower}-{upper} percentile")
+    if median:
+        ax.plot(grid, by_percentile[50], color=color, label="Median")
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+    ax.legend()
+    return ax
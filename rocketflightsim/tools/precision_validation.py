@@ -0,0 +1,110 @@
+""" Validation of simulations at reduced floating point precision.
+
+Simulates each configuration at every precision and reports how far the apogee, max speed, and landing point are from the float64 simulation, along with the run time and the memory used to store the flightpath. Used to check that single precision is good enough for a rocket before porting its simulation or controller to a microcontroller, and how much smaller archives of float32 trajectories are.
+"""
+import time
+
+import numpy as np
+
+from .. import constants as con
+from ..flight_stages_combined import flight_sim_ignition_to_landing, flight_sim_ballistic_recovery
+from ..precision import precisions
+
+def flight_metrics(flightpath):
+    """
+    Get the metrics compared between precisions from a flightpath.
+
+    Args
+    ----
+    flightpath : Flightpath
+        A flightpath from ignition to landing.
+
+    Returns
+    -------
+    dict
+        The apogee (m), max speed (m/s), landing x and y (m), and the memory used by the states (bytes).
+    """
+    states = flightpath.to_numpy().astype(np.float64)
+    apogee_index = states[:, 3].argmax()
+    return {
+        'apogee': states[apogee_index, 3],
+        'max_speed': np.sqrt((states[:apogee_index + 1, 4:7]**2).sum(axis = 1)).max(),
+        'landing_x': states[-1, 1],
+        'landing_y': states[-1, 2],
+        'memory': flightpath.to_numpy().nbytes,
+    }
+
+def precision_errors(rocket, environment, launchpad, parachutes_and_conditions = None, precision_names = tuple(precisions), timestep = con.default_timestep):
+    """
+    Simulate a flight at each precision and compare it to the float64 simulation.
+
+    Args
+    ----
+    rocket : Rocket
+        An instance of the Rocket class.
+    environment : Environment
+        An instance of the Environment class.
+    launchpad : Launchpad
+        An instance of the Launchpad class.
+    parachutes_and_conditions : list, optional
+        A list of tuples (parachute, stop_condition, stop_condition_value). If not given, the descent is simulated as a ballistic fall.
+    precision_names : tuple, optional
+        The precisions to simulate at. Defaults to all of them ('float64', 'float32').
+    timestep : float or dict, optional
+        The timestep or timestep schedule of the simulations.
+
+    Returns
+    -------
+    dict
+        For each precision, the metrics of its flight (see flight_metrics), the wall time of the simulation ('wall_time', s), and the errors compared to float64: 'apogee_error' (m), 'max_speed_error' (m/s), and 'landing_error' (m, distance between landing points).
+    """
+    def simulate(precision):
+        if parachutes_and_conditions:
+            return flight_sim_ignition_to_landing(rocket, environment, launchpad, parachutes_and_conditions, timestep = timestep, precision = precision)
+        return flight_sim_ballistic_recovery(rocket, environment, launchpad, timestep = timestep, precision = precision)
+
+    results = {}
+    for precision in dict.fromkeys(('float64',) + tuple(precision_names)):
+        start_time = time.perf_counter()
+        flightpath = simulate(precision)
+        wall_time = time.perf_counter() - start_time
+        results[precision] = {**flight_metrics(flightpath), 'wall_time': wall_time}
+
+    reference = results['float64']
+    for metrics in results.values():
+        metrics['apogee_error'] = abs(metrics['apogee'] - reference['apogee'])
+        metrics['max_speed_error'] = abs(metrics['max_speed'] - reference['max_speed'])
+        metrics['landing_error'] = np.hypot(metrics['landing_x'] - reference['landing_x'], metrics['landing_y'] - reference['landing_y'])
+
+    return {precision: results[precision] for precision in precision_names}
+
+def validate_precision(configurations, precision_names = tuple(precisions), timestep = con.default_timestep):
+    """
+    Compare the precisions on several configurations.
+
+    Args
+    ----
+    configurations : list
+        A list of tuples (name, rocket, environment, launchpad, parachutes_and_conditions). parachutes_and_conditions may be None for a ballistic descent.
+    precision_names : tuple, optional
+        The precisions to simulate at. Defaults to all of them.
+    timestep : float or dict, optional
+        The timestep or timestep schedule of the simulations.
+
+    Returns
+    -------
+    dict
+        The results of precision_errors for each configuration, keyed by name.
+    """
+    return {
+        name: precision_errors(rocket, environment, launchpad, parachutes_and_conditions, precision_names, timestep)
+        for name, rocket, environment, launchpad, parachutes_and_conditions in configurations
+    }
+
+def precision_report(results):
+    """ Returns the results of validate_precision as a table. """
+    lines = [f"{'configuration':<25}{'precision':>10}{'apogee (m)':>14}{'error (m)':>12}{'speed err (m/s)':>17}{'landing err (m)':>17}{'memory (KiB)':>14}{'time (s)':>10}"]
+    for name, by_precision in results.items():
+        for precision, metrics in by_precision.items():
+            lines.append(f"{name:<25}{precision:>10}{metrics['apogee']:>14.2f}{metrics['apogee_error']:>12.4f}{metrics['max_speed_error']:>17.5f}{metrics['landing_error']:>17.4f}{metrics['memory'] / 1024:>14.1f}{metrics['wall_time']:>10.3f}")
+    return "\n".join(lines)
@@ -0,0 +1,129 @@
+""" Quasi-random and stratified samples of the unit hypercube, for dispersion studies.
+
+Plain random samples leave gaps and clusters, so estimates from them converge at about 1/sqrt(N) in the number of samples N. The samplers here spread samples more evenly, so statistics like the mean and percentiles of an apogee converge faster:
+- 'sobol': a Sobol sequence (Joe and Kuo's direction numbers) scrambled with a random linear matrix scramble and a digital shift. Any 2^m consecutive points from the start of the sequence have exactly one point in each of 2^m equal intervals of every dimension, so sample sizes should be powers of 2. Point i of the sequence depends only on i and the seed, so a study can be split across workers or resumed.
+- 'latin_hypercube': one sample in each of N equal intervals of every dimension, paired at random across dimensions. The whole sample depends on N, so a study sampled this way must be resumed with the same sample size.
+
+Points are in the open interval (0, 1), ready to transform into other distributions through their inverse CDFs.
+"""
+import numpy as np
+
+_bits = 32
+
+# Joe and Kuo's direction numbers (new-joe-kuo-6.21201) for dimensions 2 to 21: degree s of the primitive polynomial, its coefficients a, and the initial direction numbers m
+_direction_numbers = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49)),
+    (6, 19, (1, 1, 1, 15, 7, 5)),
+    (6, 22, (1, 3, 1, 15, 13, 25)),
+    (6, 25, (1, 1, 5, 5, 19, 61)),
+    (7, 1, (1, 3, 7, 11, 23, 15, 103)),
+    (7, 4, (1, 3, 7, 13, 13, 15, 69)),
+)
+max_sobol_dimensions = len(_direction_numbers) + 1
+
+def _sobol_directions(dimensions):
+    # direction numbers of each dimension, as integers with the most significant of their _bits bits first
+    directions = np.empty((dimensions, _bits), dtype = np.uint64)
+    directions[0] = [1 << (_bits - 1 - k) for k in range(_bits)]
+    for d in range(1, dimensions):
+        s, a, m = _direction_numbers[d - 1]
+        m = list(m)
+        for k in range(s, _bits):
+            new_m = m[k - s] ^ (m[k - s] << s)
+            for j in range(1, s):
+                new_m ^= ((a >> (s - 1 - j)) & 1) * (m[k - j] << j)
+            m.append(new_m)
+        directions[d] = [m[k] << (_bits - 1 - k) for k in range(_bits)]
+    return directions
+
+def _scramble(directions, seed):
+    # linear matrix scramble: each bit of a direction number is replaced by the parity of it and a random set of the bits more significant than it, which keeps the sequence's stratification. Then a random digital shift
+    scrambled = np.empty_like(directions)
+    shift = np.empty(len(directions), dtype = np.uint64)
+    for d in range(len(directions)):
+        # each dimension has its own stream, so a dimension is scrambled the same however many there are
+        rng = np.random.default_rng(np.random.SeedSequence(seed.entropy, spawn_key = seed.spawn_key + (d,), pool_size = seed.pool_size))
+        rows = [(1 << (_bits - 1 - r)) | (int(rng.integers(0, 1 << r)) << (_bits - r) if r else 0) for r in range(_bits)]
+        for k, direction in enumerate(directions[d].tolist()):
+            scrambled[d, k] = sum((bin(row & direction).count('1') & 1) << (_bits - 1 - r) for r, row in enumerate(rows))
+        shift[d] = rng.integers(0, 1 << _bits, dtype = np.uint64)
+    return scrambled, shift
+
+def sobol_points(dimensions, indices, seed = None, scramble = True):
+    """
+    Compute points of a Sobol sequence.
+
+    Args
+    ----
+    dimensions : int
+        Number of dimensions, up to max_sobol_dimensions.
+    indices : array_like
+        Indices of the points in the sequence.
+    seed : int or numpy.random.SeedSequence, optional
+        Seed of the scramble. The same seed gives the same sequence, and the same points in each of its first dimensions whatever the number of dimensions.
+    scramble : bool, optional
+        Whether to scramble the sequence. Defaults to True. Without scrambling, the sequence is the same for every seed and its points are aligned along the diagonals of the hypercube.
+
+    Returns
+    -------
+    numpy.ndarray
+        The points, one per row, with a column for each dimension.
+    """
+    if not 1 <= dimensions <= max_sobol_dimensions:
+        raise ValueError(f"Sobol sequences are available in 1 to {max_sobol_dimensions} dimensions")
+    indices = np.asarray(indices, dtype = np.uint64)
+    if indices.size and indices.max() >= 1 << _bits:
+        raise ValueError(f"Sobol sequences are available up to 2^{_bits} points")
+    directions = _sobol_directions(dimensions)
+    shift = np.zeros(dimensions, dtype = np.uint64)
+    if scramble:
+        directions, shift = _scramble(directions, seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed))
+
+    # each point is the XOR of the direction numbers of the bits set in the Gray code of its index, which puts the points in the sequence's usual order
+    gray_codes = indices ^ (indices >> np.uint64(1))
+    points = np.tile(shift, (len(indices), 1))
+    for k in range(int(gray_codes.max()).bit_length() if gray_codes.size else 0):
+        has_bit = ((gray_codes >> np.uint64(k)) & np.uint64(1)).astype(bool)
+        points[has_bit] ^= directions[:, k]
+    return (points + 0.5) / 2.0**_bits
+
+def latin_hypercube_points(dimensions, sample_size, indices = None, seed = None):
+    """
+    Compute points of a Latin hypercube sample.
+
+    Args
+    ----
+    dimensions : int
+        Number of dimensions.
+    sample_size : int
+        Number of points in the whole sample.
+    indices : array_like, optional
+        Indices of the points to return. Defaults to all of them.
+    seed : int or numpy.random.SeedSequence, optional
+        Seed of the sample. The same seed and sample size give the same sample.
+
+    Returns
+    -------
+    numpy.ndarray
+        The points, one per row, with a column for each dimension.
+    """
+    rng = np.random.default_rng(seed)
+    intervals = rng.permuted(np.tile(np.arange(sample_size), (dimensions, 1)), axis = 1).T
+    points = (intervals + rng.random((sample_size, dimensions))) / sample_size
+    # keeps points off the edges, which inverse CDFs map to infinity
+    points = np.clip(points, 0.5 / 2.0**_bits, 1 - 0.5 / 2.0**_bits)
+    return points if indices is None else points[np.asarray(indices, dtype = int)]
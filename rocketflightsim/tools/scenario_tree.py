@@ -0,0 +1,202 @@
+""" Scenario-tree execution of flight variants that share a flight prefix.
+
+Studies of post-burnout parameters (airbrake settings and deployment, parachutes and their stop conditions) simulate the same ignition, rail, and boost phases for every variant. The scenario tree groups the variants by the stage of the flight in which they first differ, simulates each shared prefix once, and resumes only the diverging suffixes from a checkpoint at the end of the shared prefix.
+
+The stages of the flight, in the order variants can diverge in:
+1. ignition to burnout, shared by every variant
+2. the coast from burnout to airbrake deployment, shared by variants with the same 'deployment_delay'. The coast to each delay continues from the one before it, so it's simulated once however many delays there are
+3. airbrake deployment to apogee, shared by variants with the same 'airbrakes', 'deployment_function', 'deployment_variable', and 'deployment_delay'. Variants without airbrakes share a single coast to apogee
+4. the descent under each parachute in turn, shared by variants with the same apogee whose parachutes_and_conditions agree up to that parachute
+"""
+import numpy as np
+
+from .. import constants as con
+from ..flight_sim_ignition_to_liftoff import sim_ignition_to_liftoff
+from ..flight_sim_guided import sim_liftoff_to_rail_clearance
+from ..flight_sim_unguided_boost import sim_unguided_boost
+from ..flight_sim_coast import sim_coast
+from ..flight_sim_parachute import sim_parachute
+from ..flight_sim_airbrakes import sim_max_airbrakes_deployment_to_apogee, sim_airbrakes_deployment_to_apogee_fn_height, sim_airbrakes_deployment_to_apogee_fn_time
+from ..flight_stages_combined import flight_sim_ignition_to_apogee, flight_sim_ignition_to_landing, flight_sim_ballistic_recovery, phase_timesteps
+from ..rocket_classes import Flightpath
+from ..classes.checkpoint import make_checkpoint
+
+variant_keys = ('airbrakes', 'deployment_function', 'deployment_variable', 'deployment_delay', 'descent')
+
+def _check_variant(variant):
+    unknown_keys = set(variant) - set(variant_keys)
+    if unknown_keys:
+        raise ValueError(f"Unknown key(s) in variant: {', '.join(sorted(unknown_keys))}. Must be among {', '.join(variant_keys)}")
+    if variant.get('deployment_variable', 'time') not in ('time', 'height'):
+        raise ValueError(f"Invalid deployment_variable '{variant['deployment_variable']}'. Must be 'time' or 'height'")
+    if variant.get('deployment_delay', 0) < 0:
+        raise ValueError("deployment_delay must be non-negative")
+
+def _apogee_key(variant):
+    # variants with equal keys share their flight up to apogee. Configuration objects are compared by identity
+    if variant.get('airbrakes') is None:
+        return None
+    return (id(variant['airbrakes']), id(variant.get('deployment_function')), variant.get('deployment_variable', 'time'), variant.get('deployment_delay', 0))
+
+def _parachute_key(parachute_and_conditions):
+    parachute, stop_condition, stop_condition_value = parachute_and_conditions
+    return (id(parachute), stop_condition, stop_condition_value)
+
+def _deployment_points(rocket, environment, burnout, delays, timestep):
+    # states up to each airbrake deployment, coasting from one deployment delay to the next
+    points = {}
+    states = burnout.states
+    elapsed = 0
+    for delay in sorted(delays):
+        if delay > elapsed:
+            coast = sim_coast(rocket, environment, tuple(states[-1]), stop_condition = 'after_delay', stop_condition_value = delay - elapsed, timestep = timestep)
+            states = np.concatenate((states, np.asarray(coast, dtype = float)))
+            elapsed = delay
+        if states[-1, 6] <= 0:
+            raise ValueError(f"The rocket reaches apogee before airbrake deployment at {delay} s after burnout")
+        points[delay] = states
+    return points
+
+def _simulate_airbrakes(rocket, environment, states, variant, timestep):
+    # simulates airbrake deployment from the last of the states to apogee and returns an apogee checkpoint
+    airbrakes = variant['airbrakes']
+    deployment_function = variant.get('deployment_function')
+    initial_state = tuple(states[-1])
+    if deployment_function is None:
+        airbrakes_flightpath = sim_max_airbrakes_deployment_to_apogee(rocket, environment, airbrakes, initial_state, timestep = timestep)
+    elif variant.get('deployment_variable', 'time') == 'time':
+        airbrakes_flightpath = sim_airbrakes_deployment_to_apogee_fn_time(rocket, environment, airbrakes, initial_state, deployment_function, timestep = timestep)
+    else:
+        airbrakes_flightpath = sim_airbrakes_deployment_to_apogee_fn_height(rocket, environment, airbrakes, initial_state, deployment_function, timestep = timestep)
+
+    # the descent stages take the kinematic state, so the deployment angle is kept in the checkpoint's context
+    airbrakes_flightpath = np.asarray(airbrakes_flightpath, dtype = float)
+    states = np.concatenate((states, airbrakes_flightpath[:, :10]))
+    return make_checkpoint('apogee', states, rocket, deployment_angle = airbrakes_flightpath[-1, 10])
+
+def _descend(rocket, environment, launchpad, checkpoint, descents, results, timesteps):
+    # simulates the descents from a checkpoint, sharing the parachutes that the descents have in common. descents is a list of (variant index, descent)
+    flightpath = None
+    finished = checkpoint.context.get('parachute_index', 0)
+    ballistic = None
+    groups = {}
+    for i, descent in descents:
+        if descent == 'ballistic':
+            if ballistic is None:
+                ballistic = flight_sim_ballistic_recovery(rocket, environment, launchpad, timestep = timesteps, resume_from = checkpoint)
+            results[i] = ballistic
+        elif descent is None or len(descent) == finished:
+            if flightpath is None:
+                flightpath = Flightpath(checkpoint.states, environment, rocket, launchpad)
+            results[i] = flightpath
+        else:
+            groups.setdefault(_parachute_key(descent[finished]), []).append((i, descent))
+
+    for group in groups.values():
+        parachutes_and_conditions = group[0][1][:finished + 1]
+        checkpoints = []
+        flight_sim_ignition_to_landing(rocket, environment, launchpad, parachutes_and_conditions, timestep = timesteps, checkpoints = checkpoints, resume_from = checkpoint)
+        _descend(rocket, environment, launchpad, checkpoints[-1], group, results, timesteps)
+
+def run_scenario_tree(rocket, environment, launchpad, variants, timestep = con.default_timestep):
+    """
+    Simulate variants of a flight that differ only after burnout, simulating the parts of the flight that variants share once.
+
+    Args
+    ----
+    rocket : Rocket
+        An instance of the Rocket class.
+    environment : Environment
+        An instance of the Environment class.
+    launchpad : Launchpad
+        An instance of the Launchpad class.
+    variants : list
+        A list of dictionaries, one per variant, with any of the keys:
+        - 'airbrakes': an instance of the Airbrakes class, or None for no airbrakes (default)
+        - 'deployment_function': a function giving the airbrake deployment angle (rad) from the time after ignition (s) or the height (m), as taken by the airbrake stages, or None to deploy to the maximum angle as fast as possible (default)
+        - 'deployment_variable': 'time' (default) or 'height', the argument of the deployment function
+        - 'deployment_delay': time from burnout to airbrake deployment (s). Defaults to 0
+        - 'descent': None to end the flight at apogee (default), 'ballistic' for a ballistic fall to the ground, or a list of tuples (parachute, stop_condition, stop_condition_value) as taken by flight_sim_ignition_to_landing
+        Variants share a stage when the objects in it are the same objects, not just equal.
+    timestep : float or dict, optional
+        The time increment for the simulation in seconds, or a dictionary of time increments keyed by flight phase ('rail', 'boost', 'coast', 'descent'). The airbrake stages use the coast timestep.
+
+    Returns
+    -------
+    list
+        The Flightpath of each variant, in the order of variants. Variants with the same flight share a Flightpath object. Flightpaths contain the kinematic states (time, x, y, z, v_x, v_y, v_z, a_x, a_y, a_z); the airbrake deployment angle isn't included.
+    """
+    for variant in variants:
+        _check_variant(variant)
+    timesteps = phase_timesteps(timestep)
+
+    # ignition to burnout, and the coast to apogee for the variants without airbrakes
+    checkpoints = []
+    flight_sim_ignition_to_apogee(rocket, environment, launchpad, timestep = timesteps, checkpoints = checkpoints)
+    burnout, coast_apogee = checkpoints[2], checkpoints[3]
+
+    groups = {}
+    for i, variant in enumerate(variants):
+        groups.setdefault(_apogee_key(variant), []).append(i)
+
+    delays = {variant.get('deployment_delay', 0) for variant in variants if variant.get('airbrakes') is not None}
+    deployment_points = _deployment_points(rocket, environment, burnout, delays, timesteps['coast'])
+
+    results = [None] * len(variants)
+    for key, indices in groups.items():
+        variant = variants[indices[0]]
+        if key is None:
+            apogee = coast_apogee
+        else:
+            apogee = _simulate_airbrakes(rocket, environment, deployment_points[variant.get('deployment_delay', 0)], variant, timesteps['coast'])
+        _descend(rocket, environment, launchpad, apogee, [(i, variants[i].get('descent')) for i in indices], results, timesteps)
+    return results
+
+def run_variants_independently(rocket, environment, launchpad, variants, timestep = con.default_timestep):
+    """
+    Simulate each variant of a flight from ignition on its own by calling the flight stages directly, without sharing stages or resuming from checkpoints. Used as a reference for run_scenario_tree, and to measure its speed-up.
+
+    Args
+    ----
+    Same as run_scenario_tree.
+
+    Returns
+    -------
+    list
+        The Flightpath of each variant, in the order of variants.
+    """
+    timesteps = phase_timesteps(timestep)
+    flightpaths = []
+    for variant in variants:
+        _check_variant(variant)
+        t_liftoff = sim_ignition_to_liftoff(rocket, environment, launchpad)
+        states = [(t_liftoff, 0, 0, 0, 0, 0, 0, 0, 0, 0)]
+        states.extend(sim_liftoff_to_rail_clearance(rocket, environment, launchpad, t_liftoff, timesteps['rail']))
+        states.extend(sim_unguided_boost(rocket, environment, states[-1], timesteps['boost']))
+
+        airbrakes = variant.get('airbrakes')
+        if airbrakes is None:
+            states.extend(sim_coast(rocket, environment, states[-1], timestep = timesteps['coast']))
+        else:
+            delay = variant.get('deployment_delay', 0)
+            if delay > 0:
+                states.extend(sim_coast(rocket, environment, states[-1], stop_condition = 'after_delay', stop_condition_value = delay, timestep = timesteps['coast']))
+            if states[-1][6] <= 0:
+                raise ValueError(f"The rocket reaches apogee before airbrake deployment at {delay} s after burnout")
+            deployment_function = variant.get('deployment_function')
+            if deployment_function is None:
+                airbrakes_flightpath = sim_max_airbrakes_deployment_to_apogee(rocket, environment, airbrakes, states[-1], timestep = timesteps['coast'])
+            elif variant.get('deployment_variable', 'time') == 'time':
+                airbrakes_flightpath = sim_airbrakes_deployment_to_apogee_fn_time(rocket, environment, airbrakes, states[-1], deployment_function, timestep = timesteps['coast'])
+            else:
+                airbrakes_flightpath = sim_airbrakes_deployment_to_apogee_fn_height(rocket, environment, airbrakes, states[-1], deployment_function, timestep = timesteps['coast'])
+            states.extend(state[:10] for state in airbrakes_flightpath)
+
+        descent = variant.get('descent')
+        if descent == 'ballistic':
+            states.extend(sim_coast(rocket, environment, states[-1], stop_condition = 'impact', timestep = timesteps['descent']))
+        elif descent:
+            for parachute, stop_condition, stop_condition_value in descent:
+                states.extend(sim_parachute(rocket, environment, states[-1], parachute, stop_condition = stop_condition, stop_condition_value = stop_condition_value, timestep = timesteps['descent']))
+        flightpaths.append(Flightpath(states, environment, rocket, launchpad))
+    return flightpaths
@@ -0,0 +1,409 @@
+""" Local simulation service.
+
+An HTTP/JSON server that runs flight simulations on demand for notebooks, dashboards, and optimizers. Configurations are sent as dictionaries (see serialization), simulated on a persistent pool of worker processes that have already imported the simulator, and the results are cached by the content of the request. Identical requests that arrive while the first is still being simulated wait for its result instead of being simulated again.
+
+Run from the root of the repository:
+
+    python -m rocketflightsim.tools.simulation_service --port 8765 --processes 4
+    rfs serve --port 8765 --processes 4
+
+Endpoints:
+- POST /simulate: simulate a flight. The body is a JSON request (see SimulationService.submit) and the response is {'key', 'source', 'result'}, where source is 'cache', 'coalesced', or 'simulated'
+- GET /metrics: request counts, cache and queue sizes, and latency percentiles
+- GET /health: {'status': 'ok'}
+"""
+import sys
+import os
+import argparse
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from .. import constants as con
+from ..parallel import get_context, SharedTables, share_tables, attach_tables, detach_blocks
+from ..serialization import config_key
+
+flight_types = ('apogee', 'landing', 'ballistic')
+request_keys = ('rocket', 'environment', 'launchpad', 'flight', 'parachutes', 'timestep', 'states')
+
+def _warm_up():
+    # import the simulator in each worker when it starts, so the first request doesn't pay for it
+    from .. import flight_stages_combined, serialization
+
+def _ready():
+    return True
+
+def _simulate_in_worker(request, max_attached_bytes):
+    try:
+        return simulate_request(request)
+    finally:
+        # stop mapping the curves of earlier requests, which the service may have freed since
+        detach_blocks(max_attached_bytes)
+
+def normalize_request(request):
+    """
+    Check a simulation request and fill in its defaults.
+
+    Args
+    ----
+    request : dict
+        The request, as for SimulationService.submit.
+
+    Returns
+    -------
+    dict
+        The request with every key, so equal requests have the same key whichever defaults they left out.
+    """
+    if not isinstance(request, dict):
+        raise ValueError("A request must be a JSON object")
+    unknown_keys = set(request) - set(request_keys)
+    if unknown_keys:
+        raise ValueError(f"Unknown key(s) in request: {', '.join(sorted(unknown_keys))}. Must be among {', '.join(request_keys)}")
+    for key in ('rocket', 'environment', 'launchpad'):
+        if not isinstance(request.get(key), dict):
+            raise ValueError(f"A request needs a '{key}' configuration")
+    flight = request.get('flight', 'apogee')
+    if flight not in flight_types:
+        raise ValueError(f"Invalid flight '{flight}'. Must be one of {', '.join(flight_types)}")
+    parachutes = request.get('parachutes') or []
+    if flight == 'landing' and not parachutes:
+        raise ValueError("A 'landing' flight needs 'parachutes'")
+    return {
+        'rocket': request['rocket'],
+        'environment': request['environment'],
+        'launchpad': request['launchpad'],
+        'flight': flight,
+        'parachutes': parachutes if flight == 'landing' else [],
+        'timestep': request.get('timestep', con.default_timestep),
+        'states': bool(request.get('states', False)),
+    }
+
+def flight_summary(flightpath):
+    """
+    Summarize a flight.
+
+    Args
+    ----
+    flightpath : Flightpath
+        The flight.
+
+    Returns
+    -------
+    dict
+        'apogee' (m), 'apogee_time' (s), 'max_speed' (m/s), 'max_acceleration' (m/s^2), 'flight_time' (s), the final 'x' and 'y' position (m), and the number of states ('num_states').
+    """
+    states = flightpath.to_numpy()
+    apogee_index = int(states[:, 3].argmax())
+    return {
+        'apogee': float(states[apogee_index, 3]),
+        'apogee_time': float(states[apogee_index, 0]),
+        'max_speed': float(np.sqrt(states[:, 4]**2 + states[:, 5]**2 + states[:, 6]**2).max()),
+        'max_acceleration': float(np.sqrt(states[:, 7]**2 + states[:, 8]**2 + states[:, 9]**2).max()),
+        'flight_time': float(states[-1, 0]),
+        'x': float(states[-1, 1]),
+        'y': float(states[-1, 2]),
+        'num_states': len(states),
+    }
+
+def simulate_request(request):
+    """
+    Simulate a normalized request. Run in the worker processes.
+
+    Args
+    ----
+    request : dict
+        A request, as returned by normalize_request.
+
+    Returns
+    -------
+    dict
+        The flight's summary (see flight_summary), with its states as a list of rows under 'states' if the request asked for them.
+    """
+    from ..flight_stages_combined import flight_sim_ignition_to_apogee, flight_sim_ignition_to_landing, flight_sim_ballistic_recovery
+    from ..serialization import rocket_from_dict, environment_from_dict, launchpad_from_dict, parachute_from_dict
+
+    # requests from the service and the batch runner carry handles to their curves in shared memory
+    request = attach_tables(request)
+    rocket = rocket_from_dict(request['rocket'])
+    environment = environment_from_dict(request['environment'])
+    launchpad = launchpad_from_dict(request['launchpad'])
+    timestep = request['timestep']
+    if request['flight'] == 'apogee':
+        flightpath = flight_sim_ignition_to_apogee(rocket, environment, launchpad, timestep = timestep)
+    elif request['flight'] == 'ballistic':
+        flightpath = flight_sim_ballistic_recovery(rocket, environment, launchpad, timestep = timestep)
+    else:
+        parachutes_and_conditions = []
+        for parachute in request['parachutes']:
+            parachute = dict(parachute)
+            stop_condition = parachute.pop('stop_condition', 'landed')
+            stop_condition_value = parachute.pop('stop_condition_value', None)
+            parachutes_and_conditions.append((parachute_from_dict(parachute), stop_condition, stop_condition_value))
+        flightpath = flight_sim_ignition_to_landing(rocket, environment, launchpad, parachutes_and_conditions, timestep = timestep)
+
+    result = flight_summary(flightpath)
+    if request['states']:
+        result['states'] = flightpath.to_numpy().tolist()
+    return result
+
+class SimulationService:
+    """
+    The SimulationService class runs simulation requests on a persistent pool of worker processes, caching results by the content of the request and coalescing identical requests in flight.
+
+    Attributes
+    ----------
+    processes : int
+        Number of worker processes.
+    cache_size : int
+        Maximum number of results kept in the cache. The least recently used results are dropped first.
+    counts : dict
+        Number of requests ('requests'), and of those, the number served from the cache ('cache_hits'), coalesced with an identical request in flight ('coalesced'), simulated ('simulated'), and that failed ('errors').
+    tables : SharedTables
+        The curves and drag tables of the requests sent to the workers, in shared memory so the requests sent to the workers carry handles to them instead. Reused by requests with the same curves, and freed once the requests using them have finished, least recently used first, when they take up more than shared_bytes.
+    shared_bytes : int
+        Size the shared curves are kept within (bytes), both by the service and by each worker.
+    """
+    def __init__(self, processes = None, cache_size = 1024, latency_window = 10000, shared_bytes = 64 * 2**20):
+        """Initialize a SimulationService object and start its worker processes.
+
+        Parameters
+        ----------
+        processes : int, optional
+            Number of worker processes. Defaults to the number of CPUs.
+        cache_size : int, optional
+            Maximum number of results kept in the cache. Defaults to 1024.
+        latency_window : int, optional
+            Number of most recent requests that latency percentiles are computed over. Defaults to 10000.
+        shared_bytes : int, optional
+            Size of the curves kept in shared memory for reuse by later requests (bytes). Each worker also keeps up to this much of them mapped. Defaults to 64 MiB.
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self.shared_bytes = shared_bytes
+        self.counts = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'simulated': 0, 'errors': 0}
+
+        self._cache = OrderedDict()
+        self._in_flight = {}
+        self._latencies = deque(maxlen = latency_window)
+        self._active_requests = 0
+        self._lock = threading.Lock()
+        self.tables = SharedTables(max_bytes = shared_bytes)
+
+        self._pool = ProcessPoolExecutor(self.processes, mp_context = get_context(), initializer = _warm_up)
+        # start every worker now, before any server threads exist, rather than on the first requests
+        for future in [self._pool.submit(_ready) for _ in range(self.processes)]:
+            future.result()
+
+    def _finish(self, key, shared_request, future):
+        with self._lock:
+            self._in_flight.pop(key, None)
+            self.tables.release(shared_request)
+            if future.exception() is None:
+                self._cache[key] = future.result()
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last = False)
+
+    def submit(self, request):
+        """
+        Submit a simulation request.
+
+        Args
+        ----
+        request : dict
+            The request, with the keys:
+            - 'rocket', 'environment', 'launchpad': configuration dictionaries, as made by serialization
+            - 'flight': 'apogee' (default) to simulate to apogee, 'landing' to descend under parachutes, or 'ballistic' for a ballistic descent
+            - 'parachutes': for 'landing', a list of parachute dictionaries, each with a 'stop_condition' (default 'landed') and 'stop_condition_value'
+            - 'timestep': the timestep or timestep schedule. Defaults to the default timestep
+            - 'states': whether to return the states of the flight as well as its summary. Defaults to False
+
+        Returns
+        -------
+        tuple
+            The key of the request, where its result comes from ('cache', 'coalesced', or 'simulated'), and a Future of the result (see simulate_request).
+        """
+        request = normalize_request(request)
+        key = config_key(request)
+        with self._lock:
+            self.counts['requests'] += 1
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.counts['cache_hits'] += 1
+                future = Future()
+                future.set_result(self._cache[key])
+                return key, 'cache', future
+            if key in self._in_flight:
+                self.counts['coalesced'] += 1
+                return key, 'coalesced', self._in_flight[key]
+            self.counts['simulated'] += 1
+            shared_request = share_tables(request, self.tables)
+            future = self._pool.submit(_simulate_in_worker, shared_request, self.shared_bytes)
+            self._in_flight[key] = future
+        future.add_done_callback(lambda future: self._finish(key, shared_request, future))
+        return key, 'simulated', future
+
+    def simulate(self, request, timeout = None):
+        """
+        Simulate a request and wait for its result, recording its latency.
+
+        Args
+        ----
+        request : dict
+            The request, as for submit.
+        timeout : float, optional
+            Time to wait for the result (s). Defaults to waiting as long as it takes.
+
+        Returns
+        -------
+        dict
+            {'key', 'source', 'result'}: the key of the request, where its result came from, and the result.
+        """
+        start_time = time.perf_counter()
+        with self._lock:
+            self._active_requests += 1
+        try:
+            key, source, future = self.submit(request)
+            result = future.result(timeout)
+        except Exception:
+            with self._lock:
+                self.counts['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._active_requests -= 1
+                self._latencies.append(time.perf_counter() - start_time)
+        return {'key': key, 'source': source, 'result': result}
+
+    def metrics(self):
+        """
+        Get the service's metrics.
+
+        Returns
+        -------
+        dict
+            The counts of requests, 'cache_entries', 'shared_tables' and 'shared_bytes' (the number and size of the curves in shared memory), 'queue_depth' (distinct simulations submitted to the workers and not yet finished), 'active_requests' (requests waiting for a result), 'processes', and 'latency_ms' with the 'p50', 'p90', 'p99', 'mean', and 'max' latency of recent requests (ms).
+        """
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000
+            metrics = dict(self.counts)
+            metrics.update({
+                'cache_entries': len(self._cache),
+                'queue_depth': len(self._in_flight),
+                'active_requests': self._active_requests,
+                'processes': self.processes,
+                'shared_tables': len(self.tables),
+                'shared_bytes': self.tables.nbytes,
+            })
+        if len(latencies):
+            p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+            metrics['latency_ms'] = {'p50': float(p50), 'p90': float(p90), 'p99': float(p99), 'mean': float(latencies.mean()), 'max': float(latencies.max())}
+        else:
+            metrics['latency_ms'] = None
+        return metrics
+
+    def close(self):
+        """ Shut down the worker processes and free the shared memory. """
+        self._pool.shutdown(cancel_futures = True)
+        self.tables.close()
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    def _send_json(self, status, body):
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            self._send_json(200, self.server.service.metrics())
+        elif self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        else:
+            self._send_json(404, {'error': f"Unknown path '{self.path}'"})
+
+    def do_POST(self):
+        if self.path != '/simulate':
+            self._send_json(404, {'error': f"Unknown path '{self.path}'"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            response = self.server.service.simulate(request)
+        except (ValueError, KeyError, TypeError) as error:
+            # malformed JSON, invalid requests, and configurations the simulator rejects
+            self._send_json(400, {'error': f"{type(error).__name__}: {error}"})
+            return
+        except Exception as error:
+            self._send_json(500, {'error': f"{type(error).__name__}: {error}"})
+            return
+        self._send_json(200, response)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+def make_server(host = '127.0.0.1', port = 8765, service = None, verbose = False, **service_kwargs):
+    """
+    Make an HTTP server for a simulation service.
+
+    Args
+    ----
+    host : str, optional
+        Address to listen on. Defaults to '127.0.0.1', so only local clients can connect.
+    port : int, optional
+        Port to listen on, or 0 for any free port. Defaults to 8765.
+    service : SimulationService, optional
+        The service to serve. Defaults to a new SimulationService made with service_kwargs.
+    verbose : bool, optional
+        Whether to log each request to stderr. Defaults to False.
+    **service_kwargs
+        Passed on to SimulationService (processes, cache_size, latency_window, shared_bytes).
+
+    Returns
+    -------
+    http.server.ThreadingHTTPServer
+        The server, with the service as its service attribute. Call serve_forever() to start serving and shutdown() and server_close() to stop.
+    """
+    if service is None:
+        service = SimulationService(**service_kwargs)
+    server = ThreadingHTTPServer((host, port), _RequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+def serve(host = '127.0.0.1', port = 8765, verbose = False, **service_kwargs):
+    """
+    Serve simulations until interrupted (Ctrl+C), then shut down the worker processes.
+
+    Args
+    ----
+    host, port, verbose, **service_kwargs
+        As for make_server.
+    """
+    server = make_server(host, port, verbose = verbose, **service_kwargs)
+    print(f"Serving RocketFlightSim simulations on http://{server.server_address[0]}:{server.server_address[1]} with {server.service.processes} worker processes", file = sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Run a local RocketFlightSim simulation service.')
+    parser.add_argument('--host', default = '127.0.0.1', help = 'address to listen on')
+    parser.add_argument('--port', type = int, default = 8765, help = 'port to listen on')
+    parser.add_argument('--processes', type = int, default = None, help = 'number of worker processes (default: number of CPUs)')
+    parser.add_argument('--cache-size', type = int, default = 1024, help = 'maximum number of cached results')
+    parser.add_argument('--verbose', action = 'store_true', help = 'log each request')
+    args = parser.parse_args()
+
+    serve(args.host, args.port, verbose = args.verbose, processes = args.processes, cache_size = args.cache_size)
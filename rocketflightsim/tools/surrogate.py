@@ -0,0 +1,417 @@
+""" Surrogate models of apogee, trained from sampled simulations.
+
+Samples a design space around a reference flight, simulates each design with flight_sim_ignition_to_apogee in parallel, and fits a surrogate model of the apogee that predicts thousands of designs per millisecond, e.g. for interactive design tools. The design variables are:
+- 'dry_mass': dry mass of the rocket, including the motor's dry mass (kg)
+- 'Cd': drag coefficient of the rocket, constant with Mach number
+- 'total_impulse', 'burn_time': the reference motor's thrust curve is stretched in time to the burn time and scaled in thrust to the total impulse. Its fuel mass scales with the total impulse, keeping its specific impulse
+- 'launch_rail_elevation': elevation of the launch rail (deg from horizontal)
+- 'launchpad_temp', 'launchpad_pressure', 'mean_wind_speed': as for Environment
+
+Two kinds of surrogate are available: a polynomial response surface, fit by least squares and quickest to evaluate, and radial basis function (RBF) interpolation with a cubic kernel and a linear polynomial tail, which is exact at the samples and better for small or irregular samples. Inputs are scaled to [-1, 1] over the bounds of the design space before fitting.
+"""
+import itertools
+
+import numpy as np
+
+from .. import constants as con
+from ..classes.motor import Motor
+from ..classes.rocket import Rocket
+from ..classes.environment import Environment
+from ..classes.launchpad import Launchpad
+from ..flight_stages_combined import flight_sim_ignition_to_apogee
+from ..parallel import run_in_parallel
+
+design_variables = ('dry_mass', 'Cd', 'total_impulse', 'burn_time', 'launch_rail_elevation', 'launchpad_temp', 'launchpad_pressure', 'mean_wind_speed')
+surrogate_kinds = ('polynomial', 'rbf')
+
+def _check_bounds(bounds):
+    unknown_variables = set(bounds) - set(design_variables)
+    if unknown_variables:
+        raise ValueError(f"Unknown design variable(s): {', '.join(sorted(unknown_variables))}. Must be among {', '.join(design_variables)}")
+    for variable, (low, high) in bounds.items():
+        if not low < high:
+            raise ValueError(f"The lower bound of {variable} must be below its upper bound")
+
+def sample_designs(bounds, num_samples, seed = None):
+    """
+    Sample a design space with a Latin hypercube, which spreads the samples evenly along every variable.
+
+    Args
+    ----
+    bounds : dict
+        (lower bound, upper bound) of each design variable to vary, keyed by variable name.
+    num_samples : int
+        Number of designs to sample.
+    seed : int, optional
+        Seed of the random number generator, for reproducible samples.
+
+    Returns
+    -------
+    numpy.ndarray
+        The designs, one per row, with a column for each variable in the order of bounds.
+    """
+    _check_bounds(bounds)
+    rng = np.random.default_rng(seed)
+    num_variables = len(bounds)
+    # one sample in each of num_samples equal intervals of each variable, paired at random across variables
+    unit = (rng.permuted(np.tile(np.arange(num_samples), (num_variables, 1)), axis = 1).T + rng.random((num_samples, num_variables))) / num_samples
+    lows = np.array([low for low, high in bounds.values()], dtype = float)
+    highs = np.array([high for low, high in bounds.values()], dtype = float)
+    return lows + unit * (highs - lows)
+
+def design_flight(rocket, environment, launchpad, design):
+    """
+    Make the rocket, environment, and launchpad of a design, from those of the reference flight.
+
+    Args
+    ----
+    rocket : Rocket
+        The reference rocket.
+    environment : Environment
+        The reference environment. Its lapse rate, gravity, and wind heading are kept.
+    launchpad : Launchpad
+        The reference launchpad. Its rail length, heading, and hold-down clamps are kept.
+    design : dict
+        Value of each design variable that differs from the reference, keyed by variable name.
+
+    Returns
+    -------
+    tuple
+        The (rocket, environment, launchpad) of the design. Configurations the design doesn't change are the reference objects themselves.
+    """
+    unknown_variables = set(design) - set(design_variables)
+    if unknown_variables:
+        raise ValueError(f"Unknown design variable(s): {', '.join(sorted(unknown_variables))}. Must be among {', '.join(design_variables)}")
+
+    motor = rocket.motor
+    if 'total_impulse' in design or 'burn_time' in design:
+        time_scale = design.get('burn_time', motor.burn_time) / motor.burn_time
+        impulse_scale = design.get('total_impulse', motor.total_impulse) / motor.total_impulse
+        motor = Motor(
+            {time * time_scale: thrust * impulse_scale / time_scale for time, thrust in motor.thrust_curve.items()},
+            motor.dry_mass,
+            fuel_mass_curve = {time * time_scale: mass * impulse_scale for time, mass in motor.fuel_mass_curve.items()},
+        )
+    if 'Cd' in design:
+        rocket = Rocket(rocket.rocket_mass, motor, rocket.A_rocket, design['Cd'], rocket.h_second_rail_button)
+    elif motor is not rocket.motor or 'dry_mass' in design:
+        rocket = rocket.with_motor(motor)
+    if 'dry_mass' in design:
+        rocket.rocket_mass = design['dry_mass'] - motor.dry_mass
+        rocket.dry_mass = design['dry_mass']
+
+    if {'launchpad_temp', 'launchpad_pressure', 'mean_wind_speed'} & set(design):
+        environment = Environment(
+            launchpad_pressure = design.get('launchpad_pressure', environment.launchpad_pressure),
+            launchpad_temp = design.get('launchpad_temp', environment.launchpad_temp - 273.15),
+            local_gravity = environment.local_gravity,
+            local_T_lapse_rate = environment.local_T_lapse_rate,
+            mean_wind_speed = design.get('mean_wind_speed', environment.mean_wind_speed),
+            wind_heading = np.rad2deg(environment.wind_heading),
+        )
+
+    if 'launch_rail_elevation' in design:
+        launchpad = Launchpad(
+            launchpad.rail_length,
+            launch_rail_elevation = design['launch_rail_elevation'],
+            launch_rail_heading = launchpad.launch_rail_heading,
+            hold_down_clamp_release_time = launchpad.hold_down_clamp_release_time,
+            hold_down_clamp_force = launchpad.hold_down_clamp_force,
+        )
+    return rocket, environment, launchpad
+
+def _simulate_design(shared, task):
+    rocket, environment, launchpad, variables, timestep = shared
+    index, values = task
+    try:
+        flightpath = flight_sim_ignition_to_apogee(*design_flight(rocket, environment, launchpad, dict(zip(variables, values))), timestep = timestep)
+    except Exception:
+        # e.g. the design doesn't lift off or clear the rail
+        return index, np.nan
+    return index, float(flightpath[-1][3])
+
+def simulate_designs(rocket, environment, launchpad, variables, designs, timestep = con.default_timestep, processes = None):
+    """
+    Simulate the apogee of each design in parallel.
+
+    Args
+    ----
+    rocket, environment, launchpad
+        The reference flight, as for design_flight.
+    variables : sequence of str
+        Names of the design variables, in the order of the columns of designs.
+    designs : numpy.ndarray
+        The designs, one per row.
+    timestep : float or dict, optional
+        The timestep or timestep schedule of the simulations.
+    processes : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+
+    Returns
+    -------
+    numpy.ndarray
+        The apogee of each design (m). NaN for designs that couldn't be simulated.
+    """
+    designs = np.atleast_2d(np.asarray(designs, dtype = float))
+    apogees = np.full(len(designs), np.nan)
+    shared = (rocket, environment, launchpad, tuple(variables), timestep)
+    tasks = [(i, tuple(design)) for i, design in enumerate(designs)]
+    for i, apogee in run_in_parallel(_simulate_design, tasks, shared = shared, processes = processes):
+        apogees[i] = apogee
+    return apogees
+
+def _polynomial_exponents(num_variables, degree):
+    # the variables multiplied together in each term of a polynomial, as tuples of column indices
+    return [term for order in range(degree + 1) for term in itertools.combinations_with_replacement(range(num_variables), order)]
+
+def _polynomial_features(x, terms):
+    # each term is the term without its last variable, already computed as terms are in order of degree, times that variable
+    index_of = {term: j for j, term in enumerate(terms)}
+    columns = np.ascontiguousarray(x.T)
+    features = np.empty((len(terms), len(x)))
+    for j, term in enumerate(terms):
+        if not term:
+            features[j] = 1
+        else:
+            np.multiply(features[index_of[term[:-1]]], columns[term[-1]], out = features[j])
+    return features.T
+
+def _rbf_kernel(x, centers):
+    # cubic kernel r^3
+    squared_distances = (x * x).sum(axis = 1)[:, None] - 2 * x @ centers.T + (centers * centers).sum(axis = 1)[None, :]
+    return np.maximum(squared_distances, 0) ** 1.5
+
+class ApogeeSurrogate:
+    """
+    A surrogate model of apogee over a design space, fit to simulated designs.
+
+    Attributes
+    ----------
+    variables : tuple
+        Names of the design variables, in the order predict() takes them in.
+    bounds : numpy.ndarray
+        Lower and upper bound of each variable, one row per variable.
+    kind : str
+        'polynomial' or 'rbf'.
+    degree : int
+        Degree of the polynomial response surface. 1 for the polynomial tail of an RBF surrogate.
+    coefficients : numpy.ndarray
+        Coefficients of the polynomial terms, followed by the weights of the RBF centers for an RBF surrogate.
+    centers : numpy.ndarray
+        Scaled designs the RBF kernels are centered on, or an empty array for a polynomial surrogate.
+    cv_errors : dict
+        Cross-validated errors, as returned by cross_validate(), or None if the surrogate hasn't been cross-validated.
+    """
+    def __init__(self, variables, bounds, kind = 'polynomial', degree = 3, ridge = 1e-10):
+        """Initialize an unfitted ApogeeSurrogate object.
+
+        Parameters
+        ----------
+        variables : sequence of str
+            Names of the design variables.
+        bounds : array_like
+            Lower and upper bound of each variable, one row per variable. Inputs are scaled to [-1, 1] over them.
+        kind : str, optional
+            'polynomial' (default) for a polynomial response surface, or 'rbf' for cubic radial basis function interpolation.
+        degree : int, optional
+            Degree of the polynomial response surface. Defaults to 3. Ignored for an RBF surrogate.
+        ridge : float, optional
+            Ridge regularization of the least-squares fit, relative to the scale of the features. Defaults to 1e-10.
+        """
+        if kind not in surrogate_kinds:
+            raise ValueError(f"Invalid surrogate kind '{kind}'. Must be one of {', '.join(surrogate_kinds)}")
+        self.variables = tuple(variables)
+        self.bounds = np.asarray(bounds, dtype = float).reshape(len(self.variables), 2)
+        self.kind = kind
+        self.degree = degree if kind == 'polynomial' else 1
+        self.ridge = ridge
+        self.coefficients = np.empty(0)
+        self.centers = np.empty((0, len(self.variables)))
+        self.cv_errors = None
+        self._terms = _polynomial_exponents(len(self.variables), self.degree)
+
+    def _scale(self, x):
+        lows, highs = self.bounds[:, 0], self.bounds[:, 1]
+        return 2 * (x - lows) / (highs - lows) - 1
+
+    def _inputs(self, x):
+        if isinstance(x, dict):
+            missing_variables = set(self.variables) - set(x)
+            if missing_variables:
+                raise ValueError(f"Missing design variable(s): {', '.join(sorted(missing_variables))}")
+            x = np.column_stack(np.broadcast_arrays(*(np.asarray(x[variable], dtype = float).ravel() for variable in self.variables)))
+        x = np.asarray(x, dtype = float)
+        if x.ndim == 1:
+            x = x[None, :]
+        if x.shape[1] != len(self.variables):
+            raise ValueError(f"Expected {len(self.variables)} design variables per design, got {x.shape[1]}")
+        return self._scale(x)
+
+    def fit(self, designs, apogees):
+        """
+        Fit the surrogate to simulated designs. Designs with a NaN apogee are left out.
+
+        Args
+        ----
+        designs : numpy.ndarray
+            The designs, one per row.
+        apogees : numpy.ndarray
+            The simulated apogee of each design (m).
+
+        Returns
+        -------
+        ApogeeSurrogate
+            This surrogate.
+        """
+        x = self._inputs(designs)
+        apogees = np.asarray(apogees, dtype = float)
+        valid = ~np.isnan(apogees)
+        x, apogees = x[valid], apogees[valid]
+        polynomial = _polynomial_features(x, self._terms)
+
+        if self.kind == 'polynomial':
+            if len(x) < len(self._terms):
+                raise ValueError(f"A degree {self.degree} polynomial in {len(self.variables)} variables needs at least {len(self._terms)} designs, got {len(x)}")
+            # ridge regression, solved through the normal equations
+            normal_matrix = polynomial.T @ polynomial
+            normal_matrix += self.ridge * np.trace(normal_matrix) / len(self._terms) * np.eye(len(self._terms))
+            self.coefficients = np.linalg.solve(normal_matrix, polynomial.T @ apogees)
+            self.centers = np.empty((0, len(self.variables)))
+        else:
+            # interpolation conditions plus orthogonality of the weights to the polynomial tail
+            num_terms = len(self._terms)
+            system = np.zeros((len(x) + num_terms, len(x) + num_terms))
+            system[:len(x), :len(x)] = _rbf_kernel(x, x)
+            system[:len(x), len(x):] = polynomial
+            system[len(x):, :len(x)] = polynomial.T
+            solution = np.linalg.lstsq(system, np.concatenate((apogees, np.zeros(num_terms))), rcond = None)[0]
+            self.coefficients = np.concatenate((solution[len(x):], solution[:len(x)]))
+            self.centers = x
+        return self
+
+    def predict(self, designs):
+        """
+        Predict the apogee of designs.
+
+        Args
+        ----
+        designs : array_like or dict
+            A design, an array of designs with one per row, or a dictionary of arrays of each variable's values, keyed by variable name.
+
+        Returns
+        -------
+        numpy.ndarray
+            The predicted apogee of each design (m).
+        """
+        x = self._inputs(designs)
+        num_terms = len(self._terms)
+        apogees = _polynomial_features(x, self._terms) @ self.coefficients[:num_terms]
+        if self.kind == 'rbf':
+            apogees += _rbf_kernel(x, self.centers) @ self.coefficients[num_terms:]
+        return apogees
+
+    def cross_validate(self, designs, apogees, folds = 5, seed = None):
+        """
+        Estimate the prediction error with k-fold cross-validation: the surrogate is refit without each fold in turn and the fold predicted. The surrogate itself is then fit to all of the designs.
+
+        Args
+        ----
+        designs : numpy.ndarray
+            The designs, one per row.
+        apogees : numpy.ndarray
+            The simulated apogee of each design (m).
+        folds : int, optional
+            Number of folds. Defaults to 5.
+        seed : int, optional
+            Seed of the random split into folds.
+
+        Returns
+        -------
+        dict
+            'rmse' (m), 'max_error' (m), 'mean_relative_error', and 'r_squared' of the out-of-fold predictions. Also stored in cv_errors.
+        """
+        designs = np.atleast_2d(np.asarray(designs, dtype = float))
+        apogees = np.asarray(apogees, dtype = float)
+        valid = ~np.isnan(apogees)
+        designs, apogees = designs[valid], apogees[valid]
+
+        predictions = np.empty(len(apogees))
+        fold_of = np.random.default_rng(seed).permutation(len(apogees)) % folds
+        for fold in range(folds):
+            held_out = fold_of == fold
+            fold_model = ApogeeSurrogate(self.variables, self.bounds, self.kind, self.degree, self.ridge)
+            fold_model.fit(designs[~held_out], apogees[~held_out])
+            predictions[held_out] = fold_model.predict(designs[held_out])
+
+        errors = predictions - apogees
+        self.cv_errors = {
+            'rmse': float(np.sqrt(np.mean(errors**2))),
+            'max_error': float(np.abs(errors).max()),
+            'mean_relative_error': float(np.mean(np.abs(errors) / np.abs(apogees))),
+            'r_squared': float(1 - np.sum(errors**2) / np.sum((apogees - apogees.mean())**2)),
+        }
+        self.fit(designs, apogees)
+        return self.cv_errors
+
+    def save(self, path):
+        """ Save the fitted surrogate to a .npz file. """
+        cv_errors = self.cv_errors or {}
+        np.savez(
+            path,
+            variables = np.array(self.variables),
+            bounds = self.bounds,
+            kind = self.kind,
+            degree = self.degree,
+            ridge = self.ridge,
+            coefficients = self.coefficients,
+            centers = self.centers,
+            cv_error_names = np.array(list(cv_errors), dtype = str),
+            cv_error_values = np.array(list(cv_errors.values()), dtype = float),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """ Load a surrogate saved with save(). """
+        with np.load(path, allow_pickle = False) as saved:
+            surrogate = cls([str(variable) for variable in saved['variables']], saved['bounds'], str(saved['kind']), int(saved['degree']), float(saved['ridge']))
+            surrogate.coefficients = saved['coefficients']
+            surrogate.centers = saved['centers']
+            if len(saved['cv_error_names']):
+                surrogate.cv_errors = {str(name): float(value) for name, value in zip(saved['cv_error_names'], saved['cv_error_values'])}
+        return surrogate
+
+def train_surrogate(rocket, environment, launchpad, bounds, num_samples = 500, kind = 'polynomial', degree = 3, folds = 5, seed = None, timestep = con.default_timestep, processes = None):
+    """
+    Sample a design space around a reference flight, simulate the designs in parallel, and fit and cross-validate a surrogate model of apogee.
+
+    Args
+    ----
+    rocket, environment, launchpad
+        The reference flight, as for design_flight. Variables not in bounds keep their reference values.
+    bounds : dict
+        (lower bound, upper bound) of each design variable to vary, keyed by variable name.
+    num_samples : int, optional
+        Number of designs to simulate. Defaults to 500.
+    kind : str, optional
+        'polynomial' (default) or 'rbf'.
+    degree : int, optional
+        Degree of the polynomial response surface. Defaults to 3.
+    folds : int, optional
+        Number of cross-validation folds. Defaults to 5.
+    seed : int, optional
+        Seed of the sampling and of the cross-validation split.
+    timestep : float or dict, optional
+        The timestep or timestep schedule of the simulations.
+    processes : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+
+    Returns
+    -------
+    ApogeeSurrogate
+        The surrogate, fit to every simulated design, with its cross-validated errors in cv_errors.
+    """
+    designs = sample_designs(bounds, num_samples, seed)
+    apogees = simulate_designs(rocket, environment, launchpad, list(bounds), designs, timestep, processes)
+    surrogate = ApogeeSurrogate(list(bounds), list(bounds.values()), kind, degree)
+    surrogate.cross_validate(designs, apogees, folds, seed)
+    return surrogate
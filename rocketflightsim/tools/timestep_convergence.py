@@ -0,0 +1,196 @@
+""" Automated timestep convergence study.
+
+Sweeps the timestep of one flight phase at a time while the other phases use a fine reference timestep, estimates the observed order of convergence of the apogee, max speed, and landing point, and uses Richardson extrapolation to find the coarsest timestep for each phase that keeps the error in each of them within a tolerance.
+
+Replaces sweeping a few hundred log-spaced timesteps over the whole flight and picking a timestep by eye.
+"""
+import numpy as np
+
+from .. import constants as con
+from ..flight_stages_combined import flight_sim_ignition_to_landing, flight_sim_ballistic_recovery
+from ..parallel import run_in_parallel
+
+phases = con.timestep_phases
+metrics = ('apogee', 'max_speed', 'landing_x', 'landing_y')
+
+default_tolerances = {
+    'apogee': 1.0, # m
+    'max_speed': 0.5, # m/s
+    'landing': 5.0, # m, distance between landing points
+}
+
+def _simulate_with_phase_timesteps(rocket, environment, launchpad, parachutes_and_conditions, timesteps):
+    if parachutes_and_conditions:
+        flightpath = flight_sim_ignition_to_landing(rocket, environment, launchpad, parachutes_and_conditions, timestep = timesteps)
+    else:
+        flightpath = flight_sim_ballistic_recovery(rocket, environment, launchpad, timestep = timesteps)
+
+    states = flightpath.to_numpy()
+    apogee_index = states[:, 3].argmax()
+    ascent = states[:apogee_index + 1]
+    max_speed = np.sqrt(ascent[:, 4]**2 + ascent[:, 5]**2 + ascent[:, 6]**2).max()
+    return states[apogee_index, 3], max_speed, states[-1, 1], states[-1, 2]
+
+def _run_sweep_point(shared, task):
+    rocket, environment, launchpad, parachutes_and_conditions, reference_timestep = shared
+    phase, timestep = task
+    timesteps = {p: reference_timestep for p in phases}
+    timesteps[phase] = timestep
+    try:
+        return tuple(float(value) for value in _simulate_with_phase_timesteps(rocket, environment, launchpad, parachutes_and_conditions, timesteps))
+    except (IndexError, ValueError, ZeroDivisionError):
+        # the phase is too short to be simulated with a step this coarse
+        return (np.nan,) * len(metrics)
+
+def observed_order(coarse, medium, fine, refinement_ratio = 2):
+    """
+    Estimate the observed order of convergence from results at three timesteps.
+
+    Args
+    ----
+    coarse, medium, fine : float or numpy.ndarray
+        Results at timesteps h * r^2, h * r, and h.
+    refinement_ratio : float, optional
+        Ratio r between successive timesteps. Defaults to 2.
+
+    Returns
+    -------
+    float or numpy.ndarray
+        The observed order p. NaN where the differences between the results don't shrink monotonically, as the order can't be estimated there.
+    """
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        ratio = (coarse - medium) / (medium - fine)
+        return np.where(ratio > 1, np.log(np.abs(ratio)) / np.log(refinement_ratio), np.nan)
+
+def richardson_extrapolation(medium, fine, order, refinement_ratio = 2):
+    """
+    Extrapolate the results at two timesteps to an estimate of the result at a timestep of zero.
+
+    Args
+    ----
+    medium, fine : float or numpy.ndarray
+        Results at timesteps h * r and h.
+    order : float or numpy.ndarray
+        Order of convergence.
+    refinement_ratio : float, optional
+        Ratio r between the timesteps. Defaults to 2.
+
+    Returns
+    -------
+    float or numpy.ndarray
+        The extrapolated result.
+    """
+    return fine + (fine - medium) / (refinement_ratio ** order - 1)
+
+def timestep_convergence_study(rocket, environment, launchpad, parachutes_and_conditions = None, coarsest_timestep = 0.08, levels = 7, reference_timestep = None, tolerances = None, study_phases = phases, processes = None):
+    """
+    Run a timestep convergence study for each flight phase and recommend a timestep for each.
+
+    Args
+    ----
+    rocket : Rocket
+        An instance of the Rocket class.
+    environment : Environment
+        An instance of the Environment class.
+    launchpad : Launchpad
+        An instance of the Launchpad class.
+    parachutes_and_conditions : list, optional
+        A list of tuples (parachute, stop_condition, stop_condition_value) as taken by flight_sim_ignition_to_landing. If not given, the descent is simulated as a ballistic fall.
+    coarsest_timestep : float, optional
+        The coarsest timestep in each sweep (s). Defaults to 0.08.
+    levels : int, optional
+        Number of timesteps in each sweep, each half the one before it. Must be at least 3. Defaults to 7.
+    reference_timestep : float, optional
+        Timestep used for the phases not being swept (s). Defaults to the finest timestep in the sweep.
+    tolerances : dict, optional
+        Allowed error in 'apogee' (m), 'max_speed' (m/s), and 'landing' (m, distance between landing points). Missing keys fall back to default_tolerances.
+    study_phases : tuple, optional
+        The phases to study, out of 'rail', 'boost', 'coast', and 'descent'. Defaults to all of them.
+    processes : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+
+    Returns
+    -------
+    dict
+        Results for each phase. Each value is a dictionary with:
+        - 'timesteps': the swept timesteps, coarsest first
+        - 'results': the apogee, max speed, landing x, and landing y at each timestep, keyed by metric
+        - 'observed_order': the observed order of convergence of each metric
+        - 'extrapolated': the Richardson-extrapolated value of each metric
+        - 'errors': the estimated error at each timestep for 'apogee', 'max_speed', and 'landing'
+        - 'recommended_timestep': the coarsest timestep at which it and every finer timestep are within tolerance, or None if none are
+
+    Notes
+    -----
+    The order and extrapolated values come from the three finest timesteps that simulated successfully. Where the order can't be estimated (e.g. a phase whose metrics are already converged to round-off), the finest result is used as the estimate of the exact value.
+    """
+    if levels < 3:
+        raise ValueError("At least 3 levels are needed to estimate the order of convergence")
+    tolerances = {**default_tolerances, **(tolerances or {})}
+    timesteps = coarsest_timestep * 0.5 ** np.arange(levels)
+    if reference_timestep is None:
+        reference_timestep = timesteps[-1]
+
+    tasks = [(phase, float(timestep)) for phase in study_phases for timestep in timesteps]
+    shared = (rocket, environment, launchpad, parachutes_and_conditions, reference_timestep)
+    sweep = np.array(list(run_in_parallel(_run_sweep_point, tasks, shared = shared, processes = processes)), dtype = float).reshape(len(study_phases), levels, len(metrics))
+
+    study = {}
+    for phase, results in zip(study_phases, sweep):
+        valid = ~np.isnan(results).any(axis = 1)
+        coarse, medium, fine = results[valid][-3:] if valid.sum() >= 3 else (results[-1],) * 3
+
+        order = observed_order(coarse, medium, fine)
+        extrapolated = np.where(np.isnan(order), fine, richardson_extrapolation(medium, fine, order))
+
+        errors = {
+            'apogee': np.abs(results[:, 0] - extrapolated[0]),
+            'max_speed': np.abs(results[:, 1] - extrapolated[1]),
+            'landing': np.hypot(results[:, 2] - extrapolated[2], results[:, 3] - extrapolated[3]),
+        }
+        within_tolerance = np.all([errors[metric] <= tolerances[metric] for metric in errors], axis = 0)
+
+        # coarsest timestep at which it and every finer timestep are within tolerance
+        recommended_timestep = None
+        for timestep, ok in zip(timesteps[::-1], within_tolerance[::-1]):
+            if not ok:
+                break
+            recommended_timestep = float(timestep)
+
+        study[phase] = {
+            'timesteps': timesteps,
+            'results': {metric: results[:, i] for i, metric in enumerate(metrics)},
+            'observed_order': {metric: float(order[i]) for i, metric in enumerate(metrics)},
+            'extrapolated': {metric: float(extrapolated[i]) for i, metric in enumerate(metrics)},
+            'errors': errors,
+            'recommended_timestep': recommended_timestep,
+        }
+    return study
+
+def recommend_timesteps(rocket, environment, launchpad, parachutes_and_conditions = None, **study_kwargs):
+    """
+    Recommend a timestep for each flight phase of a rocket.
+
+    Args
+    ----
+    rocket : Rocket
+        An instance of the Rocket class.
+    environment : Environment
+        An instance of the Environment class.
+    launchpad : Launchpad
+        An instance of the Launchpad class.
+    parachutes_and_conditions : list, optional
+        A list of tuples (parachute, stop_condition, stop_condition_value). If not given, the descent is simulated as a ballistic fall.
+    **study_kwargs
+        Passed on to timestep_convergence_study (e.g. tolerances, coarsest_timestep, levels, processes).
+
+    Returns
+    -------
+    dict
+        The recommended timestep for each phase (s), which can be passed as the timestep schedule of the combined flight functions. Phases for which no swept timestep met the tolerances get the finest timestep of the sweep.
+    """
+    study = timestep_convergence_study(rocket, environment, launchpad, parachutes_and_conditions, **study_kwargs)
+    return {
+        phase: results['recommended_timestep'] if results['recommended_timestep'] is not None else float(results['timesteps'][-1])
+        for phase, results in study.items()
+    }
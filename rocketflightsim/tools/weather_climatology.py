@@ -0,0 +1,368 @@
+""" Historical weather ingestion and launch-window climatology sweeps.
+
+Streams local CSV archives of hourly weather records (e.g. the Spaceport America records mentioned in the notes at the bottom of classes/environment.py), filters out conditions that would scrub a launch, bins near-identical conditions together, simulates each unique condition once in parallel, and then builds apogee and landing distance distributions by month and hour of the day.
+
+Only one chunk of records is held in memory at a time, so archives covering many years can be processed without loading them in full.
+"""
+import csv
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from .. import constants as con
+from ..classes.environment import Environment
+from ..flight_stages_combined import flight_sim_ignition_to_landing, flight_sim_ballistic_recovery
+from ..parallel import run_in_parallel
+
+# names of the columns in the CSV files, keyed by the quantity they hold
+default_columns = {
+    'time': 'time',
+    'pressure': 'pressure',
+    'temperature': 'temperature',
+    'wind_speed': 'wind_speed',
+    'wind_direction': 'wind_direction',
+}
+
+# factors to convert the supported input units to the units used by Environment objects
+wind_speed_units = {
+    'm/s': 1,
+    'mph': con.mph_to_m_per_s_conversion,
+    'km/h': 1 / 3.6,
+    'knots': 0.514444,
+}
+pressure_units = {
+    'Pa': 1,
+    'hPa': 100,
+    'kPa': 1000,
+    'inHg': 3386.389,
+}
+
+# default bin widths used to merge near-identical conditions
+default_resolution = {
+    'pressure': 100, # Pa
+    'temperature': 0.5, # deg C
+    'wind_speed': 0.5, # m/s
+    'wind_heading': 10, # deg
+}
+
+# launches can't happen if the wind is above 20 mph
+default_max_wind_speed = 20 * con.mph_to_m_per_s_conversion # m/s
+
+def read_weather_records(paths, columns = None, chunk_rows = 10000, max_wind_speed = default_max_wind_speed, wind_speed_unit = 'm/s', pressure_unit = 'Pa', temperature_unit = 'C', utc_offset = 0, time_format = None):
+    """
+    Stream hourly weather records from one or more CSV files in chunks.
+
+    Args
+    ----
+    paths : str or list of str
+        Path(s) to the CSV file(s).
+    columns : dict, optional
+        Names of the columns holding each quantity, keyed by 'time', 'pressure', 'temperature', 'wind_speed', and 'wind_direction'. Missing keys fall back to default_columns.
+    chunk_rows : int, optional
+        Maximum number of records per chunk. Defaults to 10000.
+    max_wind_speed : float, optional
+        Records with a wind speed above this (m/s) are dropped. Defaults to 20 mph. Set to None to keep all records.
+    wind_speed_unit : str, optional
+        Unit of the wind speed column. One of 'm/s', 'mph', 'km/h', or 'knots'. Defaults to 'm/s'.
+    pressure_unit : str, optional
+        Unit of the pressure column. One of 'Pa', 'hPa', 'kPa', or 'inHg'. Defaults to 'Pa'.
+    temperature_unit : str, optional
+        Unit of the temperature column. One of 'C', 'K', or 'F'. Defaults to 'C'.
+    utc_offset : float, optional
+        Hours to add to the timestamps to get local time (e.g. -6 for Spaceport America during the summer if the records are in UTC). Defaults to 0.
+    time_format : str, optional
+        Format of the time column for datetime.strptime. Defaults to None, in which case ISO 8601 is assumed.
+
+    Yields
+    ------
+    dict
+        A dictionary of numpy arrays with the keys 'month', 'hour', 'pressure' (Pa), 'temperature' (deg C), 'wind_speed' (m/s), and 'wind_heading' (deg, the direction the wind is headed towards, as used by Environment objects).
+
+    Notes
+    -----
+    Wind direction in weather records is conventionally the direction the wind is coming from, so 180 deg is added to get the heading. Rows with missing or unparseable values are skipped.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    columns = {**default_columns, **(columns or {})}
+    wind_factor = wind_speed_units[wind_speed_unit]
+    pressure_factor = pressure_units[pressure_unit]
+    offset = timedelta(hours = utc_offset)
+
+    def to_celsius(temp):
+        if temperature_unit == 'K':
+            return temp - 273.15
+        if temperature_unit == 'F':
+            return (temp - 32) * 5 / 9
+        return temp
+
+    def parse_time(text):
+        if time_format:
+            return datetime.strptime(text, time_format)
+        return datetime.fromisoformat(text)
+
+    chunk = []
+    for path in paths:
+        with open(path, newline = '') as file:
+            for row in csv.DictReader(file):
+                try:
+                    time = parse_time(row[columns['time']].strip()) + offset
+                    pressure = float(row[columns['pressure']]) * pressure_factor
+                    temperature = to_celsius(float(row[columns['temperature']]))
+                    wind_speed = float(row[columns['wind_speed']]) * wind_factor
+                    wind_direction = float(row[columns['wind_direction']])
+                except (KeyError, ValueError, TypeError):
+                    continue
+
+                if max_wind_speed is not None and wind_speed > max_wind_speed:
+                    continue
+
+                chunk.append((time.month, time.hour, pressure, temperature, wind_speed, (wind_direction + 180) % 360))
+                if len(chunk) >= chunk_rows:
+                    yield _chunk_to_arrays(chunk)
+                    chunk = []
+    if chunk:
+        yield _chunk_to_arrays(chunk)
+
+def _chunk_to_arrays(chunk):
+    month, hour, pressure, temperature, wind_speed, wind_heading = zip(*chunk)
+    return {
+        'month': np.array(month, dtype = np.int8),
+        'hour': np.array(hour, dtype = np.int8),
+        'pressure': np.array(pressure),
+        'temperature': np.array(temperature),
+        'wind_speed': np.array(wind_speed),
+        'wind_heading': np.array(wind_heading),
+    }
+
+class WeatherConditions:
+    """
+    The WeatherConditions class is used to store the unique (binned) launch conditions found in a weather archive, along with how often each one occurred at each month and hour.
+
+    Attributes
+    ----------
+    pressure : numpy.ndarray
+        Launchpad pressure of each unique condition (Pa).
+    temperature : numpy.ndarray
+        Launchpad temperature of each unique condition (deg C).
+    wind_speed : numpy.ndarray
+        Mean wind speed of each unique condition (m/s).
+    wind_heading : numpy.ndarray
+        Direction the wind is headed towards for each unique condition (deg).
+    counts : dict
+        Number of records of each unique condition, keyed by (condition index, month, hour).
+    num_records : int
+        Total number of records binned.
+    """
+    def __init__(self, pressure, temperature, wind_speed, wind_heading, counts, num_records):
+        self.pressure = pressure
+        self.temperature = temperature
+        self.wind_speed = wind_speed
+        self.wind_heading = wind_heading
+        self.counts = counts
+        self.num_records = num_records
+
+    def __len__(self):
+        return len(self.pressure)
+
+    def environment_parameters(self):
+        """ Returns the parameters of each unique condition as an array with columns (launchpad_pressure, launchpad_temp, mean_wind_speed, wind_heading). """
+        return np.column_stack((self.pressure, self.temperature, self.wind_speed, self.wind_heading))
+
+def bin_weather_conditions(chunks, resolution = None):
+    """
+    Merge near-identical weather records into a set of unique conditions, counting how often each one occurs at each month and hour.
+
+    Args
+    ----
+    chunks : iterable
+        Chunks of records as yielded by read_weather_records.
+    resolution : dict, optional
+        Bin width for each of 'pressure' (Pa), 'temperature' (deg C), 'wind_speed' (m/s), and 'wind_heading' (deg). Missing keys fall back to default_resolution.
+
+    Returns
+    -------
+    WeatherConditions
+        The unique conditions, each at the center of its bin.
+    """
+    resolution = {**default_resolution, **(resolution or {})}
+    widths = np.array([resolution['pressure'], resolution['temperature'], resolution['wind_speed'], resolution['wind_heading']])
+
+    condition_indices = {}
+    counts = {}
+    num_records = 0
+    for chunk in chunks:
+        values = np.column_stack((chunk['pressure'], chunk['temperature'], chunk['wind_speed'], chunk['wind_heading'] % 360))
+        bins = np.round(values / widths).astype(np.int64)
+        # wind headings of 0 and 360 deg are the same bin
+        bins[:, 3] %= int(round(360 / widths[3]))
+
+        for key, month, hour in zip(map(tuple, bins), chunk['month'].tolist(), chunk['hour'].tolist()):
+            index = condition_indices.setdefault(key, len(condition_indices))
+            counts[(index, month, hour)] = counts.get((index, month, hour), 0) + 1
+        num_records += len(bins)
+
+    unique = np.array(list(condition_indices.keys()), dtype = float).reshape(-1, 4) * widths
+    return WeatherConditions(unique[:, 0], unique[:, 1], unique[:, 2], unique[:, 3], counts, num_records)
+
+def _simulate_condition(shared, condition):
+    rocket, launchpad, parachutes_and_conditions, environment_kwargs, timestep = shared
+    pressure, temperature, wind_speed, wind_heading = condition
+    environment = Environment(
+        launchpad_pressure = pressure,
+        launchpad_temp = temperature,
+        mean_wind_speed = wind_speed,
+        wind_heading = wind_heading,
+        **environment_kwargs
+    )
+
+    if parachutes_and_conditions:
+        states = flight_sim_ignition_to_landing(rocket, environment, launchpad, parachutes_and_conditions, timestep = timestep).to_numpy()
+    else:
+        states = flight_sim_ballistic_recovery(rocket, environment, launchpad, timestep = timestep).to_numpy()
+
+    return float(states[:, 3].max()), float(states[-1, 1]), float(states[-1, 2])
+
+def simulate_weather_conditions(rocket, launchpad, conditions, parachutes_and_conditions = None, environment_kwargs = None, timestep = con.default_timestep, processes = None):
+    """
+    Simulate a flight for each unique weather condition in parallel.
+
+    Args
+    ----
+    rocket : Rocket
+        An instance of the Rocket class.
+    launchpad : Launchpad
+        An instance of the Launchpad class.
+    conditions : WeatherConditions
+        The unique conditions to simulate, as returned by bin_weather_conditions.
+    parachutes_and_conditions : list, optional
+        A list of tuples (parachute, stop_condition, stop_condition_value) as taken by flight_sim_ignition_to_landing. If not given, the rocket falls ballistically from apogee.
+    environment_kwargs : dict, optional
+        Other arguments for the Environment objects that don't change with the weather (e.g. latitude, altitude, local_T_lapse_rate).
+    timestep : float, optional
+        The time increment for the simulations in seconds.
+    processes : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+
+    Returns
+    -------
+    dict
+        Arrays of 'apogee' (m AGL), 'landing_x' (m east), and 'landing_y' (m north) for each unique condition.
+    """
+    shared = (rocket, launchpad, parachutes_and_conditions, environment_kwargs or {}, timestep)
+    tasks = [tuple(row) for row in conditions.environment_parameters().tolist()]
+    results = np.array(list(run_in_parallel(_simulate_condition, tasks, shared = shared, processes = processes)), dtype = float).reshape(-1, 3)
+    return {
+        'apogee': results[:, 0],
+        'landing_x': results[:, 1],
+        'landing_y': results[:, 2],
+    }
+
+def weighted_percentiles(values, weights, percentiles):
+    """
+    Calculate percentiles of a set of values where each value has a weight (e.g. a number of occurrences).
+
+    Args
+    ----
+    values : array_like
+        The values.
+    weights : array_like
+        The weight of each value.
+    percentiles : array_like
+        The percentiles to calculate, between 0 and 100.
+
+    Returns
+    -------
+    numpy.ndarray
+        The value at each percentile.
+    """
+    values = np.asarray(values, dtype = float)
+    weights = np.asarray(weights, dtype = float)
+    order = np.argsort(values)
+    values = values[order]
+    cumulative = np.cumsum(weights[order])
+    # midpoint rule so that equal weights give the same result as np.percentile's 'hazen' method
+    positions = (cumulative - weights[order] / 2) / cumulative[-1] * 100
+    return np.interp(percentiles, positions, values)
+
+def climatology_by_month_and_hour(conditions, results, percentiles = (5, 50, 95)):
+    """
+    Build apogee and landing distance distributions for each month and hour of the day.
+
+    Args
+    ----
+    conditions : WeatherConditions
+        The unique conditions, as returned by bin_weather_conditions.
+    results : dict
+        The simulation results for each condition, as returned by simulate_weather_conditions.
+    percentiles : tuple, optional
+        The percentiles to report. Defaults to (5, 50, 95).
+
+    Returns
+    -------
+    dict
+        Statistics for each (month, hour) pair. Each value is a dictionary with the number of records ('count') and, for each of 'apogee' and 'landing_distance', a dictionary of the 'mean', 'std', 'min', 'max', and the requested percentiles (keyed 'p5', 'p50', etc.).
+    """
+    landing_distance = np.hypot(results['landing_x'], results['landing_y'])
+
+    grouped = {}
+    for (index, month, hour), count in conditions.counts.items():
+        grouped.setdefault((month, hour), []).append((index, count))
+
+    def describe(values, weights):
+        mean = np.average(values, weights = weights)
+        stats = {
+            'mean': mean,
+            'std': np.sqrt(np.average((values - mean)**2, weights = weights)),
+            'min': values.min(),
+            'max': values.max(),
+        }
+        for percentile, value in zip(percentiles, weighted_percentiles(values, weights, percentiles)):
+            stats[f'p{percentile}'] = value
+        return stats
+
+    climatology = {}
+    for month_hour in sorted(grouped):
+        indices, weights = (np.array(column) for column in zip(*grouped[month_hour]))
+        climatology[month_hour] = {
+            'count': int(weights.sum()),
+            'apogee': describe(results['apogee'][indices], weights),
+            'landing_distance': describe(landing_distance[indices], weights),
+        }
+    return climatology
+
+def launch_window_climatology(paths, rocket, launchpad, parachutes_and_conditions = None, environment_kwargs = None, resolution = None, timestep = con.default_timestep, processes = None, **read_kwargs):
+    """
+    Run a launch-window climatology sweep: read a weather archive, simulate every unique launch condition in it, and build apogee and landing distance distributions by month and hour.
+
+    Args
+    ----
+    paths : str or list of str
+        Path(s) to the CSV weather archive(s).
+    rocket : Rocket
+        An instance of the Rocket class.
+    launchpad : Launchpad
+        An instance of the Launchpad class.
+    parachutes_and_conditions : list, optional
+        A list of tuples (parachute, stop_condition, stop_condition_value). If not given, the rocket falls ballistically from apogee.
+    environment_kwargs : dict, optional
+        Other arguments for the Environment objects that don't change with the weather (e.g. latitude, altitude, local_T_lapse_rate).
+    resolution : dict, optional
+        Bin widths used to merge near-identical conditions. See bin_weather_conditions.
+    timestep : float, optional
+        The time increment for the simulations in seconds.
+    processes : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    **read_kwargs
+        Passed on to read_weather_records (e.g. columns, max_wind_speed, wind_speed_unit, utc_offset).
+
+    Returns
+    -------
+    dict
+        Statistics for each (month, hour) pair, as returned by climatology_by_month_and_hour.
+    """
+    conditions = bin_weather_conditions(read_weather_records(paths, **read_kwargs), resolution = resolution)
+    if not len(conditions):
+        return {}
+    results = simulate_weather_conditions(rocket, launchpad, conditions, parachutes_and_conditions = parachutes_and_conditions, environment_kwargs = environment_kwargs, timestep = timestep, processes = processes)
+    return climatology_by_month_and_hour(conditions, results)
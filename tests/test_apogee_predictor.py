@@ -0,0 +1,61 @@
+import sys
+import os
+from copy import deepcopy
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim.apogee_predictor import ApogeePredictor
+from rocketflightsim.classes.airbrakes import Airbrakes
+from rocketflightsim.flight_sim_coast import sim_coast
+from rocketflightsim.flight_stages_combined import flight_sim_ignition_to_apogee
+
+from .test_configs import past_flights
+
+class TestApogeePredictor(unittest.TestCase):
+    def test_predictions_match_coast_stage(self):
+        print("\nTesting real-time apogee predictions...")
+
+        for past_flight in deepcopy(past_flights):
+            print(f'For rocket: {past_flight.name}')
+            rocket, environment = past_flight.rocket, past_flight.environment
+            flightpath = flight_sim_ignition_to_apogee(rocket, environment, past_flight.launchpad, timestep = 0.005)
+            burnout_index = np.searchsorted(flightpath.time, rocket.motor.burn_time) + 1
+
+            # no time budget, so every prediction is simulated to apogee however busy the machine is
+            predictor = ApogeePredictor(rocket, environment, time_budget = float('inf'))
+            for index in range(burnout_index, len(flightpath) - 1, 200):
+                state = flightpath[index]
+                apogee_coast = sim_coast(rocket, environment, state, timestep = 0.002)[-1][3]
+                apogee_predicted = predictor.predict(state)
+                assert abs(apogee_predicted - apogee_coast) < 1
+
+            print(predictor.latency_report())
+            assert predictor.num_predictions > 0 and predictor.num_truncated == 0
+            assert 0 < predictor.worst_case_latency
+            print()
+
+    def test_airbrakes_and_time_budget(self):
+        print("\nTesting apogee predictions with airbrakes and a time budget...")
+
+        past_flight = deepcopy(past_flights[0])
+        rocket, environment = past_flight.rocket, past_flight.environment
+        burnout_state = flight_sim_ignition_to_apogee(rocket, environment, past_flight.launchpad)
+        burnout_state = burnout_state[int(np.searchsorted(burnout_state.time, rocket.motor.burn_time)) + 1]
+
+        airbrakes = Airbrakes(num_flaps = 3, A_flap = 0.004, Cd_brakes = 0.95, max_deployment_angle = 45, max_deployment_rate = 5.5)
+        predictor = ApogeePredictor(rocket, environment, airbrakes, time_budget = float('inf'))
+        retracted = predictor.predict(burnout_state)
+        deployed = predictor.predict(burnout_state, target_deployment_angle = np.deg2rad(45))
+        held_open = predictor.predict(burnout_state, deployment_angle = np.deg2rad(45))
+        print(f"Retracted: {retracted:.1f} m, deploying: {deployed:.1f} m, fully deployed: {held_open:.1f} m")
+        assert held_open < deployed < retracted
+        assert predictor.num_truncated == 0
+
+        # with no time at all, the prediction is finished analytically
+        predictor = ApogeePredictor(rocket, environment, time_budget = 0)
+        truncated = predictor.predict(burnout_state)
+        print(predictor.latency_report())
+        assert predictor.num_truncated == 1
+        assert abs(truncated - retracted) / retracted < 0.2
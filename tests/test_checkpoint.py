@@ -0,0 +1,75 @@
+import sys
+import os
+from copy import deepcopy
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim.classes.parachute import Parachute
+from rocketflightsim.flight_sim_airbrakes import sim_max_airbrakes_deployment_to_apogee, sim_airbrakes_deployment_to_apogee_fn_time
+from rocketflightsim.flight_stages_combined import flight_sim_ignition_to_apogee, flight_sim_ignition_to_landing, flight_sim_ballistic_recovery
+
+from .test_configs import past_flights, example_airbrakes_model
+
+class TestCheckpoints(unittest.TestCase):
+    def test_resume_combined_flights(self):
+        print("\nTesting resuming flights from checkpoints...")
+
+        for past_flight in deepcopy(past_flights):
+            print(f'For rocket: {past_flight.name}')
+            rocket, environment, launchpad = past_flight.rocket, past_flight.environment, past_flight.launchpad
+            drogue = Parachute(past_flight.parachute.Cd, past_flight.parachute.area / 4)
+
+            checkpoints = []
+            flightpath = flight_sim_ignition_to_landing(rocket, environment, launchpad, [(drogue, 'below_altitude', 300), (past_flight.parachute, 'landed', None)], checkpoints = checkpoints)
+            print(checkpoints)
+            assert [checkpoint.event for checkpoint in checkpoints] == ['liftoff', 'rail_clearance', 'burnout', 'apogee', 'parachute_stop', 'parachute_stop']
+            burnout, apogee, drogue_stop = checkpoints[2], checkpoints[3], checkpoints[4]
+            assert burnout.context['burned_out'] and not checkpoints[1].context['burned_out']
+            assert checkpoints[1].context['motor_cursor'] is not None
+            assert drogue_stop.context['parachute_index'] == 1
+            assert np.array_equal(checkpoints[-1].states, flightpath.to_numpy())
+
+            # resuming gives the same flight as simulating it from ignition
+            main_only = [(past_flight.parachute, 'landed', None)]
+            assert np.array_equal(flight_sim_ignition_to_landing(rocket, environment, launchpad, main_only, resume_from = burnout).to_numpy(), flight_sim_ignition_to_landing(rocket, environment, launchpad, main_only).to_numpy())
+            assert np.array_equal(flight_sim_ignition_to_landing(rocket, environment, launchpad, main_only, resume_from = apogee).to_numpy(), flight_sim_ignition_to_landing(rocket, environment, launchpad, main_only).to_numpy())
+            assert np.array_equal(flight_sim_ballistic_recovery(rocket, environment, launchpad, resume_from = apogee).to_numpy(), flight_sim_ballistic_recovery(rocket, environment, launchpad).to_numpy())
+
+            # only the parachutes after the checkpoint are simulated
+            resumed = flight_sim_ignition_to_landing(rocket, environment, launchpad, [(drogue, 'below_altitude', 300), (past_flight.parachute, 'landed', None)], resume_from = drogue_stop)
+            assert np.array_equal(resumed.to_numpy(), flightpath.to_numpy())
+
+            assert np.array_equal(flight_sim_ignition_to_apogee(rocket, environment, launchpad, resume_from = apogee).to_numpy(), apogee.states)
+            with self.assertRaises(ValueError):
+                flight_sim_ignition_to_apogee(rocket, environment, launchpad, resume_from = drogue_stop)
+            print()
+
+    def test_resume_airbrakes(self):
+        print("\nTesting resuming airbrake deployment part way through...")
+
+        past_flight = deepcopy(past_flights[0])
+        rocket, environment = past_flight.rocket, past_flight.environment
+        checkpoints = []
+        flight_sim_ignition_to_apogee(rocket, environment, past_flight.launchpad, checkpoints = checkpoints)
+        burnout_state = checkpoints[2].state
+
+        full = sim_max_airbrakes_deployment_to_apogee(rocket, environment, example_airbrakes_model, burnout_state)
+        resumed = sim_max_airbrakes_deployment_to_apogee(rocket, environment, example_airbrakes_model, full[3])
+        assert np.allclose(resumed, full[4:])
+
+        # the deployment function takes the time after ignition, so a resumed stage deploys as the full one did
+        deployment_function = lambda time: min(np.deg2rad(45), 0.2 * (time - burnout_state[0]))
+        full = sim_airbrakes_deployment_to_apogee_fn_time(rocket, environment, example_airbrakes_model, burnout_state, deployment_function)
+        resumed = sim_airbrakes_deployment_to_apogee_fn_time(rocket, environment, example_airbrakes_model, full[10], deployment_function)
+        assert full[0][10] == 0
+        # and it's called with the time of each state before its step, starting at the time deployment begins
+        times = []
+        sim_airbrakes_deployment_to_apogee_fn_time(rocket, environment, example_airbrakes_model, burnout_state, lambda time: times.append(time) or 0)
+        assert times[0] == burnout_state[0] and np.isclose(times[1] - times[0], 0.02)
+        # while the states are stamped with the time at the end of their step, as in the other airbrake stages
+        assert np.isclose(full[0][0], burnout_state[0] + 0.02) and np.isclose(full[1][0] - full[0][0], 0.02)
+        assert np.isclose(sim_max_airbrakes_deployment_to_apogee(rocket, environment, example_airbrakes_model, burnout_state)[0][0], full[0][0])
+        assert np.allclose(np.array(resumed)[:, 0], np.array(full[11:])[:, 0])
+        assert np.allclose(np.array(resumed)[:, 1:], np.array(full[11:])[:, 1:])
@@ -0,0 +1,85 @@
+import sys
+import os
+import json
+import tempfile
+from copy import deepcopy
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim.cli import main, expand_jobs, run_jobs
+from rocketflightsim.flight_stages_combined import flight_sim_ignition_to_apogee
+from rocketflightsim.classes.environment import Environment
+from rocketflightsim.serialization import rocket_to_dict, environment_to_dict, launchpad_to_dict
+
+from .test_configs import NDRT_2020_flight
+
+class TestCommandLine(unittest.TestCase):
+    def test_batch_runner(self):
+        print("\nTesting the rfs batch runner...")
+
+        past_flight = deepcopy(NDRT_2020_flight)
+        environment = environment_to_dict(past_flight.environment)
+        with tempfile.TemporaryDirectory() as directory:
+            # configurations can be in their own files
+            with open(os.path.join(directory, 'rocket.json'), 'w') as file:
+                json.dump(rocket_to_dict(past_flight.rocket), file)
+            job_file = {
+                'defaults': {'rocket': 'rocket.json', 'environment': environment, 'launchpad': launchpad_to_dict(past_flight.launchpad), 'timestep': 0.02},
+                'jobs': [
+                    {'id': 'nominal'},
+                    {'id': 'hot', 'environment': {'launchpad_temp': 35}},
+                    {'id': 'broken', 'flight': 'orbit'},
+                ],
+                'sweeps': [
+                    {'id': 'wind', 'parameters': {'environment.mean_wind_speed': [0, 4, 8], 'launchpad.launch_rail_elevation': [85, 90]}},
+                    {'id': 'mass', 'mode': 'zip', 'parameters': {'rocket.rocket_mass': [17, 19], 'rocket.A_rocket': [0.015, 0.02]}},
+                ],
+            }
+            job_path = os.path.join(directory, 'jobs.json')
+            with open(job_path, 'w') as file:
+                json.dump(job_file, file)
+
+            jobs = expand_jobs(job_path)
+            ids = [job_id for job_id, _, _ in jobs]
+            print(f"\tjobs: {ids}")
+            assert ids == ['nominal', 'hot', 'broken'] + [f'wind/{i}' for i in range(6)] + ['mass/0', 'mass/1']
+            assert jobs[1][2]['environment']['launchpad_temp'] == 35 and jobs[1][2]['environment']['launchpad_pressure'] == environment['launchpad_pressure']
+            assert jobs[4][1] == {'environment.mean_wind_speed': 0, 'launchpad.launch_rail_elevation': 90}
+
+            # a crash after two records, the second only partly written, in an output file with a line that isn't a record
+            output_path = os.path.join(directory, 'results.jsonl')
+            run_jobs(job_path, output_path, processes = 1)
+            with open(output_path) as file:
+                lines = file.readlines()
+            with open(output_path, 'w') as file:
+                file.write(lines[0] + '{"note": "not a record"}\n' + lines[1][:20])
+
+            exit_code = main(['run', job_path, '-o', output_path, '--processes', '2', '--quiet'])
+            assert exit_code == 1 # the broken job failed
+            with open(output_path) as file:
+                lines = file.readlines()
+            records = {}
+            for line in lines:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if 'id' not in record:
+                    continue
+                assert record['id'] not in records
+                records[record['id']] = record
+            assert set(records) == set(ids)
+            assert records['broken']['status'] == 'error' and 'orbit' in records['broken']['error']
+
+            hot_environment = Environment(**dict(environment, launchpad_temp = 35))
+            apogee = flight_sim_ignition_to_apogee(past_flight.rocket, hot_environment, past_flight.launchpad, timestep = 0.02)[-1][3]
+            print(f"\thot day apogee {records['hot']['result']['apogee']:.3f} m, from the simulator {apogee:.3f} m")
+            assert np.isclose(records['hot']['result']['apogee'], apogee)
+
+            # everything is finished, so rerunning does nothing unless errors are retried
+            counts = run_jobs(job_path, output_path, processes = 1)
+            assert counts['run'] == 0 and counts['skipped'] == len(ids)
+            counts = run_jobs(job_path, output_path, processes = 1, retry_errors = True)
+            assert counts['run'] == 1 and counts['errors'] == 1
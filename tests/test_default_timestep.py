@@ -13,7 +13,7 @@ class TestDefaultTimestep(unittest.TestCase):
             print("Testing default timestep")
             
             # TODO test to verify slight changes from the default timestep don't have a significant effect on the simulation results
-# from flight simulation file, used to pick the default timestep:
+# from flight simulation file, used to pick the default timestep. Superseded by rocketflightsim/tools/timestep_convergence.py, which recommends a timestep for each flight phase:
 
 # run a couple hundred different timesteps in logspace between 0.001 and 0.1 to see how it changes to help pick a good timestep
 """apogees = []
@@ -31,4 +31,4 @@ plt.ylabel("Apogee (ft)")
 plt.title("Apogee vs Timestep")
 plt.show()"""
 
-# TODO add a test to verify that the simulation doesn't take too long to run
\ No newline at end of file
+# simulation run times are checked by the benchmarks in /benchmarks rather than here, see benchmarks/README.md
\ No newline at end of file
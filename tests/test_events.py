@@ -0,0 +1,75 @@
+import sys
+import os
+from copy import deepcopy
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim.events import event_function, dense_state, locate_event
+from rocketflightsim.flight_sim_coast import sim_coast
+from rocketflightsim.flight_sim_parachute import sim_parachute
+from rocketflightsim.flight_sim_airbrakes import sim_max_airbrakes_deployment_to_apogee
+from rocketflightsim.flight_stages_combined import flight_sim_ignition_to_apogee
+
+from .test_configs import past_flights, example_airbrakes_model
+
+def _ballistic_state(time, v_z_0 = 30, a_z = -9.81):
+    # exact state of a body thrown upwards from the ground at time 0
+    return (time, 2 * time, 0, v_z_0 * time + a_z * time**2 / 2, 2, 0, v_z_0 + a_z * time, 0, 0, a_z)
+
+class TestEvents(unittest.TestCase):
+    def test_locate_event(self):
+        print("\nTesting locating events within a step...")
+
+        # the dense output is exact for constant acceleration, so events are located exactly even in a single long step
+        state_1, state_2 = _ballistic_state(2), _ballistic_state(5)
+        apogee = locate_event(state_1, state_2, event_function('apogee'))
+        assert np.allclose(apogee, _ballistic_state(30 / 9.81))
+
+        crossing = locate_event(state_1, state_2, event_function('below_altitude', 40))
+        assert np.isclose(crossing[3], 40) and crossing[6] < 0
+        assert np.allclose(crossing, _ballistic_state(crossing[0]))
+
+        predicate = locate_event(state_1, state_2, event_function(lambda state: state[3] < 40))
+        assert np.allclose(predicate, crossing)
+
+        assert np.isclose(locate_event(state_1, state_2, event_function('after_delay', 1.5, 1))[0], 2.5)
+        assert dense_state(state_1, state_2, 1) == state_2
+
+        with self.assertRaises(ValueError):
+            event_function('sideways')
+
+    def test_stage_events_at_coarse_timesteps(self):
+        print("\nTesting stage event states at coarse timesteps...")
+
+        for past_flight in deepcopy(past_flights):
+            print(f'For rocket: {past_flight.name}')
+            rocket, environment = past_flight.rocket, past_flight.environment
+            checkpoints = []
+            flight_sim_ignition_to_apogee(rocket, environment, past_flight.launchpad, checkpoints = checkpoints)
+            burnout_state, apogee_state = checkpoints[2].state, checkpoints[3].state
+
+            # apogee is located within the last step
+            coarse_coast = sim_coast(rocket, environment, burnout_state, timestep = 0.2)
+            coarse_apogee = coarse_coast[-1]
+            print(f"\tApogee: {apogee_state[3]:.2f} m, {coarse_apogee[3]:.2f} m at a 0.2 s timestep")
+            assert abs(coarse_apogee[6]) < 1e-9
+            assert coarse_coast[-2][0] < coarse_apogee[0] <= coarse_coast[-2][0] + 0.2
+
+            airbrakes_apogee = sim_max_airbrakes_deployment_to_apogee(rocket, environment, example_airbrakes_model, burnout_state, timestep = 0.2)[-1]
+            assert abs(airbrakes_apogee[6]) < 1e-9 and len(airbrakes_apogee) == 11
+
+            # user-defined predicates stop on the same state as the equivalent stop condition
+            below = sim_coast(rocket, environment, apogee_state, stop_condition = 'below_altitude', stop_condition_value = 300, timestep = 0.1)
+            below_predicate = sim_coast(rocket, environment, apogee_state, stop_condition = lambda state: state[3] <= 300, timestep = 0.1)
+            assert np.isclose(below[-1][3], 300)
+            assert np.allclose(below[-1], below_predicate[-1])
+
+            landed = sim_parachute(rocket, environment, apogee_state, past_flight.parachute, timestep = 0.5)
+            below_predicate = sim_parachute(rocket, environment, apogee_state, past_flight.parachute, stop_condition = lambda state: state[3] < apogee_state[3] / 2, timestep = 0.5)
+            assert abs(landed[-1][3]) < 1e-9
+            assert np.isclose(below_predicate[-1][3], apogee_state[3] / 2)
+            delayed = sim_parachute(rocket, environment, apogee_state, past_flight.parachute, stop_condition = 'after_delay', stop_condition_value = 3.3, timestep = 0.5)
+            assert np.isclose(delayed[-1][0], apogee_state[0] + 3.3)
+            print()
@@ -0,0 +1,35 @@
+import sys
+import os
+from copy import deepcopy
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim.flight_stages_combined import flight_sim_ignition_to_landing
+
+from .test_configs import past_flights
+
+class TestTimestepSchedule(unittest.TestCase):
+    def test_timestep_schedule(self):
+        print("\nTesting timestep schedules in the combined flight functions...")
+
+        schedule = {'rail': 0.01, 'boost': 0.01, 'coast': 0.02, 'descent': 0.1}
+        for past_flight in deepcopy(past_flights):
+            print(f'For rocket: {past_flight.name}')
+            parachutes_and_conditions = [(past_flight.parachute, 'landed', None)]
+
+            flightpath_fine = flight_sim_ignition_to_landing(past_flight.rocket, past_flight.environment, past_flight.launchpad, parachutes_and_conditions, timestep = 0.005).to_numpy()
+            flightpath_scheduled = flight_sim_ignition_to_landing(past_flight.rocket, past_flight.environment, past_flight.launchpad, parachutes_and_conditions, timestep = schedule).to_numpy()
+
+            apogee_difference = flightpath_scheduled[:, 3].max() - flightpath_fine[:, 3].max()
+            landing_difference = np.hypot(*(flightpath_scheduled[-1, 1:3] - flightpath_fine[-1, 1:3]))
+            print(f"\tSteps: {len(flightpath_scheduled)} scheduled vs {len(flightpath_fine)} at 0.005 s\n\tApogee difference: {round(apogee_difference, 2)} m\n\tLanding point difference: {round(landing_difference, 2)} m\n")
+
+            assert len(flightpath_scheduled) < len(flightpath_fine) / 3
+            assert np.abs(apogee_difference) / flightpath_fine[:, 3].max() < 0.005
+
+    def test_timestep_schedule_unknown_phase(self):
+        past_flight = deepcopy(past_flights[0])
+        with self.assertRaises(ValueError):
+            flight_sim_ignition_to_landing(past_flight.rocket, past_flight.environment, past_flight.launchpad, [(past_flight.parachute, 'landed', None)], timestep = {'ascent': 0.01})
@@ -0,0 +1,88 @@
+import sys
+import os
+from copy import deepcopy
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim import helper_functions as hfunc
+from rocketflightsim.flight_stages_combined import flight_sim_ballistic_recovery
+from rocketflightsim.rocket_classes import Flightpath
+
+from .test_configs import past_flights
+
+class TestFlightpath(unittest.TestCase):
+    def test_derived_columns(self):
+        print("\nTesting derived columns of flightpaths...")
+
+        for past_flight in deepcopy(past_flights):
+            print(f'For rocket: {past_flight.name}')
+            rocket, environment = past_flight.rocket, past_flight.environment
+            flightpath = flight_sim_ballistic_recovery(rocket, environment, past_flight.launchpad)
+            states = list(flightpath)
+
+            assert len(flightpath) == len(states)
+            assert np.array_equal(flightpath['z'], [state[3] for state in states])
+
+            # compare to the scalar helper functions at a state after burnout
+            t, x, y, z, v_x, v_y, v_z, a_x, a_y, a_z = states[-100]
+            windspeed_x = environment.mean_wind_speed * np.sin(environment.wind_heading)
+            windspeed_y = environment.mean_wind_speed * np.cos(environment.wind_heading)
+            airspeed = np.sqrt((v_x - windspeed_x)**2 + (v_y - windspeed_y)**2 + v_z**2)
+            temp = hfunc.temp_at_altitude(z, environment.launchpad_temp, environment.local_T_lapse_rate)
+            air_density = hfunc.air_density_optimized(temp, environment.density_multiplier, environment.density_exponent)
+            Ma = hfunc.mach_number_fn(airspeed, temp)
+            q = hfunc.calculate_dynamic_pressure(air_density, airspeed)
+
+            assert np.isclose(flightpath.airspeed[-100], airspeed)
+            assert np.isclose(flightpath.temperature[-100], temp)
+            assert np.isclose(flightpath.mach_number[-100], Ma)
+            assert np.isclose(flightpath['q'][-100], q)
+            assert np.isclose(flightpath.drag_force[-100], q * rocket.Cd_A_rocket(Ma))
+            assert np.isclose(flightpath.angle_to_vertical[-100], np.arccos(v_z / airspeed))
+
+            # on the rail the rocket points along it and there's no wind
+            assert np.isclose(flightpath.angle_to_vertical[3], np.arccos(past_flight.launchpad.rail_unit_vector_z))
+            assert np.all((flightpath.compass_heading >= 0) & (flightpath.compass_heading < 2 * np.pi))
+            assert flightpath.mass[0] > rocket.dry_mass
+            assert np.isclose(flightpath.mass[-1], rocket.dry_mass)
+
+            # derived columns are computed once and then reused
+            assert flightpath.airspeed is flightpath['airspeed']
+            print()
+
+    def test_missing_configuration(self):
+        print("\nTesting derived columns that need a missing configuration...")
+
+        states = [(t, 0, 0, 100 * t, 0, 0, 100, 0, 0, 0) for t in np.linspace(0, 1, 11)]
+        flightpath = Flightpath(states)
+        assert np.allclose(flightpath.groundspeed, 100)
+        assert np.allclose(hfunc.angle_to_vertical(flightpath.v_x, flightpath.v_y, flightpath.v_z), 0)
+        assert np.allclose(flightpath.g_force, 0)
+        with self.assertRaises(ValueError):
+            flightpath.air_density
+        with self.assertRaises(KeyError):
+            flightpath['not_a_column']
+
+    def test_zero_copy_views(self):
+        print("\nTesting NumPy and pandas views of flightpaths...")
+
+        past_flight = deepcopy(past_flights[0])
+        flightpath = flight_sim_ballistic_recovery(past_flight.rocket, past_flight.environment, past_flight.launchpad)
+
+        # the combined flight functions start at liftoff
+        assert flightpath[0][1:] == (0,) * 9
+        assert isinstance(flightpath[-1], tuple)
+
+        states = flightpath.to_numpy()
+        assert states is flightpath.states
+        assert states.shape == (len(flightpath), 10)
+
+        dataframe = flightpath.to_pandas()
+        assert list(dataframe.columns) == ['time', 'x', 'y', 'z', 'v_x', 'v_y', 'v_z', 'a_x', 'a_y', 'a_z']
+        assert np.shares_memory(dataframe.to_numpy(), states)
+        assert dataframe['z'].max() == flightpath.z.max()
+
+        dataframe = flightpath.to_pandas(derived = ('airspeed', 'q'))
+        assert np.array_equal(dataframe['q'], flightpath.q)
@@ -0,0 +1,40 @@
+import sys
+import os
+import subprocess
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+import rocketflightsim
+
+repo_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+class TestLazyImports(unittest.TestCase):
+    def test_public_api(self):
+        print("\nTesting the top-level API...")
+
+        from rocketflightsim.flight_stages_combined import flight_sim_ignition_to_apogee
+        from rocketflightsim.classes.rocket import Rocket
+        assert rocketflightsim.flight_sim_ignition_to_apogee is flight_sim_ignition_to_apogee
+        assert rocketflightsim.Rocket is Rocket
+        assert rocketflightsim.constants.default_timestep > 0
+        for name in rocketflightsim.__all__:
+            getattr(rocketflightsim, name)
+        with self.assertRaises(AttributeError):
+            rocketflightsim.not_a_name
+
+    def test_no_heavy_imports(self):
+        print("\nTesting that importing the package doesn't import pandas or matplotlib...")
+
+        code = (
+            "import sys\n"
+            "import rocketflightsim\n"
+            "assert 'numpy' not in sys.modules\n"
+            "from rocketflightsim import flight_sim_ignition_to_landing, Rocket, Flightpath\n"
+            "import rocketflightsim.tools.plotting_functions\n"
+            "print(*[module for module in ('pandas', 'matplotlib') if module in sys.modules])\n"
+        )
+        result = subprocess.run([sys.executable, '-c', code], cwd = repo_dir, capture_output = True, text = True)
+        print(result.stderr)
+        assert result.returncode == 0
+        assert result.stdout.strip() == ''
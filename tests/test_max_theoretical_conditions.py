@@ -0,0 +1,67 @@
+import sys
+import os
+from copy import deepcopy
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim import constants as con
+from rocketflightsim.tools.max_theoretical_conditions import max_theoretical_speed, max_theoretical_apogee, max_theoretical_speed_batch, max_theoretical_apogee_batch
+
+from .test_configs import past_flights
+
+def stepped_burnout_conditions(rocket, F_gravity, timestep = 0.00005):
+    # reference: integrate the drag-free burn with small steps, as the tools used to
+    times = np.arange(0, rocket.motor.burn_time, timestep)
+    masses = rocket.dry_mass + np.interp(times, *zip(*sorted(rocket.motor.fuel_mass_curve.items())))
+    thrusts = np.interp(times, *zip(*sorted(rocket.motor.thrust_curve.items())))
+    accels = np.maximum(thrusts / masses - F_gravity, 0)
+    speeds = np.cumsum(accels) * timestep
+    return speeds[-1], np.sum(speeds) * timestep
+
+class TestMaxTheoreticalConditions(unittest.TestCase):
+    def test_closed_form_matches_stepped_integration(self):
+        print("\nTesting closed-form maximum theoretical speed and apogee...")
+
+        for past_flight in deepcopy(past_flights):
+            print(f'For rocket: {past_flight.name}')
+            F_gravity = past_flight.environment.local_gravity
+            v_burnout, z_burnout = stepped_burnout_conditions(past_flight.rocket, F_gravity)
+
+            max_speed = max_theoretical_speed(past_flight.rocket, past_flight.environment)
+            max_apogee = max_theoretical_apogee(past_flight.rocket, past_flight.environment)
+            print(f"Max speed: {max_speed:.3f} m/s (stepped {v_burnout:.3f} m/s)")
+            print(f"Max apogee: {max_apogee:.2f} m (stepped {z_burnout + v_burnout**2 / (2 * F_gravity):.2f} m)")
+
+            assert np.isclose(max_speed, v_burnout, rtol = 1e-4)
+            assert np.isclose(max_apogee, z_burnout + v_burnout**2 / (2 * F_gravity), rtol = 1e-4)
+            print()
+
+    def test_batch_matches_single(self):
+        print("\nTesting batch forms of the maximum theoretical conditions...")
+
+        flights = deepcopy(past_flights)
+        motors = [past_flight.rocket.motor for past_flight in flights]
+        dry_masses = [past_flight.rocket.dry_mass for past_flight in flights]
+        gravities = [past_flight.environment.local_gravity for past_flight in flights]
+
+        speeds = max_theoretical_speed_batch(motors, dry_masses, gravities)
+        apogees = max_theoretical_apogee_batch(motors, dry_masses, gravities)
+        for past_flight, speed, apogee in zip(flights, speeds, apogees):
+            assert np.isclose(speed, max_theoretical_speed(past_flight.rocket, past_flight.environment))
+            assert np.isclose(apogee, max_theoretical_apogee(past_flight.rocket, past_flight.environment))
+
+        # one motor across a sweep of airframe masses
+        rocket = flights[0].rocket
+        dry_masses = rocket.dry_mass * np.linspace(0.5, 2, 1000)
+        apogees = max_theoretical_apogee_batch(rocket.motor, dry_masses)
+        assert apogees.shape == (1000,)
+        assert np.all(np.diff(apogees) < 0) # heavier rockets don't go as high
+        assert np.isclose(apogees[0], max_theoretical_apogee_batch(rocket.motor, dry_masses[0], con.F_gravity)[0])
+
+        # the timestep of the old integrated forms is still accepted, with a warning
+        with self.assertWarns(DeprecationWarning):
+            assert max_theoretical_apogee(rocket, flights[0].environment, timestep = 0.001) == max_theoretical_apogee(rocket, flights[0].environment)
+        with self.assertWarns(DeprecationWarning):
+            assert max_theoretical_speed(rocket, flights[0].environment, 0.001) == max_theoretical_speed(rocket, flights[0].environment)
@@ -0,0 +1,124 @@
+import sys
+import os
+from copy import deepcopy
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim.flight_stages_combined import flight_sim_ignition_to_apogee
+from rocketflightsim.tools.monte_carlo_analysis import Dispersion, convergence_comparison, default_dispersions, draw_offsets, flight_rng, monte_carlo, perturbed_flight, sample_uniform
+
+from .test_configs import NDRT_2020_flight
+
+class TestMonteCarloAnalysis(unittest.TestCase):
+    def test_random_streams(self):
+        print("\nTesting per-flight random streams...")
+
+        # a flight's stream is the child SeedSequence.spawn() would make for it, without spawning the flights before it
+        children = np.random.SeedSequence(2024).spawn(10)
+        for i in (0, 3, 9):
+            assert np.array_equal(flight_rng(2024, i).random(5), np.random.default_rng(children[i]).random(5))
+        # and the streams of different flights and of the two streams within a flight differ
+        assert not np.array_equal(flight_rng(2024, 0, 0).random(5), flight_rng(2024, 1, 0).random(5))
+        assert not np.array_equal(flight_rng(2024, 0, 0).random(5), flight_rng(2024, 0, 1).random(5))
+
+        # offsets follow their distributions
+        u = np.linspace(0.0005, 0.9995, 1000)
+        assert np.allclose(Dispersion('uniform', 2).transform([0, 0.5, 1]), [-2, 0, 2])
+        assert abs(np.std(Dispersion('normal', 3).transform(u)) - 3) < 0.1
+        truncated = Dispersion('truncated_normal', 1, low = -0.5, high = 2).transform(u)
+        assert truncated.min() >= -0.5 and truncated.max() <= 2
+        with self.assertRaises(ValueError):
+            Dispersion('lognormal', 1)
+        with self.assertRaises(ValueError):
+            draw_offsets({'fin_count': Dispersion('normal', 1)}, 0, 0)
+
+    def test_perturbed_flight(self):
+        print("\nTesting perturbed flights...")
+
+        past_flight = deepcopy(NDRT_2020_flight)
+        rocket, environment, launchpad = past_flight.rocket, past_flight.environment, past_flight.launchpad
+        motor = rocket.motor
+
+        # no offsets give the nominal configurations
+        assert perturbed_flight(rocket, environment, launchpad, default_dispersions, {}) == (rocket, environment, launchpad)
+
+        offsets = {'total_impulse': 0.05, 'burn_time': -0.1, 'rocket_mass': 0.02, 'Cd_rocket': 0.1, 'launchpad_temp': 5, 'wind_heading': 30, 'launch_rail_elevation': -2}
+        new_rocket, new_environment, new_launchpad = perturbed_flight(rocket, environment, launchpad, default_dispersions, offsets)
+        assert np.isclose(new_rocket.motor.total_impulse, motor.total_impulse * 1.05)
+        assert np.isclose(new_rocket.motor.burn_time, motor.burn_time * 0.9)
+        assert np.isclose(new_rocket.motor.fuel_mass, motor.fuel_mass * 1.05)
+        assert np.isclose(new_rocket.rocket_mass, rocket.rocket_mass * 1.02)
+        assert np.isclose(new_rocket.Cd_rocket, rocket.Cd_rocket * 1.1)
+        assert np.isclose(new_environment.launchpad_temp, environment.launchpad_temp + 5)
+        assert np.isclose(new_environment.wind_heading, environment.wind_heading + np.deg2rad(30))
+        assert np.isclose(new_launchpad.launch_rail_elevation, launchpad.launch_rail_elevation - 2)
+        assert rocket.motor is motor and rocket.Cd_rocket == NDRT_2020_flight.rocket.Cd_rocket
+
+        # thrust noise changes the shape of the thrust curve but not its total impulse
+        noisy_rocket = perturbed_flight(rocket, environment, launchpad, default_dispersions, {'thrust_noise': 0.05}, flight_rng(0, 0, 1))[0]
+        assert not np.allclose(list(noisy_rocket.motor.thrust_curve.values()), list(motor.thrust_curve.values()))
+        assert np.isclose(noisy_rocket.motor.total_impulse, motor.total_impulse)
+
+    def test_monte_carlo(self):
+        print("\nTesting reproducible Monte Carlo studies...")
+
+        past_flight = deepcopy(NDRT_2020_flight)
+        rocket, environment, launchpad = past_flight.rocket, past_flight.environment, past_flight.launchpad
+
+        serial = monte_carlo(rocket, environment, launchpad, 8, root_seed = 42, timestep = 0.05, processes = 1)
+        parallel = monte_carlo(rocket, environment, launchpad, 8, root_seed = 42, timestep = 0.05, processes = 2)
+        # a study resumed after its first 5 flights
+        resumed = monte_carlo(rocket, environment, launchpad, 3, root_seed = 42, first_flight = 5, timestep = 0.05, processes = 2)
+
+        assert serial['parameters'] == tuple(default_dispersions)
+        assert np.array_equal(serial['flight_index'], np.arange(8))
+        # the inputs and results are bitwise identical however many processes ran the study and wherever it was resumed
+        assert serial['inputs'].tobytes() == parallel['inputs'].tobytes()
+        assert serial['apogee'].tobytes() == parallel['apogee'].tobytes()
+        assert serial['inputs'][5:].tobytes() == resumed['inputs'].tobytes()
+        assert serial['apogee'][5:].tobytes() == resumed['apogee'].tobytes()
+        # and a different root seed gives a different study
+        assert not np.array_equal(serial['inputs'], monte_carlo(rocket, environment, launchpad, 2, root_seed = 43, timestep = 0.05, processes = 1)['inputs'])
+
+        nominal_apogee = flight_sim_ignition_to_apogee(rocket, environment, launchpad, timestep = 0.05)[-1][3]
+        print(f"\tnominal apogee: {nominal_apogee:.1f} m, dispersed apogees: {serial['apogee'].round(1)}")
+        assert len(np.unique(serial['apogee'])) == 8
+        assert np.all(np.abs(serial['apogee'] - nominal_apogee) / nominal_apogee < 0.15)
+        assert np.all(np.isnan(serial['landing_x']))
+
+    def test_samplers(self):
+        print("\nTesting Sobol and Latin hypercube dispersion studies...")
+
+        past_flight = deepcopy(NDRT_2020_flight)
+        rocket, environment, launchpad = past_flight.rocket, past_flight.environment, past_flight.launchpad
+        dispersions = {name: default_dispersions[name] for name in ('total_impulse', 'rocket_mass', 'Cd_rocket', 'mean_wind_speed', 'launch_rail_elevation')}
+
+        # random sampling draws the same numbers as each flight's own stream
+        assert np.array_equal(sample_uniform('random', 3, 42, [4])[0], flight_rng(42, 4, 0).random(3))
+        with self.assertRaises(ValueError):
+            sample_uniform('halton', 3, 42, [0])
+        with self.assertRaises(ValueError):
+            sample_uniform('latin_hypercube', 3, 42, [0, 8], sample_size = 8)
+
+        for sampler in ('sobol', 'latin_hypercube'):
+            study = monte_carlo(rocket, environment, launchpad, 8, 42, dispersions, sampler = sampler, timestep = 0.05, processes = 2)
+            # each parameter has one flight in each eighth of its distribution
+            for j, dispersion in enumerate(dispersions.values()):
+                quantiles = np.array([np.searchsorted(dispersion.transform(np.linspace(0, 1, 9)[1:-1]), offset) for offset in study['inputs'][:, j]])
+                assert np.array_equal(np.sort(quantiles), np.arange(8)), sampler
+            # a study split in two parts matches the whole study
+            second_half = monte_carlo(rocket, environment, launchpad, 4, 42, dispersions, first_flight = 4, sampler = sampler, sample_size = 8, timestep = 0.05, processes = 1)
+            assert study['inputs'][4:].tobytes() == second_half['inputs'].tobytes()
+            assert study['apogee'][4:].tobytes() == second_half['apogee'].tobytes()
+
+        comparison = convergence_comparison(rocket, environment, launchpad, sample_sizes = (4, 8), num_repeats = 3, dispersions = dispersions, timestep = 0.1, processes = 2)
+        print(f"\tstandard errors of {comparison['statistics']}:")
+        for sampler in ('random', 'sobol', 'latin_hypercube'):
+            print(f"\t\t{sampler}: {comparison[sampler].round(2).tolist()}")
+            assert comparison[sampler].shape == (2, 5)
+            assert comparison['estimates'][sampler].shape == (3, 2, 5)
+        # the mean apogee of the quasi-random samples is far more consistent than that of random samples
+        assert comparison['sobol'][1, 0] < comparison['random'][1, 0]
+        assert comparison['latin_hypercube'][1, 0] < comparison['random'][1, 0]
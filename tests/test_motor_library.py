@@ -0,0 +1,122 @@
+import sys
+import os
+import tempfile
+import time
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim.tools.motor_library import MotorLibrary, parse_eng, parse_rse, impulse_class
+
+eng_file = """; Cesaroni 4895L1395 (made up points)
+; two motors in one file
+L1395 75 621 0 2.475 4.7 CTI
+0.02 100
+0.04 1400
+1.5 1500
+3.4 1350
+3.5 0
+J350W 38 337 6-10-14 0.3 0.6 Aerotech
+0.0 0.0
+0.1 400
+0.8 380
+1.5 300
+1.6 0.0
+"""
+
+rse_file = """<engine-database>
+  <engine-list>
+    <engine code="H128W" mfg="Aerotech" dia="29" len="194" initWt="206" propWt="94" delays="6,10,14">
+      <data>
+        <eng-data t="0" f="0" m="94"/>
+        <eng-data t="0.05" f="160" m="91"/>
+        <eng-data t="1.0" f="130" m="30"/>
+        <eng-data t="1.4" f="0" m="0"/>
+      </data>
+    </engine>
+  </engine-list>
+</engine-database>
+"""
+
+def _synthetic_eng(i):
+    # a motor with a smooth thrust curve of about 100 points
+    times = np.linspace(0.01, 1 + i % 5, 100)
+    thrusts = 200 * (1 + i % 13) * np.sin(np.pi * times / times[-1]) ** 0.3
+    thrusts[-1] = 0
+    lines = [f"M{i} {29 + i % 4 * 9} {300 + i} 0 {0.1 * (1 + i % 7):.2f} {0.3 * (1 + i % 7):.2f} Synthetic"]
+    lines += [f"{t:.4f} {f:.3f}" for t, f in zip(times, thrusts)]
+    return "\n".join(lines) + "\n"
+
+class TestMotorLibrary(unittest.TestCase):
+    def test_parse_motor_files(self):
+        print("\nTesting parsing motor files...")
+
+        motors = parse_eng(eng_file)
+        assert [motor['name'] for motor in motors] == ['L1395', 'J350W']
+        assert motors[0]['times'][0] == 0 and motors[0]['thrusts'][-1] == 0
+        assert motors[1]['manufacturer'] == 'Aerotech' and motors[1]['diameter'] == 38
+        assert np.isnan(motors[0]['masses']).all()
+
+        (motor,) = parse_rse(rse_file)
+        assert motor['name'] == 'H128W' and motor['propellant_mass'] == 0.094
+        assert np.allclose(motor['masses'], [0.094, 0.091, 0.03, 0])
+
+        assert [impulse_class(impulse) for impulse in (0.5, 2, 2.6, 160, 160.1, 640.1, 4895)] == ['1/4A', 'A', 'B', 'G', 'H', 'J', 'L']
+
+    def test_library_cache_and_queries(self):
+        print("\nTesting the motor library cache and queries...")
+
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'cti.eng'), 'w') as file:
+                file.write(eng_file)
+            with open(os.path.join(directory, 'aerotech.rse'), 'w') as file:
+                file.write(rse_file)
+            with open(os.path.join(directory, 'broken.eng'), 'w') as file:
+                file.write("not a motor\n")
+            os.makedirs(os.path.join(directory, 'synthetic'))
+            for i in range(1000):
+                with open(os.path.join(directory, 'synthetic', f'M{i}.eng'), 'w') as file:
+                    file.write(_synthetic_eng(i))
+
+            start_time = time.perf_counter()
+            library = MotorLibrary(directory)
+            cold_time = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            warm = MotorLibrary(directory)
+            warm_time = time.perf_counter() - start_time
+            print(f"{len(library)} motors: cold load {cold_time:.3f} s, warm load {warm_time:.3f} s")
+
+            assert len(library) == 1003 and list(library.errors) == ['broken.eng']
+            assert library.num_parsed == 1002 and warm.num_parsed == 0
+            assert warm_time < 0.5
+            for field in ('name', 'path', 'total_impulse', 'burn_time', 'impulse_class'):
+                assert np.array_equal(getattr(library, field), getattr(warm, field))
+
+            # loading from the cache gives the same motors as parsing the files
+            for name in ('L1395', 'H128W', 'M17'):
+                parsed, cached = library.motor(name), warm.motor(name)
+                assert parsed.thrust_curve == cached.thrust_curve and parsed.fuel_mass_curve == cached.fuel_mass_curve
+            h128 = warm.motor('h128w')
+            assert h128.fuel_mass == 0.094 and np.isclose(h128.dry_mass, 0.112)
+            assert h128.fuel_mass_curve[1.0] == 0.03
+
+            # queries
+            l_motors = warm.query(impulse_class = 'L')
+            assert 'L1395' in warm.name[l_motors]
+            assert all(warm.impulse_class[i] == 'L' for i in l_motors)
+            assert np.all(np.diff(warm.total_impulse[l_motors]) >= 0)
+            matches = warm.query(diameter = 38, min_total_impulse = 400, max_burn_time = 3)
+            assert all(abs(warm.diameter[i] - 38) <= 0.5 and warm.total_impulse[i] >= 400 and warm.burn_time[i] <= 3 for i in matches)
+            assert len(matches) == np.sum((np.abs(warm.diameter - 38) <= 0.5) & (warm.total_impulse >= 400) & (warm.burn_time <= 3))
+            assert list(warm.name[warm.query(manufacturer = 'aero')]) == ['H128W', 'J350W']
+            print(warm.summary(warm.query(impulse_class = ('H', 'J'), manufacturer = 'aero')))
+
+            # editing a file invalidates its entries
+            with open(os.path.join(directory, 'cti.eng'), 'w') as file:
+                file.write(eng_file.replace('L1395', 'L1396'))
+            os.remove(os.path.join(directory, 'synthetic', 'M0.eng'))
+            edited = MotorLibrary(directory)
+            assert edited.num_parsed == 1
+            assert 'L1396' in edited.name and 'L1395' not in edited.name and 'M0' not in edited.name
+            assert len(MotorLibrary(directory)) == len(edited) == 1002
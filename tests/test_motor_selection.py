@@ -0,0 +1,55 @@
+import sys
+import os
+from copy import deepcopy
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim.classes.motor import Motor
+from rocketflightsim.classes.rocket import Rocket
+from rocketflightsim.flight_stages_combined import flight_sim_ignition_to_apogee
+from rocketflightsim.tools.motor_selection import evaluate_motors, rank_motors, select_motors, selection_report
+
+from .test_configs import past_flights
+
+class TestMotorSelection(unittest.TestCase):
+    def test_select_motors(self):
+        print("\nTesting motor selection for an airframe...")
+
+        flights = deepcopy(past_flights)
+        past_flight = flights[0]
+        airframe = Rocket(past_flight.rocket.rocket_mass, None, past_flight.rocket.A_rocket, past_flight.rocket.Cd_rocket, past_flight.rocket.h_second_rail_button)
+        assert airframe.dry_mass == airframe.rocket_mass
+        motors = {flight.name: flight.rocket.motor for flight in flights}
+        motors['too weak'] = Motor({0: 0, 0.1: 50, 2: 50, 2.1: 0}, 0.5, fuel_mass = 0.2)
+        environments = [past_flight.environment, flights[1].environment]
+
+        target_apogee = 1000
+        results = evaluate_motors(airframe, motors, environments, past_flight.launchpad, target_apogee = target_apogee, processes = 2)
+        statuses = {result['name']: result['status'] for result in results}
+        print(statuses)
+        assert statuses['too weak'] == 'pruned'
+
+        for result in results:
+            if result['status'] == 'pruned' and result['reason'].startswith('drag-free'):
+                assert result['max_theoretical_apogee'].max() < target_apogee
+            if result['status'] == 'evaluated':
+                # the drag-free bound is above the simulated apogee, and the simulation matches the combined flight function
+                assert np.all(result['apogee'] <= result['max_theoretical_apogee'])
+                apogee = flight_sim_ignition_to_apogee(airframe.with_motor(result['motor']), environments[1], past_flight.launchpad)[-1][3]
+                assert np.isclose(result['apogee'][1], apogee)
+                assert len(result['rail_exit_velocity']) == 2 and result['max_acceleration'] > 0
+
+        ranked = rank_motors(results)
+        print(selection_report(ranked))
+        assert [result['target_error'] for result in ranked] == sorted(result['target_error'] for result in ranked)
+        by_apogee = rank_motors(results, by = 'apogee')
+        assert by_apogee[0]['mean_apogee'] == max(result['mean_apogee'] for result in ranked)
+        assert rank_motors(results, by = 'max_acceleration')[0]['max_acceleration'] == min(result['max_acceleration'] for result in ranked)
+
+        # serial and parallel evaluations agree
+        serial = select_motors(airframe, motors, environments, past_flight.launchpad, target_apogee = target_apogee, processes = 1)
+        assert [result['name'] for result in serial] == [result['name'] for result in ranked]
+        with self.assertRaises(ValueError):
+            rank_motors(results, by = 'price')
@@ -0,0 +1,56 @@
+import sys
+import os
+from copy import deepcopy
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim.classes.motor import Motor
+from rocketflightsim.tools.motor_simplification import simplification_report
+
+from .test_configs import past_flights
+
+class TestMotorSimplification(unittest.TestCase):
+    def test_simplify_within_tolerances(self):
+        print("\nTesting thrust curve simplification...")
+
+        for past_flight in deepcopy(past_flights):
+            print(f'For rocket: {past_flight.name}')
+            motor = past_flight.rocket.motor
+            report = simplification_report(motor, past_flight.rocket, past_flight.environment, past_flight.launchpad, impulse_tolerance = 0.002)
+            simplified = report['motor']
+            print(f"\tPoints: {report['points'][0]} -> {report['points'][1]}\n\tTotal impulse error: {report['total_impulse_error'] * 100:.3f}%\n\tApogee change: {report['apogee_change']:.2f} m of {report['apogee']:.1f} m\n\tRun time: {report['wall_time'][0] * 1000:.1f} ms -> {report['wall_time'][1] * 1000:.1f} ms\n")
+
+            assert report['points'][1] <= report['points'][0]
+            assert abs(report['total_impulse_error']) <= 0.002
+            assert report['burn_time_error'] == 0 and report['peak_thrust_error'] == 0
+            assert abs(report['apogee_change']) < 0.005 * report['apogee']
+
+            # the curves stay at the same times, and the simplified fuel mass curve is within tolerance of the original at every original time
+            assert list(simplified.thrust_curve) == list(simplified.fuel_mass_curve)
+            original_times, original_masses = np.array(list(motor.fuel_mass_curve)), np.array(list(motor.fuel_mass_curve.values()))
+            simplified_masses = np.interp(original_times, list(simplified.fuel_mass_curve), list(simplified.fuel_mass_curve.values()))
+            assert np.max(np.abs(simplified_masses - original_masses)) <= 0.001 * motor.fuel_mass * (1 + 1e-9)
+
+            # and so is the thrust curve when there's a thrust tolerance
+            limited = motor.simplify(impulse_tolerance = 0.002, thrust_tolerance = 5)
+            original_times, original_thrusts = np.array(list(motor.thrust_curve)), np.array(list(motor.thrust_curve.values()))
+            simplified_thrusts = np.interp(original_times, list(limited.thrust_curve), list(limited.thrust_curve.values()))
+            assert np.max(np.abs(simplified_thrusts - original_thrusts)) <= 5 * (1 + 1e-9)
+
+            # simplified motors are cached on the original
+            assert motor.simplify(impulse_tolerance = 0.002) is simplified
+            assert simplified.original is motor
+
+        dense = deepcopy(past_flights[2].rocket.motor)
+        assert len(dense.simplify(impulse_tolerance = 0.005).thrust_curve) < len(dense.thrust_curve) / 4
+
+    def test_simplify_straight_lines(self):
+        print("\nTesting simplification of straight lines...")
+
+        motor = Motor({0: 0, 0.1: 100, 0.5: 100, 1: 100, 1.5: 100, 2: 50, 3: 0}, 1, fuel_mass = 2)
+        simplified = motor.simplify(impulse_tolerance = 1e-9, fuel_mass_tolerance = 1e-9)
+        # only the points on the flat part of the curve are removed. The one at 2 s isn't on the line from 1.5 s to burnout
+        assert list(simplified.thrust_curve) == [0, 0.1, 1.5, 2, 3]
+        assert abs(simplified.total_impulse - motor.total_impulse) < 1e-9
@@ -0,0 +1,91 @@
+import sys
+import os
+import pickle
+from copy import deepcopy
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim.parallel import run_in_parallel, SharedTables, share_tables, attach_tables, detach_blocks
+from rocketflightsim.serialization import rocket_to_dict, rocket_from_dict
+
+from .test_configs import Juno3_flight
+
+def _sum_table(shared, handle):
+    array = handle.array
+    # a view of the shared memory, not a copy
+    return float(array.sum()), array.flags.owndata, array.flags.writeable
+
+def _attached_after_detaching(shared, handle):
+    from rocketflightsim import parallel
+    total = float(handle.array.sum())
+    attached = handle.name in parallel._attached_blocks
+    # with 'fork', the worker also closes the blocks it inherited from the process that created them
+    closed = detach_blocks()
+    return total, attached, closed >= 1, handle.name in parallel._attached_blocks
+
+def _dry_mass_and_impulse(shared, config):
+    rocket = rocket_from_dict(attach_tables(config))
+    return rocket.dry_mass, rocket.motor.total_impulse
+
+class TestParallel(unittest.TestCase):
+    def test_shared_tables(self):
+        print("\nTesting shared memory tables...")
+
+        rocket = deepcopy(Juno3_flight.rocket)
+        rocket.Cd_rocket = 0.4
+        config = rocket_to_dict(rocket)
+
+        with SharedTables() as tables:
+            table = np.arange(10000, dtype = float)
+            handle = tables.share(table)
+            # the same content is shared once
+            assert tables.share(table.copy()) is handle and len(tables) == 1
+            assert len(pickle.dumps(handle)) < 200
+            results = list(run_in_parallel(_sum_table, [handle] * 4, processes = 2))
+            assert results == [(table.sum(), False, False)] * 4
+
+            # configurations with shared curves pickle to a fraction of their size and rebuild the same rocket
+            shared_config = share_tables(config, tables)
+            print(f"\tpickled rocket configuration: {len(pickle.dumps(config))} bytes, {len(pickle.dumps(shared_config))} bytes with shared curves")
+            assert len(pickle.dumps(shared_config)) < len(pickle.dumps(config)) / 10
+            results = list(run_in_parallel(_dry_mass_and_impulse, [shared_config] * 4, processes = 2))
+            assert results == [(rocket.dry_mass, rocket.motor.total_impulse)] * 4
+            name = handle.name
+
+        # the shared memory is freed
+        from multiprocessing import shared_memory
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name = name)
+
+    def test_bounded_shared_tables(self):
+        print("\nTesting freeing shared memory tables that aren't in use...")
+        from multiprocessing import shared_memory
+
+        tables = SharedTables(max_bytes = 2 * 8000)
+        try:
+            configs = [share_tables({'table': list(np.full(1000, i, dtype = float))}, tables) for i in range(4)]
+            # tables still in use are kept whatever their size
+            assert len(tables) == 4 and tables.nbytes == 4 * 8000
+            names = [config['table'].name for config in configs]
+            for config in configs[:3]:
+                tables.release(config)
+            # the least recently shared tables no longer in use are freed until the store is within its size
+            assert len(tables) == 2 and tables.nbytes == 2 * 8000
+            for name in names[:2]:
+                with self.assertRaises(FileNotFoundError):
+                    shared_memory.SharedMemory(name = name)
+            assert configs[2]['table'].array[0] == 2 and configs[3]['table'].array[0] == 3
+
+            # sharing a freed table again makes a new block for it
+            again = share_tables({'table': list(np.zeros(1000))}, tables)
+            assert again['table'].name not in names and again['table'].array.sum() == 0
+
+            # workers stop mapping the blocks they attached to when they detach, but not the ones they created
+            results = list(run_in_parallel(_attached_after_detaching, [configs[3]['table']] * 2, processes = 2, chunksize = 1))
+            assert results == [(3000, True, True, False)] * 2
+            assert detach_blocks() == 0 and configs[3]['table'].array[0] == 3
+        finally:
+            tables.close()
+        assert len(tables) == 0 and tables.nbytes == 0
@@ -0,0 +1,69 @@
+import sys
+import os
+import weakref
+from copy import deepcopy
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from rocketflightsim.flight_stages_combined import flight_sim_ballistic_recovery
+from rocketflightsim.tools.plotting_functions import lttb_indices, minmax_indices, plot_trajectory_ensemble, plot_trajectory_envelope, trajectory_percentiles
+
+from .test_configs import past_flights
+
+class TestTrajectoryEnsemblePlots(unittest.TestCase):
+    def test_downsampling_keeps_extremes(self):
+        print("\nTesting trajectory downsampling...")
+
+        past_flight = deepcopy(past_flights[0])
+        states = flight_sim_ballistic_recovery(past_flight.rocket, past_flight.environment, past_flight.launchpad).to_numpy()
+        time, z = states[:, 0], states[:, 3]
+
+        for indices in (lttb_indices(time, z, 100), minmax_indices(z, 50)):
+            print(f"Kept {len(indices)} of {len(z)} points")
+            assert len(indices) <= 102
+            assert indices[0] == 0 and indices[-1] == len(z) - 1
+            assert np.all(np.diff(indices) > 0)
+            assert abs(z[indices].max() - z.max()) < 1 # apogee survives
+
+        # min/max keeps every bucket's extremes exactly
+        assert z.argmax() in minmax_indices(z, 50)
+
+    def test_ensemble_plots(self):
+        print("\nTesting plotting of a trajectory ensemble...")
+
+        time = np.linspace(0, 10, 2000)
+        trajectories = [np.column_stack((time, *np.zeros((2, time.size)), scale * np.sin(time), *np.zeros((6, time.size)))) for scale in np.linspace(1, 2, 200)]
+
+        fig, ax = plt.subplots()
+        lines = plot_trajectory_ensemble(iter(trajectories), ax=ax, num_points=200)
+        assert len(lines.get_segments()) == 200
+        assert all(len(segment) <= 202 for segment in lines.get_segments())
+
+        grid, values = trajectory_percentiles(trajectories, percentiles=(0, 50, 100), num_points=100)
+        assert np.allclose(values[2], np.maximum(np.sin(grid), 2 * np.sin(grid)))
+        assert np.allclose(values[0], np.minimum(np.sin(grid), 2 * np.sin(grid)))
+
+        # trajectories streamed from a generator give the same percentiles, and each is dropped before the next is made
+        made = []
+        def stream():
+            for scale in np.linspace(1, 2, 200):
+                assert all(reference() is None for reference in made)
+                trajectory = np.column_stack((time, *np.zeros((2, time.size)), scale * np.sin(time), *np.zeros((6, time.size))))
+                made.append(weakref.ref(trajectory))
+                yield trajectory
+                del trajectory
+        streamed_grid, streamed_values = trajectory_percentiles(stream(), percentiles=(0, 50, 100), num_points=100, x_range=(0, 10))
+        assert len(made) == 200
+        assert np.allclose(streamed_grid, grid) and np.allclose(streamed_values, values)
+        with self.assertRaises(ValueError):
+            trajectory_percentiles(iter(trajectories))
+
+        plot_trajectory_envelope(trajectories, ax=ax)
+        plot_trajectory_envelope(iter(trajectories), ax=ax, x_range=(0, 10))
+        plt.close(fig)
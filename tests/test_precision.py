@@ -0,0 +1,50 @@
+import sys
+import os
+from copy import deepcopy
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim.precision import cast_config, cast_state
+from rocketflightsim.flight_sim_coast import sim_coast
+from rocketflightsim.flight_stages_combined import flight_sim_ignition_to_apogee
+from rocketflightsim.tools.precision_validation import validate_precision, precision_report
+
+from .test_configs import past_flights
+
+class TestPrecision(unittest.TestCase):
+    def test_float32_errors(self):
+        print("\nTesting single precision simulations against double precision...")
+
+        configurations = [(past_flight.name, past_flight.rocket, past_flight.environment, past_flight.launchpad, [(past_flight.parachute, 'landed', None)]) for past_flight in deepcopy(past_flights)]
+        results = validate_precision(configurations)
+        print(precision_report(results))
+
+        for name, by_precision in results.items():
+            assert by_precision['float64']['apogee_error'] == 0
+            # within a few mm on apogee and 0.1 m on landing
+            assert by_precision['float32']['apogee_error'] < 0.005
+            assert by_precision['float32']['max_speed_error'] < 0.001
+            assert by_precision['float32']['landing_error'] < 0.2
+            assert by_precision['float32']['memory'] < 0.55 * by_precision['float64']['memory']
+
+    def test_stages_stay_in_float32(self):
+        print("\nTesting that stages run in the precision of their inputs...")
+
+        past_flight = deepcopy(past_flights[0])
+        rocket = cast_config(past_flight.rocket, 'float32')
+        environment = cast_config(past_flight.environment, 'float32')
+        assert isinstance(rocket.motor.burn_time, np.float32)
+        assert isinstance(rocket.Cd_A_rocket(0.3), np.float32)
+        # the original configuration is left alone
+        assert not isinstance(past_flight.rocket.dry_mass, np.float32)
+
+        burnout_state = flight_sim_ignition_to_apogee(past_flight.rocket, past_flight.environment, past_flight.launchpad)[-1]
+        coast = sim_coast(rocket, environment, cast_state(burnout_state, 'float32'), stop_condition = 'impact')
+        assert all(isinstance(value, np.float32) for value in coast[-1])
+
+        flightpath = flight_sim_ignition_to_apogee(past_flight.rocket, past_flight.environment, past_flight.launchpad, storage_precision = 'float32')
+        assert flightpath.to_numpy().dtype == np.float32
+        with self.assertRaises(ValueError):
+            flight_sim_ignition_to_apogee(past_flight.rocket, past_flight.environment, past_flight.launchpad, precision = 'float16')
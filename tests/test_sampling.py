@@ -0,0 +1,47 @@
+import sys
+import os
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim.tools.sampling import latin_hypercube_points, max_sobol_dimensions, sobol_points
+
+class TestSampling(unittest.TestCase):
+    def test_sobol_points(self):
+        print("\nTesting Sobol sequences...")
+
+        # the unscrambled sequence starts as usual
+        expected = [[0, 0, 0], [0.5, 0.5, 0.5], [0.75, 0.25, 0.25], [0.25, 0.75, 0.75], [0.375, 0.375, 0.625], [0.875, 0.875, 0.125], [0.625, 0.125, 0.875], [0.125, 0.625, 0.375]]
+        assert np.allclose(sobol_points(3, np.arange(8), scramble = False), expected, atol = 1e-9)
+
+        points = sobol_points(max_sobol_dimensions, np.arange(256), seed = 7)
+        assert np.all((points > 0) & (points < 1))
+        # scrambling keeps one point in each of 256 intervals of every dimension
+        for j in range(max_sobol_dimensions):
+            assert np.array_equal(np.sort(np.floor(points[:, j] * 256)), np.arange(256))
+        # and one point in each of the 16 x 16 cells of the first two dimensions
+        assert len(np.unique(np.floor(points[:, 0] * 16) * 16 + np.floor(points[:, 1] * 16))) == 256
+
+        # points depend only on their index and the seed
+        assert np.array_equal(sobol_points(5, [3, 200, 17], seed = 7), points[[3, 200, 17], :5])
+        assert not np.array_equal(sobol_points(5, np.arange(8), seed = 8), points[:8, :5])
+
+        # the mean of a smooth function is estimated far more accurately than from random points
+        def integrand(x):
+            return np.prod(1 + (x - 0.5), axis = 1)
+        sobol_error = abs(integrand(points[:, :10]).mean() - 1)
+        random_error = np.sqrt(np.mean([(integrand(np.random.default_rng(seed).random((256, 10))).mean() - 1)**2 for seed in range(20)]))
+        print(f"\tSobol error: {sobol_error:.2e}, random error: {random_error:.2e}")
+        assert sobol_error < random_error / 3
+
+        with self.assertRaises(ValueError):
+            sobol_points(max_sobol_dimensions + 1, [0])
+
+    def test_latin_hypercube_points(self):
+        print("\nTesting Latin hypercube samples...")
+
+        points = latin_hypercube_points(4, 50, seed = 1)
+        for j in range(4):
+            assert np.array_equal(np.sort(np.floor(points[:, j] * 50)), np.arange(50))
+        assert np.array_equal(latin_hypercube_points(4, 50, [10, 2], seed = 1), points[[10, 2]])
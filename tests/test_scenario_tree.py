@@ -0,0 +1,67 @@
+import sys
+import os
+from copy import deepcopy
+from time import perf_counter
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim.classes.airbrakes import Airbrakes
+from rocketflightsim.classes.parachute import Parachute
+from rocketflightsim.flight_stages_combined import flight_sim_ignition_to_apogee, flight_sim_ignition_to_landing, flight_sim_ballistic_recovery
+from rocketflightsim.tools.scenario_tree import run_scenario_tree, run_variants_independently
+
+from .test_configs import past_flights
+
+class TestScenarioTree(unittest.TestCase):
+    def test_scenario_tree_matches_independent_flights(self):
+        print("\nTesting scenario tree against simulating each variant independently...")
+
+        past_flight = deepcopy(past_flights[0])
+        rocket, environment, launchpad = past_flight.rocket, past_flight.environment, past_flight.launchpad
+        main = past_flight.parachute
+        drogue = Parachute(main.Cd, main.area / 4)
+        brakes = [Airbrakes(num_flaps = 3, A_flap = 0.004, Cd_brakes = Cd_brakes, max_deployment_angle = 45, max_deployment_rate = 5, max_retraction_rate = 10) for Cd_brakes in (0.8, 1.2)]
+        descents = [None, 'ballistic', [(main, 'landed', None)], [(drogue, 'below_altitude', 300), (main, 'landed', None)], [(drogue, 'below_altitude', 300), (drogue, 'landed', None)]]
+
+        variants = [{'descent': descent} for descent in descents]
+        variants += [{'airbrakes': airbrakes, 'deployment_delay': delay, 'descent': descent} for airbrakes in brakes for delay in (0, 1.5) for descent in descents]
+        variants.append({'airbrakes': brakes[0], 'deployment_function': lambda time: min(time * 0.05, 0.5), 'descent': 'ballistic'})
+        variants.append({'airbrakes': brakes[0], 'deployment_function': lambda height: 0.3 if height > 1000 else 0, 'deployment_variable': 'height'})
+
+        start_time = perf_counter()
+        shared = run_scenario_tree(rocket, environment, launchpad, variants)
+        shared_time = perf_counter() - start_time
+        start_time = perf_counter()
+        independent = run_variants_independently(rocket, environment, launchpad, variants)
+        independent_time = perf_counter() - start_time
+        print(f"{len(variants)} variants: {shared_time:.3f} s as a scenario tree, {independent_time:.3f} s independently")
+
+        for flightpath, reference in zip(shared, independent):
+            assert np.array_equal(flightpath.to_numpy(), reference.to_numpy())
+
+        # without airbrakes, the variants are the same flights as the combined flight functions simulate
+        assert np.array_equal(shared[0].to_numpy(), flight_sim_ignition_to_apogee(rocket, environment, launchpad).to_numpy())
+        assert np.array_equal(shared[1].to_numpy(), flight_sim_ballistic_recovery(rocket, environment, launchpad).to_numpy())
+        assert np.array_equal(shared[3].to_numpy(), flight_sim_ignition_to_landing(rocket, environment, launchpad, descents[3]).to_numpy())
+
+        # airbrakes lower the apogee, more so the earlier they deploy
+        apogees = [flightpath.to_numpy()[:, 3].max() for flightpath in shared]
+        assert apogees[5] < apogees[10] < apogees[0]
+        assert apogees[15] < apogees[5]
+
+        # variants that share their whole flight share its flightpath
+        no_descent = run_scenario_tree(rocket, environment, launchpad, [{}, {'descent': []}])
+        assert no_descent[0] is no_descent[1]
+        twins = run_scenario_tree(rocket, environment, launchpad, [{'airbrakes': brakes[0], 'descent': 'ballistic'}, {'airbrakes': brakes[0], 'descent': 'ballistic'}])
+        assert twins[0] is twins[1]
+
+    def test_scenario_tree_invalid_variants(self):
+        print("\nTesting scenario tree with invalid variants...")
+
+        past_flight = deepcopy(past_flights[0])
+        brakes = Airbrakes(num_flaps = 3, A_flap = 0.004, Cd_brakes = 1, max_deployment_angle = 45, max_deployment_rate = 5, max_retraction_rate = 10)
+        for variant in ({'parachute': past_flight.parachute}, {'airbrakes': brakes, 'deployment_variable': 'speed'}, {'airbrakes': brakes, 'deployment_delay': -1}, {'airbrakes': brakes, 'deployment_delay': 100}):
+            with self.assertRaises(ValueError):
+                run_scenario_tree(past_flight.rocket, past_flight.environment, past_flight.launchpad, [variant])
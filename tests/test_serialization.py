@@ -0,0 +1,73 @@
+import sys
+import os
+import pickle
+import multiprocessing as mp
+from copy import deepcopy
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim.classes.drag_curve import DragCurve
+from rocketflightsim.classes.airbrakes import Airbrakes
+from rocketflightsim.classes.rocket import Rocket
+from rocketflightsim.flight_stages_combined import flight_sim_ignition_to_apogee
+from rocketflightsim.serialization import to_dict, from_dict, to_json, from_json, to_bytes, from_bytes, format_version
+
+from .test_configs import past_flights, Juno3_flight
+
+class TestSerialization(unittest.TestCase):
+    def test_pickle(self):
+        print("\nTesting pickling of configurations...")
+
+        for past_flight in deepcopy(past_flights):
+            configs = (past_flight.rocket, past_flight.environment, past_flight.launchpad)
+            rocket, environment, launchpad = pickle.loads(pickle.dumps(configs))
+            apogee = flight_sim_ignition_to_apogee(*configs)[-1][3]
+            assert flight_sim_ignition_to_apogee(rocket, environment, launchpad)[-1][3] == apogee
+            print(f"\t{past_flight.name}: {len(pickle.dumps(configs))} bytes pickled")
+
+        # the cache of simplified motors isn't sent along with a motor
+        motor = deepcopy(past_flights[0].rocket.motor)
+        motor.simplify()
+        assert len(motor.simplified_motors) == 1 and pickle.loads(pickle.dumps(motor)).simplified_motors == {}
+
+    def test_spawned_workers(self):
+        print("\nTesting a flight in a spawned worker process...")
+
+        # spawned workers (the only kind on Windows) get everything by pickling
+        past_flight = deepcopy(past_flights[0])
+        past_flight.rocket.Cd_rocket = DragCurve([0, 0.5, 1], [0.4, 0.45, 0.6])
+        configs = (past_flight.rocket, past_flight.environment, past_flight.launchpad)
+        with mp.get_context('spawn').Pool(1) as pool:
+            flightpath = pool.apply(flight_sim_ignition_to_apogee, configs)
+        assert np.array_equal(flightpath.to_numpy(), flight_sim_ignition_to_apogee(*configs).to_numpy())
+
+    def test_round_trip(self):
+        print("\nTesting conversion of configurations to dictionaries, JSON, and bytes...")
+
+        past_flight = deepcopy(Juno3_flight)
+        juno = past_flight.rocket
+        past_flight.rocket = Rocket(juno.rocket_mass, juno.motor, juno.A_rocket, DragCurve.from_function(juno.Cd_rocket), juno.h_second_rail_button)
+        configs = [past_flight.rocket, past_flight.rocket.motor, past_flight.rocket.Cd_rocket, past_flight.environment, past_flight.launchpad, past_flight.parachute, Airbrakes(4, 0.004, 1, 45, 5.5, 10)]
+        for config in configs:
+            for convert, unconvert in ((to_dict, from_dict), (to_json, from_json), (to_bytes, from_bytes)):
+                copy = unconvert(convert(config))
+                assert type(copy) is type(config)
+                assert to_dict(copy) == to_dict(config)
+            print(f"\t{type(config).__name__}: {len(to_json(config))} bytes of JSON, {len(to_bytes(config))} bytes in binary")
+
+        rocket, environment, launchpad = (from_bytes(to_bytes(config)) for config in (past_flight.rocket, past_flight.environment, past_flight.launchpad))
+        assert np.array_equal(flight_sim_ignition_to_apogee(rocket, environment, launchpad).to_numpy(), flight_sim_ignition_to_apogee(past_flight.rocket, past_flight.environment, past_flight.launchpad).to_numpy())
+
+        # drag curves interpolate linearly, for single Mach numbers and arrays
+        drag_curve = DragCurve([0, 0.5, 1], [0.4, 0.45, 0.6])
+        Ma = np.linspace(-0.5, 1.5, 41)
+        assert np.allclose([drag_curve(m) for m in Ma], np.interp(Ma, drag_curve.mach, drag_curve.Cd))
+        assert np.allclose(drag_curve(Ma), np.interp(Ma, drag_curve.mach, drag_curve.Cd))
+
+        # functions can't be serialized, and dictionaries from newer versions are rejected
+        with self.assertRaises(ValueError):
+            to_dict(deepcopy(Juno3_flight.rocket))
+        with self.assertRaises(ValueError):
+            from_dict(dict(to_dict(launchpad), version = format_version + 1))
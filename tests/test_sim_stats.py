@@ -0,0 +1,56 @@
+import sys
+import os
+from copy import deepcopy
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim.classes.sim_stats import SimStats
+from rocketflightsim.flight_stages_combined import flight_sim_ignition_to_landing, flight_sim_ballistic_recovery
+
+from .test_configs import past_flights
+
+class TestSimStats(unittest.TestCase):
+    def test_sim_stats_ignition_to_landing(self):
+        print("\nTesting simulation statistics collection...")
+
+        for past_flight in deepcopy(past_flights):
+            print(f'For rocket: {past_flight.name}')
+
+            events = []
+            stats = SimStats(callbacks = [lambda event, state: events.append((event, state[0]))])
+            parachutes_and_conditions = [(past_flight.parachute, 'landed', None)]
+
+            flightpath = flight_sim_ignition_to_landing(past_flight.rocket, past_flight.environment, past_flight.launchpad, parachutes_and_conditions, stats = stats)
+            flightpath_no_stats = flight_sim_ignition_to_landing(past_flight.rocket, past_flight.environment, past_flight.launchpad, parachutes_and_conditions)
+
+            print(stats.summary())
+
+            # collecting statistics doesn't change the simulation
+            assert np.array_equal(flightpath.to_numpy(), flightpath_no_stats.to_numpy())
+
+            assert [event for event, _ in events] == ['liftoff', 'rail_clearance', 'burnout', 'apogee', 'parachute_stop']
+            assert all(t_1 <= t_2 for (_, t_1), (_, t_2) in zip(events, events[1:]))
+
+            # every simulated state after liftoff came from a recorded step
+            assert stats.steps == len(flightpath) - 1
+            assert stats.num_flights == 1
+            assert stats.stages['boost']['motor_calls'] == 2 * stats.stages['boost']['steps']
+            assert stats.stages['coast']['motor_calls'] == 0
+            assert stats.peak_trajectory_memory > 0
+            print()
+
+    def test_sim_stats_accumulate_over_batch(self):
+        print("\nTesting simulation statistics over a batch of flights...")
+
+        stats = SimStats()
+        past_flight = deepcopy(past_flights[0])
+        for _ in range(3):
+            flight_sim_ballistic_recovery(past_flight.rocket, past_flight.environment, past_flight.launchpad, stats = stats)
+
+        print(stats.summary())
+        assert stats.num_flights == 3
+        assert stats.stages['coast']['calls'] == 6 # up to apogee and then down to impact
+        assert stats.stages['ignition_to_liftoff']['steps'] == 0
+        assert stats.wall_time > 0
@@ -0,0 +1,136 @@
+import sys
+import os
+import json
+import threading
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim.flight_stages_combined import flight_sim_ignition_to_apogee, flight_sim_ignition_to_landing
+from rocketflightsim.serialization import rocket_to_dict, rocket_from_dict, environment_to_dict, environment_from_dict, launchpad_to_dict, launchpad_from_dict, parachute_to_dict, config_key
+from rocketflightsim.classes.drag_curve import DragCurve
+from rocketflightsim.tools.simulation_service import SimulationService, make_server
+
+from .test_configs import past_flights, NDRT_2020_flight, Juno3_flight
+
+def _post(url, body):
+    request = urllib.request.Request(url, data = json.dumps(body).encode(), headers = {'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+class TestSerialization(unittest.TestCase):
+    def test_round_trip(self):
+        print("\nTesting conversion of configurations to and from dictionaries...")
+
+        for past_flight in deepcopy(past_flights):
+            if callable(past_flight.rocket.Cd_rocket):
+                # only drag tables can be converted, not arbitrary functions
+                with self.assertRaises(ValueError):
+                    rocket_to_dict(past_flight.rocket)
+                continue
+            configs = (rocket_to_dict(past_flight.rocket), environment_to_dict(past_flight.environment), launchpad_to_dict(past_flight.launchpad))
+            # the dictionaries are JSON-compatible
+            configs = json.loads(json.dumps(configs))
+            rocket, environment, launchpad = rocket_from_dict(configs[0]), environment_from_dict(configs[1]), launchpad_from_dict(configs[2])
+            original = flight_sim_ignition_to_apogee(past_flight.rocket, past_flight.environment, past_flight.launchpad)
+            rebuilt = flight_sim_ignition_to_apogee(rocket, environment, launchpad)
+            print(f"\t{past_flight.name}: apogee {original[-1][3]:.3f} m, rebuilt {rebuilt[-1][3]:.3f} m")
+            assert np.allclose(original.to_numpy(), rebuilt.to_numpy())
+
+        # drag curves
+        past_flight = deepcopy(Juno3_flight)
+        past_flight.rocket.Cd_rocket = DragCurve.from_function(past_flight.rocket.Cd_rocket, np.linspace(0, 2, 201))
+        config = json.loads(json.dumps(rocket_to_dict(past_flight.rocket)))
+        assert config['Cd_rocket']['mach'][-1] == 2
+        rocket = rocket_from_dict(config)
+        assert np.isclose(rocket.Cd_A_rocket(0.55), past_flight.rocket.Cd_rocket(0.55) * past_flight.rocket.A_rocket)
+
+        # keys depend on content, not key order
+        assert config_key({'a': 1, 'b': [1, 2]}) == config_key({'b': [1, 2], 'a': 1})
+        assert config_key({'a': 1}) != config_key({'a': 2})
+
+class TestSimulationService(unittest.TestCase):
+    def test_simulation_service(self):
+        print("\nTesting the simulation service...")
+
+        past_flight = deepcopy(NDRT_2020_flight)
+        request = {
+            'rocket': rocket_to_dict(past_flight.rocket),
+            'environment': environment_to_dict(past_flight.environment),
+            'launchpad': launchpad_to_dict(past_flight.launchpad),
+        }
+
+        server = make_server(port = 0, processes = 2, cache_size = 4)
+        thread = threading.Thread(target = server.serve_forever, daemon = True)
+        thread.start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            # results match the simulator
+            response = _post(url + '/simulate', request)
+            apogee = flight_sim_ignition_to_apogee(past_flight.rocket, past_flight.environment, past_flight.launchpad)[-1][3]
+            print(f"\tapogee {response['result']['apogee']:.3f} m, from the simulator {apogee:.3f} m")
+            assert response['source'] == 'simulated' and np.isclose(response['result']['apogee'], apogee)
+
+            # identical requests, whatever their key order and defaults, are served from the cache
+            repeat = _post(url + '/simulate', dict(reversed(list(request.items())), flight = 'apogee', states = False))
+            assert repeat['source'] == 'cache' and repeat['key'] == response['key'] and repeat['result'] == response['result']
+
+            # identical requests in flight are simulated once
+            landing_request = dict(request, flight = 'landing', parachutes = [dict(parachute_to_dict(past_flight.parachute), stop_condition = 'landed')], states = True)
+            with ThreadPoolExecutor(4) as executor:
+                responses = list(executor.map(lambda _: _post(url + '/simulate', landing_request), range(4)))
+            sources = sorted(response['source'] for response in responses)
+            print(f"\tsources of identical concurrent requests: {sources}")
+            assert sources.count('simulated') == 1
+            landing = flight_sim_ignition_to_landing(past_flight.rocket, past_flight.environment, past_flight.launchpad, [(past_flight.parachute, 'landed', None)])
+            for landing_response in responses:
+                assert np.allclose(landing_response['result']['states'], landing.to_numpy())
+
+            # invalid requests are rejected
+            with self.assertRaises(urllib.error.HTTPError) as context:
+                _post(url + '/simulate', dict(request, flight = 'orbit'))
+            assert context.exception.code == 400
+
+            with urllib.request.urlopen(url + '/metrics') as metrics_response:
+                metrics = json.loads(metrics_response.read())
+            print(f"\tmetrics: {metrics}")
+            assert metrics['requests'] == 6 and metrics['simulated'] == 2 and metrics['cache_hits'] + metrics['coalesced'] == 4
+            assert metrics['queue_depth'] == 0 and metrics['latency_ms']['p50'] <= metrics['latency_ms']['p99']
+        finally:
+            server.shutdown()
+            server.server_close()
+            server.service.close()
+
+    def test_shared_curves_are_bounded(self):
+        print("\nTesting the simulation service frees the shared curves of finished requests...")
+        from multiprocessing import shared_memory
+
+        rocket = deepcopy(Juno3_flight.rocket)
+        rocket.Cd_rocket = 0.4
+        config = rocket_to_dict(rocket)
+        curve_bytes = len(config['motor']['thrust_curve']) * 2 * 8
+        service = SimulationService(processes = 1, shared_bytes = 3 * curve_bytes)
+        try:
+            names = set()
+            for i in range(6):
+                # each request has its own thrust curve and the same fuel mass curve
+                motor = dict(config['motor'], thrust_curve = [[time, thrust * (1 + 0.01 * i)] for time, thrust in config['motor']['thrust_curve']])
+                request = {'rocket': dict(config, motor = motor), 'environment': environment_to_dict(Juno3_flight.environment), 'launchpad': launchpad_to_dict(Juno3_flight.launchpad), 'timestep': 0.05}
+                service.simulate(request)
+                names.update(handle.name for handle in service.tables._handles.values())
+                metrics = service.metrics()
+                assert metrics['shared_bytes'] <= 3 * curve_bytes
+            print(f"\t{len(names)} curves shared, {metrics['shared_tables']} kept ({metrics['shared_bytes']} bytes)")
+            # the curves of earlier requests are freed, and the fuel mass curve they all use is kept
+            kept = {handle.name for handle in service.tables._handles.values()}
+            assert len(names) == 7 and len(kept) == 3
+            for name in names - kept:
+                with self.assertRaises(FileNotFoundError):
+                    shared_memory.SharedMemory(name = name)
+        finally:
+            service.close()
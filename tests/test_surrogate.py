@@ -0,0 +1,68 @@
+import sys
+import os
+import tempfile
+from copy import deepcopy
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim.flight_stages_combined import flight_sim_ignition_to_apogee
+from rocketflightsim.tools.surrogate import ApogeeSurrogate, design_flight, sample_designs, simulate_designs, train_surrogate
+
+from .test_configs import NDRT_2020_flight
+
+class TestSurrogate(unittest.TestCase):
+    def test_apogee_surrogate(self):
+        print("\nTesting surrogate apogee model...")
+
+        past_flight = deepcopy(NDRT_2020_flight)
+        rocket, environment, launchpad = past_flight.rocket, past_flight.environment, past_flight.launchpad
+        motor = rocket.motor
+
+        # the reference values of the design variables give the reference flight
+        reference_design = {'dry_mass': rocket.dry_mass, 'total_impulse': motor.total_impulse, 'burn_time': motor.burn_time, 'launchpad_temp': environment.launchpad_temp - 273.15}
+        reference_apogee = flight_sim_ignition_to_apogee(rocket, environment, launchpad)[-1][3]
+        assert np.isclose(flight_sim_ignition_to_apogee(*design_flight(rocket, environment, launchpad, reference_design))[-1][3], reference_apogee)
+
+        bounds = {
+            'dry_mass': (rocket.dry_mass * 0.9, rocket.dry_mass * 1.1),
+            'Cd': (0.35, 0.5),
+            'total_impulse': (motor.total_impulse * 0.9, motor.total_impulse * 1.1),
+            'launch_rail_elevation': (82, 90),
+        }
+        designs = sample_designs(bounds, 40, seed = 0)
+        # a Latin hypercube has one sample in each of 40 intervals of each variable
+        for j, (low, high) in enumerate(bounds.values()):
+            assert np.array_equal(np.sort(np.floor((designs[:, j] - low) / (high - low) * 40)), np.arange(40))
+
+        surrogate = train_surrogate(rocket, environment, launchpad, bounds, num_samples = 80, degree = 2, seed = 0, timestep = 0.02, processes = 2)
+        print(f"\tcross-validated errors: {surrogate.cv_errors}")
+        assert surrogate.cv_errors['mean_relative_error'] < 0.01
+        assert surrogate.cv_errors['r_squared'] > 0.99
+
+        # predictions of new designs match simulations
+        apogees = simulate_designs(rocket, environment, launchpad, list(bounds), designs[:5], timestep = 0.02, processes = 1)
+        predictions = surrogate.predict(designs[:5])
+        print(f"\tsimulated: {apogees}\n\tpredicted: {predictions}")
+        assert np.all(np.abs(predictions - apogees) / apogees < 0.02)
+
+        # vectorized prediction from a dictionary of arrays, broadcasting scalars
+        from_dict = surrogate.predict({'dry_mass': designs[:5, 0], 'Cd': designs[:5, 1], 'total_impulse': designs[:5, 2], 'launch_rail_elevation': designs[:5, 3]})
+        assert np.allclose(from_dict, predictions)
+        assert surrogate.predict({'dry_mass': designs[:5, 0], 'Cd': 0.4, 'total_impulse': motor.total_impulse, 'launch_rail_elevation': 90}).shape == (5,)
+
+        # saved and loaded surrogates predict the same
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'surrogate.npz')
+            surrogate.save(path)
+            loaded = ApogeeSurrogate.load(path)
+        assert loaded.variables == surrogate.variables and loaded.cv_errors == surrogate.cv_errors
+        assert np.allclose(loaded.predict(designs), surrogate.predict(designs))
+
+        # RBF surrogates interpolate the samples
+        rbf = ApogeeSurrogate(list(bounds), list(bounds.values()), kind = 'rbf').fit(designs[:5], apogees)
+        assert np.allclose(rbf.predict(designs[:5]), apogees)
+
+        with self.assertRaises(ValueError):
+            sample_designs({'fin_count': (3, 4)}, 10)
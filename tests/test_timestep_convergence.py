@@ -0,0 +1,29 @@
+import sys
+import os
+from copy import deepcopy
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim.tools.timestep_convergence import timestep_convergence_study
+
+from .test_configs import NDRT_2020_flight
+
+class TestTimestepConvergence(unittest.TestCase):
+    def test_timestep_convergence_study(self):
+        print("\nTesting timestep convergence study...")
+
+        past_flight = deepcopy(NDRT_2020_flight)
+        study = timestep_convergence_study(past_flight.rocket, past_flight.environment, past_flight.launchpad, [(past_flight.parachute, 'landed', None)], levels = 5, tolerances = {'apogee': 5, 'max_speed': 1}, processes = 2)
+
+        for phase, results in study.items():
+            print(f"\t{phase}: recommended timestep {results['recommended_timestep']} s, observed order of apogee {round(results['observed_order']['apogee'], 3)}")
+            assert results['recommended_timestep'] is not None
+
+        # the stages use a first-order integration scheme
+        for phase in ('boost', 'coast'):
+            assert np.abs(study[phase]['observed_order']['apogee'] - 1) < 0.1
+
+        # errors shrink as the timestep gets finer
+        assert np.all(np.diff(study['boost']['errors']['apogee']) < 0)
@@ -0,0 +1,64 @@
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from rocketflightsim.tools.weather_climatology import read_weather_records, bin_weather_conditions, launch_window_climatology
+
+from .test_configs import NDRT_2020_rocket, NDRT_2020_launchpad, NDRT_2020_drogue_parachute
+
+weather_csv = """time,pressure,temperature,wind_speed,wind_direction
+2023-06-20T13:00:00,86400,35.1,5,90
+2023-06-20T13:20:00,86420,35.0,5.2,92
+2023-06-20T14:00:00,86300,36.0,8,270
+2023-06-21T13:00:00,86390,35.2,25,90
+2023-06-21T13:30:00,86390,not a number,4,90
+2023-07-01T09:00:00,86800,27.0,2,180
+"""
+
+class TestWeatherClimatology(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'weather.csv')
+        with open(self.path, 'w') as file:
+            file.write(weather_csv)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_and_bin_weather_records(self):
+        print("\nTesting weather record streaming and binning...")
+
+        chunks = list(read_weather_records(self.path, chunk_rows = 2, wind_speed_unit = 'mph'))
+        num_records = sum(len(chunk['month']) for chunk in chunks)
+        print(f"\tRecords kept: {num_records} in {len(chunks)} chunks")
+        assert num_records == 4 # one record is too windy and one can't be parsed
+        assert max(len(chunk['month']) for chunk in chunks) <= 2
+
+        conditions = bin_weather_conditions(chunks, resolution = {'wind_speed': 1})
+        print(f"\tUnique conditions: {len(conditions)}")
+        assert len(conditions) == 3 # the first two records are near-identical
+        assert conditions.num_records == 4
+        assert conditions.counts[(0, 6, 13)] == 2
+
+    def test_launch_window_climatology(self):
+        print("\nTesting launch window climatology sweep...")
+
+        climatology = launch_window_climatology(
+            self.path,
+            NDRT_2020_rocket,
+            NDRT_2020_launchpad,
+            parachutes_and_conditions = [(NDRT_2020_drogue_parachute, 'landed', None)],
+            environment_kwargs = {'latitude': 32.99, 'altitude': 1401},
+            processes = 2,
+        )
+        for (month, hour), stats in climatology.items():
+            print(f"\tMonth {month}, hour {hour}: {stats['count']} records, median apogee {round(stats['apogee']['p50'], 2)} m, median landing distance {round(stats['landing_distance']['p50'], 2)} m")
+
+        assert sorted(climatology) == [(6, 13), (6, 14), (7, 9)]
+        assert climatology[(6, 13)]['count'] == 2
+        for stats in climatology.values():
+            assert stats['apogee']['min'] > 0
+            assert stats['apogee']['p5'] <= stats['apogee']['p50'] <= stats['apogee']['p95']